@@ -20,7 +20,8 @@ from app.models import (
     property,
     unit,
     tenant,
-    lease
+    lease,
+    rollup
 )
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,47 @@
+"""add hot path indexes
+
+Revision ID: 3f9c2a7d1e04
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d1e04'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) - mirrors __table_args__ on the models
+INDEXES = [
+    ('ix_units_property_id_status', 'units', ['property_id', 'status']),
+    ('ix_units_status', 'units', ['status']),
+    ('ix_units_created_at_id', 'units', ['created_at', 'id']),
+    ('ix_leases_unit_id_status', 'leases', ['unit_id', 'status']),
+    ('ix_leases_status_end_date', 'leases', ['status', 'end_date']),
+    ('ix_leases_tenant_id', 'leases', ['tenant_id']),
+    ('ix_leases_created_at_id', 'leases', ['created_at', 'id']),
+    ('ix_properties_company_id_created_at', 'properties', ['company_id', 'created_at']),
+    ('ix_properties_created_at_id', 'properties', ['created_at', 'id']),
+    ('ix_conversations_last_message_at_id', 'conversations', ['last_message_at', 'id']),
+    ('ix_conversation_participants_user_id_active', 'conversation_participants', ['user_id', 'is_active', 'conversation_id']),
+    ('ix_conversation_participants_conversation_id_user_id', 'conversation_participants', ['conversation_id', 'user_id']),
+    ('ix_messages_conversation_id_created_at', 'messages', ['conversation_id', 'created_at', 'id']),
+    ('ix_messages_conversation_id_unread', 'messages', ['conversation_id', 'is_read', 'sender_id']),
+    ('ix_messages_sender_id', 'messages', ['sender_id']),
+]
+
+
+def upgrade() -> None:
+    # Tables created by init_db() after this revision already carry the indexes
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
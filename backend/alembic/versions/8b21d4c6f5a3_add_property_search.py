@@ -0,0 +1,26 @@
+"""add property search
+
+Revision ID: 8b21d4c6f5a3
+Revises: 3f9c2a7d1e04
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8b21d4c6f5a3'
+down_revision = '3f9c2a7d1e04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Postgres: pg_trgm + generated tsvector column; SQLite: FTS5 table and triggers
+    from app.services.search_service import install_property_search
+    install_property_search(op.get_bind())
+
+
+def downgrade() -> None:
+    from app.services.search_service import drop_property_search
+    drop_property_search(op.get_bind())
@@ -0,0 +1,56 @@
+"""add portfolio rollups
+
+Revision ID: a7d2e9c4b1f8
+Revises: f1c7a9e3b2d6
+Create Date: 2026-10-18 22:00:00.000000
+
+portfolio_rollups was only created by init_db(); databases managed by
+Alembic get it here, built from the current units and properties.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from app.models.base import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d2e9c4b1f8'
+down_revision = 'f1c7a9e3b2d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # init_db() creates the table on databases it set up
+    if 'portfolio_rollups' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'portfolio_rollups',
+        sa.Column('id', GUID(), primary_key=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('company_id', GUID(), sa.ForeignKey('companies.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('property_id', GUID(), sa.ForeignKey('properties.id', ondelete='CASCADE')),
+        sa.Column('property_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_units', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('unit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('occupied_units', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('available_units', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('maintenance_units', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('monthly_revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('monthly_expenses', sa.Float(), nullable=False, server_default='0'),
+        sa.UniqueConstraint('company_id', 'property_id', name='uq_portfolio_rollup_scope'),
+    )
+    op.create_index('ix_portfolio_rollups_property_id', 'portfolio_rollups', ['property_id'])
+
+    # Backfill from existing properties and units
+    from app.services.rollup_service import rebuild_rollups
+    session = Session(bind=op.get_bind())
+    rebuild_rollups(session)
+    session.flush()
+
+
+def downgrade() -> None:
+    op.drop_index('ix_portfolio_rollups_property_id', table_name='portfolio_rollups')
+    op.drop_table('portfolio_rollups')
@@ -0,0 +1,26 @@
+"""add message search
+
+Revision ID: c4e7a1f93b20
+Revises: 8b21d4c6f5a3
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e7a1f93b20'
+down_revision = '8b21d4c6f5a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Postgres: generated tsvector column on messages; SQLite: FTS5 table and triggers
+    from app.services.search_service import install_message_search
+    install_message_search(op.get_bind())
+
+
+def downgrade() -> None:
+    from app.services.search_service import drop_message_search
+    drop_message_search(op.get_bind())
@@ -0,0 +1,42 @@
+"""add inbox denormalization
+
+Revision ID: d9a3f6b2c815
+Revises: c4e7a1f93b20
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a3f6b2c815'
+down_revision = 'c4e7a1f93b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('last_message_id', sa.String(36), nullable=True))
+    op.add_column('conversations', sa.Column('last_message_sender_id', sa.String(36), nullable=True))
+    op.add_column('conversations', sa.Column('last_message_preview', sa.String(255), nullable=True))
+    op.add_column(
+        'conversation_participants',
+        sa.Column('unread_count', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    # Backfill from existing messages
+    from app.services.inbox_service import rebuild_inbox_state
+    session = Session(bind=op.get_bind())
+    rebuild_inbox_state(session)
+    session.flush()
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('conversation_participants') as batch_op:
+        batch_op.drop_column('unread_count')
+    with op.batch_alter_table('conversations') as batch_op:
+        batch_op.drop_column('last_message_preview')
+        batch_op.drop_column('last_message_sender_id')
+        batch_op.drop_column('last_message_id')
@@ -0,0 +1,132 @@
+"""binary uuid keys
+
+Revision ID: e5b8c1d4a7f2
+Revises: d9a3f6b2c815
+Create Date: 2026-10-18 18:00:00.000000
+
+Keys move to the GUID type (models/base.py). On SQLite every key column's
+36-character strings become 16-byte blobs. SQLite stores whatever a column
+is given, so values are rewritten in place and the declared column types
+stay as they were. On Postgres the messaging and maintenance columns that
+were VARCHAR become native uuid, like every other key.
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b8c1d4a7f2'
+down_revision = 'd9a3f6b2c815'
+branch_labels = None
+depends_on = None
+
+
+# Every GUID column (primary and foreign keys)
+KEY_COLUMNS = {
+    'companies': ['id'],
+    'properties': ['id', 'company_id'],
+    'tenants': ['id', 'company_id'],
+    'users': ['id', 'company_id'],
+    'message_templates': ['id', 'created_by_id'],
+    'portfolio_rollups': ['id', 'company_id', 'property_id'],
+    'units': ['id', 'property_id'],
+    'user_property_assignments': ['user_id', 'property_id'],
+    'leases': ['id', 'unit_id', 'tenant_id', 'company_id'],
+    'maintenance_requests': ['id', 'unit_id', 'tenant_id'],
+    'conversations': [
+        'id', 'created_by_id', 'property_id', 'unit_id', 'tenant_id', 'maintenance_request_id',
+        'last_message_id', 'last_message_sender_id',
+    ],
+    'payments': ['id', 'lease_id', 'tenant_id'],
+    'conversation_participants': ['id', 'conversation_id', 'user_id'],
+    'messages': ['id', 'conversation_id', 'sender_id'],
+    'message_attachments': ['id', 'message_id'],
+}
+
+# The columns that were strings on Postgres too, with their previous type
+POSTGRES_STRING_COLUMNS = {
+    table: {name: sa.String(36) for name in KEY_COLUMNS[table]}
+    for table in ('message_templates', 'conversations', 'conversation_participants', 'messages', 'message_attachments')
+}
+POSTGRES_STRING_COLUMNS['maintenance_requests'] = {'unit_id': sa.String(), 'tenant_id': sa.String()}
+
+
+def _existing_columns(bind, columns_by_table):
+    """Only the tables and columns this database has (older schemas lack some)"""
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    for table, columns in columns_by_table.items():
+        if table not in tables:
+            continue
+        present = {column['name'] for column in inspector.get_columns(table)}
+        yield table, [column for column in columns if column in present]
+
+
+def _uuid_to_blob(value):
+    return uuid.UUID(value).bytes if isinstance(value, str) else value
+
+
+def _blob_to_uuid(value):
+    return str(uuid.UUID(bytes=bytes(value))) if isinstance(value, bytes) else value
+
+
+def _convert_sqlite(to_binary: bool) -> None:
+    bind = op.get_bind()
+    function, storage_class = ('uuid_to_blob', 'text') if to_binary else ('blob_to_uuid', 'blob')
+    bind.connection.driver_connection.create_function(
+        function, 1, _uuid_to_blob if to_binary else _blob_to_uuid, deterministic=True
+    )
+    for table, columns in _existing_columns(bind, KEY_COLUMNS):
+        for column in columns:
+            op.execute(
+                f"UPDATE {table} SET {column} = {function}({column}) "
+                f"WHERE typeof({column}) = '{storage_class}'"
+            )
+
+
+def _convert_postgres(to_uuid: bool) -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns_by_table = dict(_existing_columns(bind, POSTGRES_STRING_COLUMNS))
+
+    # Foreign keys can't span the two types while they change, so drop and restore them
+    foreign_keys = [
+        (table, fk) for table, columns in columns_by_table.items()
+        for fk in inspector.get_foreign_keys(table)
+        if fk['name'] and set(fk['constrained_columns']) & set(columns)
+    ]
+    for table, fk in foreign_keys:
+        op.drop_constraint(fk['name'], table, type_='foreignkey')
+
+    for table, columns in columns_by_table.items():
+        for column in columns:
+            if to_uuid:
+                type_, using = postgresql.UUID(as_uuid=True), f'{column}::uuid'
+            else:
+                type_, using = POSTGRES_STRING_COLUMNS[table][column], f'{column}::text'
+            op.alter_column(table, column, type_=type_, postgresql_using=using)
+
+    for table, fk in foreign_keys:
+        op.create_foreign_key(
+            fk['name'], table, fk['referred_table'], fk['constrained_columns'], fk['referred_columns'],
+            ondelete=fk.get('options', {}).get('ondelete'),
+        )
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _convert_sqlite(to_binary=True)
+    elif dialect == 'postgresql':
+        _convert_postgres(to_uuid=True)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _convert_sqlite(to_binary=False)
+    elif dialect == 'postgresql':
+        _convert_postgres(to_uuid=False)
@@ -0,0 +1,53 @@
+"""add notification outbox
+
+Revision ID: f1c7a9e3b2d6
+Revises: e5b8c1d4a7f2
+Create Date: 2026-10-18 20:00:00.000000
+
+Notifications are queued in notification_outbox in the same transaction as
+the message and delivered by notification_worker.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.base import GUID
+from app.models.notification import OutboxStatus
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c7a9e3b2d6'
+down_revision = 'e5b8c1d4a7f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # init_db() creates the table on databases it set up
+    if 'notification_outbox' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', GUID(), primary_key=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('recipient_id', GUID(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('kind', sa.String(50), nullable=False),
+        sa.Column('conversation_id', GUID()),
+        sa.Column('message_id', GUID()),
+        sa.Column('payload', sa.JSON()),
+        sa.Column('status', sa.Enum(OutboxStatus), nullable=False),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('claimed_by', sa.String(100)),
+        sa.Column('claimed_at', sa.DateTime()),
+        sa.Column('last_error', sa.Text()),
+    )
+    op.create_index(
+        'ix_notification_outbox_status_available_at', 'notification_outbox', ['status', 'available_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_outbox_status_available_at', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
+    sa.Enum(OutboxStatus).drop(op.get_bind(), checkfirst=True)
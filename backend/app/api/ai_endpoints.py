@@ -1,17 +1,22 @@
 """
 AI-powered endpoints for property management
 """
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
+from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, Query
 from typing import List, Dict, Optional, Any
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import asyncio
 import logging
 
 from ..services.ai_service import ai_service
+from ..services.metrics_service import get_property_totals
 from ..models import User, Unit, Property, Tenant
-from ..database import get_db
+from ..database import get_async_db, get_db
 from ..config import settings
 from ..services.auth_service import get_current_user
+from ..utils.streaming import ndjson_response
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +25,7 @@ router = APIRouter(tags=["ai"])
 
 @router.post("/optimize-rent/{unit_id}")
 async def optimize_unit_rent(
-    unit_id: str,
+    unit_id: UUID,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
@@ -61,45 +66,69 @@ async def optimize_unit_rent(
 
 
 @router.post("/analyze-portfolio")
-async def analyze_entire_portfolio(db: Session = Depends(get_db)):
-    """Comprehensive AI analysis of entire portfolio"""
-    
-    # Get all properties and units
-    properties = db.query(Property).all()
-    units = db.query(Unit).all()
-    
-    # Prepare data for analysis
-    properties_data = []
-    for property in properties:
-        properties_data.append({
-            'id': str(property.id),
-            'name': property.name,
-            'total_units': property.total_units,
-            'occupancy_rate': property.occupancy_rate,
-            'monthly_revenue': property.monthly_revenue,
-            'units': len([u for u in units if u.property_id == property.id])
-        })
+async def analyze_entire_portfolio(
+    limit: int = Query(5, ge=0, le=settings.AI_PORTFOLIO_MAX_UNITS, description="Units to run rent optimization on, oldest first"),
+    stream: bool = Query(False, description="Stream NDJSON events, each unit's optimization as soon as it finishes"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Comprehensive AI analysis of entire portfolio.
+    
+    Property figures come from one grouped query; unit optimizations run
+    concurrently (AI_ANALYSIS_CONCURRENCY at a time). With ``stream`` the
+    response is NDJSON: a ``portfolio`` event, one ``unit`` event per unit
+    in completion order, then ``done``.
+    """
+    # Unit counts, occupancy and revenue per property in one grouped query
+    totals = await db.run_sync(get_property_totals)
+    properties_data = [
+        {
+            'id': str(row['property_id']),
+            'name': row['name'],
+            'total_units': row['total_units'],
+            'occupancy_rate': (row['occupied_units'] / row['total_units']) * 100 if row['total_units'] else 0.0,
+            'monthly_revenue': row['monthly_revenue'],
+            'units': row['unit_count']
+        }
+        for row in totals
+    ]
+    
+    # Only the columns the prompt uses
+    unit_rows = (await db.execute(select(
+        Unit.id, Unit.unit_number, Unit.market_rent, Unit.bedrooms, Unit.bathrooms,
+        Unit.square_feet, Unit.features, Unit.unit_type
+    ).order_by(Unit.created_at, Unit.id).limit(limit))).all()
+    units = [
+        {
+            'unit_id': str(row.id),
+            'unit_number': row.unit_number,
+            'market_rent': row.market_rent,
+            'bedrooms': row.bedrooms,
+            'bathrooms': row.bathrooms,
+            'square_feet': row.square_feet,
+            'features': row.features or [],
+            'unit_type': row.unit_type.value if row.unit_type else 'apartment'
+        }
+        for row in unit_rows
+    ]
     
     # Get AI analysis
     analysis = await ai_service.analyze_portfolio(properties_data)
+    optimizations = ai_service.optimize_rents(units, {'avg_rent': 1800}, settings.AI_ANALYSIS_CONCURRENCY)
+    
+    if stream:
+        async def events():
+            yield [{'type': 'portfolio', **analysis}]
+            async for optimization in optimizations:
+                yield [{'type': 'unit', **optimization}]
+            yield [{'type': 'done', 'units_analyzed': len(units)}]
+        
+        return ndjson_response(events(), lambda event: event)
     
-    # Add unit-level insights
-    unit_optimizations = []
-    for unit in units[:5]:  # Top 5 units for demo
-        opt = await ai_service.optimize_rent_advanced(
-            unit_data={
-                'market_rent': unit.market_rent,
-                'bedrooms': unit.bedrooms,
-                'bathrooms': unit.bathrooms,
-                'square_feet': unit.square_feet,
-                'features': unit.features or [],
-                'unit_type': unit.unit_type.value if unit.unit_type else 'apartment'
-            },
-            market_data={'avg_rent': 1800}
-        )
-        opt['unit_id'] = str(unit.id)
-        opt['unit_number'] = unit.unit_number
-        unit_optimizations.append(opt)
+    # Back in unit order
+    position = {unit['unit_id']: index for index, unit in enumerate(units)}
+    unit_optimizations = [optimization async for optimization in optimizations]
+    unit_optimizations.sort(key=lambda optimization: position[optimization['unit_id']])
     
     analysis['unit_optimizations'] = unit_optimizations
     
@@ -127,7 +156,7 @@ async def create_voice_alert(
 async def send_smart_sms(
     phone: str,
     message: str,
-    tenant_id: Optional[str] = None,
+    tenant_id: Optional[UUID] = None,
     db: Session = Depends(get_db)
 ):
     """Send AI-enhanced SMS"""
@@ -150,7 +179,7 @@ async def send_smart_sms(
 
 @router.post("/predict-maintenance")
 async def predict_maintenance_needs(
-    property_id: str,
+    property_id: UUID,
     db: Session = Depends(get_db)
 ):
     """Predict maintenance needs for a property"""
@@ -222,7 +251,7 @@ async def screen_tenant_application(application_data: Dict):
 
 @router.post("/generate-listing")
 async def generate_listing(
-    unit_id: str,
+    unit_id: UUID,
     db: Session = Depends(get_db)
 ):
     """Generate compelling listing description"""
@@ -265,7 +294,7 @@ async def analyze_property_images(
 
 @router.post("/predict-churn")
 async def predict_tenant_churn(
-    tenant_id: str,
+    tenant_id: UUID,
     db: Session = Depends(get_db)
 ):
     """Predict likelihood of tenant leaving"""
@@ -318,7 +347,7 @@ async def ai_assistant_chat(
     
     if ai_service.openai_client:
         try:
-            response = await ai_service.openai_client.chat.completions.create(
+            response = await ai_service.complete(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": ai_context},
@@ -380,6 +409,8 @@ async def ai_health_check():
         'status': 'healthy',
         'services_available': services,
         'total_services': sum(services.values()),
+        'limits': {name: gate.status() for name, gate in ai_service.gates.items()},
+        'cache': ai_service.cache.status() if ai_service.cache else None,
         'message': 'AI services are ready for property management automation'
     }
 
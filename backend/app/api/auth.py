@@ -3,12 +3,14 @@ Authentication API endpoints
 """
 from datetime import timedelta
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
 
-from ..database import get_db
+from ..database import AsyncSessionLocal, get_db
 from ..models.user import User, UserRole
 from ..services.auth_service import AuthService
 from ..utils.security import verify_password, get_password_hash, create_access_token, verify_token
@@ -27,7 +29,7 @@ class UserCreate(BaseModel):
     last_name: str
     phone: Optional[str] = None
     role: UserRole = UserRole.VIEWER
-    company_id: Optional[str] = None
+    company_id: Optional[UUID] = None
 
 
 class UserLogin(BaseModel):
@@ -46,13 +48,13 @@ class TokenData(BaseModel):
 
 
 class UserResponse(BaseModel):
-    id: str
+    id: UUID
     email: str
     first_name: str
     last_name: str
     role: UserRole
     is_active: bool
-    company_id: Optional[str]
+    company_id: Optional[UUID]
     
     class Config:
         from_attributes = True
@@ -90,6 +92,29 @@ async def get_current_user(
     return user
 
 
+async def get_websocket_user(websocket: WebSocket, token: Optional[str] = None) -> User:
+    """
+    Authenticated user for a WebSocket handshake. Browsers can't set headers
+    on it, so the bearer token may also come as ``?token=``. The lookup uses
+    its own short session: a get_db session would hold a pooled connection
+    for as long as the socket stays open.
+    """
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else None
+    payload = verify_token(token) if token else None
+    email = payload.get("sub") if payload else None
+    if email is None:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials")
+    
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(select(User).filter(User.email == email))
+    if user is None or not user.is_active:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials")
+    
+    return user
+
+
 @router.post("/register", response_model=UserResponse)
 async def register(
     user_data: UserCreate,
@@ -114,7 +139,7 @@ async def register(
             password=user_data.password,
             first_name=user_data.first_name,
             last_name=user_data.last_name,
-            company_id=user_data.company_id or "default-company-id",  # TODO: Handle company assignment
+            company_id=user_data.company_id,  # TODO: Handle company assignment
             role=user_data.role,
             phone=user_data.phone
         )
@@ -1,7 +1,7 @@
 """
 Calendar API endpoints for quantum scheduling
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, BackgroundTasks
 from typing import List, Dict, Optional, Any
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_, and_, desc, func
@@ -13,6 +13,8 @@ from ..database import get_db
 from ..models import User, Property, Unit, Tenant, MaintenanceRequest
 from ..services.auth_service import get_current_user
 from ..services.ai_service import ai_service
+from ..services.cache_service import cache_response
+from ..utils.responses import json_response
 
 router = APIRouter(prefix="/calendar", tags=["calendar"])
 
@@ -74,12 +76,13 @@ async def get_calendar_events(
         events = get_mock_events()
         predictions = get_mock_predictions()
     
-    return {
+    # Largest calendar payload: skip FastAPI's jsonable_encoder pass
+    return json_response({
         'events': [event.to_dict() for event in events],
         'predictions': predictions,
         'view': view,
         'date': date
-    }
+    })
 
 
 @router.post("/events")
@@ -229,7 +232,9 @@ async def parse_natural_language(
 
 
 @router.get("/analytics")
+@cache_response()
 async def get_calendar_analytics(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -399,7 +404,7 @@ async def generate_ai_predictions(db: Session) -> List[Dict]:
             """
             
             try:
-                response = await ai_service.openai_client.chat.completions.create(
+                response = await ai_service.complete(
                     model="gpt-3.5-turbo",
                     messages=[
                         {"role": "system", "content": "You are a property management AI that predicts future events. Respond with realistic, actionable predictions."},
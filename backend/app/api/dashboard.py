@@ -3,70 +3,50 @@ Dashboard API endpoints for aggregated metrics
 """
 from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 
-from ..database import get_db
-from ..models import Property, Unit, User
+from ..database import get_async_db
+from ..models import User
 from ..config import settings
+from ..services.cache_service import cache_response
+from ..services.metrics_service import get_portfolio_metrics
+from ..services.rollup_service import get_rollup_metrics
 
 
 router = APIRouter()
 
 
 @router.get("/metrics")
+@cache_response()
 async def get_dashboard_metrics(
+    request: Request,
     property_id: Optional[UUID] = Query(None, description="Filter by specific property"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
     Get aggregated dashboard metrics for properties
     """
-    # Base query - filter by company when auth is implemented
-    property_query = db.query(Property)
-    unit_query = db.query(Unit)
+    # TODO: Pass company_id=current_user.company_id when auth is implemented
+    # Rollups are a single indexed lookup; aggregate live until they've been built
+    metrics = (
+        await db.run_sync(get_rollup_metrics, property_id=property_id)
+        or await db.run_sync(get_portfolio_metrics, property_id=property_id)
+    )
     
-    # Filter by specific property if provided
-    if property_id:
-        property_query = property_query.filter(Property.id == property_id)
-        unit_query = unit_query.filter(Unit.property_id == property_id)
-        properties = property_query.all()
-    else:
-        # Get all properties for the company
-        properties = property_query.all()
-        property_ids = [p.id for p in properties]
-        if property_ids:
-            unit_query = unit_query.filter(Unit.property_id.in_(property_ids))
-    
-    # Calculate aggregate metrics
-    total_properties = len(properties)
-    total_units = sum(p.total_units for p in properties)
-    
-    # Unit status breakdown
-    unit_stats = db.query(
-        Unit.status,
-        func.count(Unit.id).label('count')
-    ).filter(
-        Unit.property_id.in_([p.id for p in properties]) if properties else False
-    ).group_by(Unit.status).all()
-    
-    unit_breakdown = {stat.status: stat.count for stat in unit_stats}
-    occupied_units = unit_breakdown.get('occupied', 0)
-    available_units = unit_breakdown.get('available', 0)
-    maintenance_units = unit_breakdown.get('maintenance', 0)
+    total_properties = metrics["total_properties"]
+    total_units = metrics["total_units"]
+    occupied_units = metrics["occupied_units"]
+    available_units = metrics["available_units"]
+    maintenance_units = metrics["maintenance_units"]
     
     # Calculate financial metrics
-    total_monthly_revenue = sum(p.monthly_revenue for p in properties)
-    total_monthly_expenses = sum(p.monthly_operating_expenses or 0 for p in properties)
-    total_noi = total_monthly_revenue - total_monthly_expenses
-    
-    # Calculate average occupancy rate
-    avg_occupancy_rate = 0
-    if total_units > 0:
-        avg_occupancy_rate = (occupied_units / total_units) * 100
+    total_monthly_revenue = metrics["monthly_revenue"]
+    total_monthly_expenses = metrics["monthly_expenses"]
+    total_noi = metrics["net_operating_income"]
+    avg_occupancy_rate = metrics["occupancy_rate"]
     
     # Trend data (mock for now - would come from historical data)
     occupancy_trend = 3.5  # % change
@@ -105,16 +85,7 @@ async def get_dashboard_metrics(
             "this_month": 3,
             "new_this_month": 5
         },
-        "properties_breakdown": [
-            {
-                "id": str(p.id),
-                "name": p.name,
-                "occupancy_rate": round(p.occupancy_rate, 1),
-                "monthly_revenue": round(p.monthly_revenue, 2),
-                "units": p.total_units
-            }
-            for p in properties[:5]  # Top 5 properties
-        ],
+        "properties_breakdown": metrics["properties_breakdown"],  # Top 5 properties
         "last_updated": datetime.utcnow().isoformat()
     }
 
@@ -123,7 +94,7 @@ async def get_dashboard_metrics(
 async def get_calendar_events(
     property_id: Optional[UUID] = Query(None),
     date: Optional[str] = Query(None, description="Date in YYYY-MM-DD format"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get calendar events for dashboard widget
@@ -166,7 +137,7 @@ async def get_calendar_events(
 @router.get("/notifications")
 async def get_notifications(
     limit: int = Query(10, le=50),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get recent notifications for dashboard
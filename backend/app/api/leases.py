@@ -3,28 +3,45 @@ Lease management API endpoints
 """
 from datetime import datetime, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, select
 
 from ..database import get_db
 from ..models.lease import Lease, LeaseStatus
 from ..models.user import User
 from ..services.auth_service import get_current_user
 from ..schemas import LeaseCreate, LeaseUpdate, LeaseResponse
+from ..services.rollup_service import refresh_property_rollup
+from ..utils.conditional import collection_version, not_modified, probe_etag, request_matches_etag, set_etag
+from ..utils.pagination import keyset_paginate, cached_count
+from ..utils.streaming import STREAM_QUERY_DESCRIPTION, StreamFormat, stream_rows_sync, streaming_response
 
 router = APIRouter()
 
 @router.get("/", response_model=List[LeaseResponse])
 async def list_leases(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     status: Optional[LeaseStatus] = None,
-    property_id: Optional[str] = None,
+    property_id: Optional[UUID] = None,
+    stream: Optional[StreamFormat] = Query(None, description=STREAM_QUERY_DESCRIPTION),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all leases with optional filtering"""
+    """
+    List all leases with optional filtering.
+    
+    The next page's cursor is returned in the X-Next-Cursor header and the
+    cached total (when include_total is set) in X-Total-Count. ``stream``
+    sends every matching lease in constant memory instead of a page. Returns
+    a weak ETag; a matching If-None-Match gets a 304.
+    """
     query = db.query(Lease)
     
     if status:
@@ -35,7 +52,35 @@ async def list_leases(
         from ..models.unit import Unit
         query = query.join(Unit).filter(Unit.property_id == property_id)
     
-    leases = query.offset(skip).limit(limit).all()
+    # is_expiring_soon moves with the date, so the ETag does too
+    etag = probe_etag(db, collection_version(query.statement, Lease.updated_at), weak=True, daily=True)
+    if request_matches_etag(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    if stream:
+        today = datetime.now().date()
+        
+        def serialize(lease):
+            lease.is_expiring_soon = (lease.end_date - today).days <= 60
+            return LeaseResponse.model_validate(lease).model_dump(mode="json")
+        
+        return streaming_response(
+            stream_rows_sync(db, query.order_by(Lease.created_at, Lease.id).statement, scalars=True),
+            serialize,
+            stream,
+        )
+    
+    if include_total:
+        response.headers["X-Total-Count"] = str(cached_count(query, ("leases", status, property_id)))
+    
+    if cursor or not skip:
+        leases, next_cursor = keyset_paginate(query, Lease, limit, cursor=cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    else:
+        # Legacy offset paging
+        leases = query.order_by(Lease.created_at, Lease.id).offset(skip).limit(limit).all()
     
     # Add computed fields
     for lease in leases:
@@ -45,11 +90,18 @@ async def list_leases(
 
 @router.get("/{lease_id}", response_model=LeaseResponse)
 async def get_lease(
-    lease_id: str,
+    lease_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get a specific lease by ID"""
+    """Get a specific lease by ID; a matching If-None-Match gets a 304 without loading it"""
+    etag = probe_etag(db, select(Lease.id, Lease.updated_at).filter(Lease.id == lease_id), daily=True)
+    if request_matches_etag(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
     lease = db.query(Lease).filter(Lease.id == lease_id).first()
     if not lease:
         raise HTTPException(status_code=404, detail="Lease not found")
@@ -70,7 +122,7 @@ async def create_lease(
     if not unit:
         raise HTTPException(status_code=404, detail="Unit not found")
     
-    if unit.status != UnitStatus.VACANT:
+    if unit.status != UnitStatus.AVAILABLE:
         raise HTTPException(status_code=400, detail="Unit is not available")
     
     # Verify tenant exists
@@ -89,6 +141,7 @@ async def create_lease(
     unit.status = UnitStatus.OCCUPIED
     unit.current_tenant_id = tenant.id
     
+    refresh_property_rollup(db, unit.property_id)
     db.commit()
     db.refresh(db_lease)
     
@@ -97,7 +150,7 @@ async def create_lease(
 
 @router.put("/{lease_id}", response_model=LeaseResponse)
 async def update_lease(
-    lease_id: str,
+    lease_id: UUID,
     lease_update: LeaseUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -118,7 +171,7 @@ async def update_lease(
 
 @router.post("/{lease_id}/sign")
 async def sign_lease(
-    lease_id: str,
+    lease_id: UUID,
     signature_data: dict,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -173,7 +226,7 @@ async def email_lease(
 
 @router.get("/{lease_id}/document")
 async def get_lease_document(
-    lease_id: str,
+    lease_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -201,7 +254,7 @@ async def get_lease_document(
 
 @router.post("/{lease_id}/terminate")
 async def terminate_lease(
-    lease_id: str,
+    lease_id: UUID,
     termination_data: dict = {},
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -220,8 +273,9 @@ async def terminate_lease(
     from ..models.unit import Unit, UnitStatus
     unit = db.query(Unit).filter(Unit.id == lease.unit_id).first()
     if unit:
-        unit.status = UnitStatus.VACANT
+        unit.status = UnitStatus.AVAILABLE
         unit.current_tenant_id = None
+        refresh_property_rollup(db, unit.property_id)
     
     db.commit()
     
@@ -244,6 +298,9 @@ async def get_expiring_leases(
         )
     ).all()
     
+    # Returns ORM entities, which only FastAPI's jsonable_encoder can render:
+    # deliberately left on that pass rather than json_response (see
+    # benchmarks/json_response_benchmark.py)
     return {
         "count": len(leases),
         "leases": leases,
@@ -1,40 +1,103 @@
 """
 Messaging API endpoints for unified communication hub
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import (
+    APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect,
+)
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, aliased, selectinload
+from sqlalchemy import or_, and_, desc, func, select, update
 from datetime import datetime
+import asyncio
+import json
 import uuid
+from uuid import UUID
 
-from ..database import get_db
+from ..database import AsyncSessionLocal, get_async_db
 from ..models import (
     User, Conversation, ConversationParticipant, Message, MessageAttachment,
     MessageTemplate, MessageType, ParticipantType, ConversationStatus,
     Property, Unit, Tenant, MaintenanceRequest
 )
+from .auth import get_websocket_user
 from ..services.auth_service import get_current_user
-from ..services.notification_service import NotificationService
+from ..services.inbox_service import record_message, mark_participant_read
+from ..services.outbox_service import queue_message_notifications
+from ..services.realtime_service import conversation_channel, hub as realtime_hub, user_channel
+from ..services.search_service import build_message_search, highlight_snippet
+from ..utils.conditional import (
+    collection_version, not_modified, probe_etag_async, request_matches_etag, set_etag,
+)
+from ..utils.pagination import keyset_paginate_async, cached_count_async
+from ..utils.responses import json_response
+from ..utils.streaming import STREAM_QUERY_DESCRIPTION, StreamFormat, stream_entities, streaming_response
 
 router = APIRouter(prefix="/messaging", tags=["messaging"])
 
-# Initialize notification service
-notification_service = NotificationService()
+async def _active_participant(db: AsyncSession, conversation_id, user_id) -> Optional[ConversationParticipant]:
+    return await db.scalar(select(ConversationParticipant).filter(
+        ConversationParticipant.conversation_id == conversation_id,
+        ConversationParticipant.user_id == user_id,
+        ConversationParticipant.is_active == True
+    ))
+
+
+async def _mark_read(db: AsyncSession, participant: ConversationParticipant) -> int:
+    """Mark messages from anyone else (system messages included) read and reset the unread counter; returns messages marked"""
+    result = await db.execute(update(Message).filter(
+        Message.conversation_id == participant.conversation_id,
+        or_(Message.sender_id.is_(None), Message.sender_id != participant.user_id),
+        Message.is_read == False
+    ).values(is_read=True, read_at=datetime.utcnow()))
+    
+    # Reset unread counter and last read time
+    mark_participant_read(db, participant)
+    return result.rowcount
+
+
+async def _publish_message(message: Message) -> None:
+    # One payload goes to every subscriber, the sender included; they compare sender_id
+    payload = message.to_dict()
+    payload.pop('is_from_me', None)
+    await realtime_hub.publish(conversation_channel(message.conversation_id), {
+        'type': 'message',
+        'conversation_id': str(message.conversation_id),
+        'message': payload,
+    })
+
+
+async def _publish_read(participant: ConversationParticipant) -> None:
+    await realtime_hub.publish(conversation_channel(participant.conversation_id), {
+        'type': 'read',
+        'conversation_id': str(participant.conversation_id),
+        'user_id': str(participant.user_id),
+        'read_at': participant.last_read_at.isoformat(),
+    })
 
 
 @router.get("/conversations")
 async def list_conversations(
+    request: Request,
+    response: Response,
     type: Optional[str] = None,
     status: Optional[str] = Query(None, description="Filter by status: active, archived, resolved"),
     limit: int = Query(50, le=100),
     offset: int = 0,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = True,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get list of conversations for current user"""
-    query = db.query(Conversation).join(
-        ConversationParticipant,
+    """
+    Get list of conversations for current user, most recent activity first.
+    
+    Reads the denormalized last message and unread counter, so a page is
+    one query regardless of its size. Returns a weak ETag; a matching
+    If-None-Match gets a 304.
+    """
+    query = select(ConversationParticipant).join(
+        Conversation,
         Conversation.id == ConversationParticipant.conversation_id
     ).filter(
         ConversationParticipant.user_id == current_user.id,
@@ -44,11 +107,7 @@ async def list_conversations(
     # Apply filters
     if type and type != 'all':
         if type == 'unread':
-            # Get conversations with unread messages
-            query = query.join(Message).filter(
-                Message.is_read == False,
-                Message.sender_id != current_user.id
-            ).distinct()
+            query = query.filter(ConversationParticipant.unread_count > 0)
         elif type == 'tenants':
             query = query.filter(
                 ConversationParticipant.participant_type == ParticipantType.TENANT
@@ -69,73 +128,99 @@ async def list_conversations(
         except ValueError:
             pass
     
-    # Order by last message time
-    query = query.order_by(desc(Conversation.last_message_at))
+    # New messages bump Conversation.updated_at; marking read stamps last_read_at
+    etag = await probe_etag_async(db, collection_version(
+        query, Conversation.updated_at, ConversationParticipant.last_read_at
+    ), weak=True)
+    if request_matches_etag(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    total = await cached_count_async(
+        db, query, ('conversations', current_user.id, type, status)
+    ) if include_total else None
+    
+    # Primary participant: first other participant, falling back to the current user
+    other = aliased(ConversationParticipant)
+    def other_participant(column):
+        return select(column).where(
+            other.conversation_id == Conversation.id,
+            other.user_id != current_user.id
+        ).order_by(other.joined_at, other.id).limit(1).scalar_subquery()
+    
+    page_query = query.outerjoin(
+        Property, Property.id == Conversation.property_id
+    ).outerjoin(
+        Unit, Unit.id == Conversation.unit_id
+    ).with_only_columns(
+        Conversation.id,
+        Conversation.created_at,
+        Conversation.last_message_at,
+        Conversation.last_message_preview,
+        Conversation.last_message_sender_id,
+        Conversation.is_urgent,
+        Conversation.maintenance_request_id,
+        ConversationParticipant.unread_count,
+        Property.name.label('property_name'),
+        Unit.unit_number,
+        func.coalesce(
+            other_participant(other.participant_name), ConversationParticipant.participant_name
+        ).label('participant_name'),
+        func.coalesce(
+            other_participant(other.participant_type), ConversationParticipant.participant_type
+        ).label('participant_type'),
+        # Keep ConversationParticipant as the FROM the joins above hang off
+        maintain_column_froms=True,
+    )
     
-    # Execute query
-    conversations = query.offset(offset).limit(limit).all()
+    # Order by last message time; keyset paging unless a legacy offset is given
+    if cursor or not offset:
+        conversations, next_cursor = await keyset_paginate_async(
+            db, page_query, Conversation, limit, cursor=cursor,
+            sort_column=Conversation.last_message_at, descending=True, scalars=False
+        )
+    else:
+        conversations = (await db.execute(page_query.order_by(
+            desc(Conversation.last_message_at), desc(Conversation.id)
+        ).offset(offset).limit(limit))).all()
+        next_cursor = None
     
     # Format response
     result = []
     for conv in conversations:
-        # Get last message
-        last_message = db.query(Message).filter(
-            Message.conversation_id == conv.id,
-            Message.is_deleted == False
-        ).order_by(desc(Message.created_at)).first()
-        
-        # Get primary participant (not current user)
-        participant = db.query(ConversationParticipant).filter(
-            ConversationParticipant.conversation_id == conv.id,
-            ConversationParticipant.user_id != current_user.id
-        ).first()
-        
-        if not participant:
-            # If no other participant, get current user as participant
-            participant = db.query(ConversationParticipant).filter(
-                ConversationParticipant.conversation_id == conv.id,
-                ConversationParticipant.user_id == current_user.id
-            ).first()
-        
-        # Count unread messages
-        unread_count = db.query(Message).filter(
-            Message.conversation_id == conv.id,
-            Message.sender_id != current_user.id,
-            Message.is_read == False
-        ).count()
-        
+        has_message = conv.last_message_preview is not None
         result.append({
             'id': str(conv.id),
-            'participant_name': participant.participant_name if participant else 'Unknown',
-            'participant_type': participant.participant_type.value if participant else None,
+            'participant_name': conv.participant_name or 'Unknown',
+            'participant_type': conv.participant_type.value if conv.participant_type else None,
             'participant_avatar': None,  # Would be fetched from user profile
-            'property_name': conv.property.name if conv.property else 'Multiple Properties',
-            'unit_number': conv.unit.unit_number if conv.unit else None,
+            'property_name': conv.property_name or 'Multiple Properties',
+            'unit_number': conv.unit_number,
             'last_message': {
-                'content': last_message.content if last_message else '',
-                'created_at': last_message.created_at.isoformat() if last_message else conv.created_at.isoformat(),
-                'is_from_me': last_message.sender_id == current_user.id if last_message else False
+                'content': conv.last_message_preview or '',
+                'created_at': (conv.last_message_at if has_message else conv.created_at).isoformat(),
+                'is_from_me': has_message and conv.last_message_sender_id == current_user.id
             },
-            'unread_count': unread_count,
+            'unread_count': conv.unread_count,
             'urgent': conv.is_urgent,
             'linked_ticket': {
                 'type': 'maintenance'
             } if conv.maintenance_request_id else None
         })
     
-    return {
+    return json_response({
         'conversations': result,
-        'total': query.count(),
+        'total': total,
         'limit': limit,
-        'offset': offset
-    }
+        'offset': offset,
+        'next_cursor': next_cursor
+    }, response)
 
 
 @router.post("/conversations")
 async def create_conversation(
     request: Dict[str, Any],
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new conversation"""
@@ -156,7 +241,7 @@ async def create_conversation(
         conversation.unit_id = request['unit_id']
     
     db.add(conversation)
-    db.flush()
+    await db.flush()
     
     # Add current user as participant
     current_participant = ConversationParticipant(
@@ -180,7 +265,7 @@ async def create_conversation(
     
     # Try to find user by name/email
     if request.get('recipient_email'):
-        user = db.query(User).filter(User.email == request['recipient_email']).first()
+        user = await db.scalar(select(User).filter(User.email == request['recipient_email']))
         if user:
             recipient.user_id = user.id
     
@@ -194,18 +279,25 @@ async def create_conversation(
             sender_name=f"{current_user.first_name} {current_user.last_name}",
             sender_type=ParticipantType.MANAGER,
             content=request['message'],
-            created_at=datetime.utcnow()
+            created_at=datetime.utcnow(),
+            attachments=[]
         )
         db.add(message)
+        await db.flush()
+        await db.run_sync(record_message, conversation, message)
         
-        # Schedule notification
-        background_tasks.add_task(
-            notification_service.send_message_notification,
-            recipient.user_id if recipient.user_id else None,
-            message
-        )
+        # Delivered by the notification worker once this commits
+        queue_message_notifications(db, message, [recipient.user_id], subject=conversation.subject)
     
-    db.commit()
+    await db.commit()
+    
+    # Open sockets of the participants join the new conversation from this event
+    for user_id in {current_user.id, recipient.user_id} - {None}:
+        await realtime_hub.publish(user_channel(user_id), {
+            'type': 'conversation',
+            'conversation_id': str(conversation.id),
+            'subject': conversation.subject,
+        })
     
     return {
         'id': str(conversation.id),
@@ -215,37 +307,60 @@ async def create_conversation(
 
 @router.get("/conversations/{conversation_id}")
 async def get_conversation(
-    conversation_id: str,
-    db: Session = Depends(get_db),
+    conversation_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get conversation details"""
+    """Get conversation details; a matching If-None-Match gets a 304 without loading them"""
     # Verify user has access
-    participant = db.query(ConversationParticipant).filter(
+    participant = await db.scalar(select(ConversationParticipant).filter(
         ConversationParticipant.conversation_id == conversation_id,
         ConversationParticipant.user_id == current_user.id,
         ConversationParticipant.is_active == True
-    ).first()
+    ))
     
     if not participant:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    conversation = db.query(Conversation).options(
+    # Version probe over the conversation, its property/unit and participant list
+    active_participants = select(ConversationParticipant.id).filter(
+        ConversationParticipant.conversation_id == Conversation.id,
+        ConversationParticipant.is_active == True
+    )
+    etag = await probe_etag_async(db, select(
+        Conversation.id,
+        Conversation.updated_at,
+        Property.updated_at,
+        Unit.updated_at,
+        active_participants.with_only_columns(func.count()).scalar_subquery(),
+        active_participants.with_only_columns(func.max(ConversationParticipant.joined_at)).scalar_subquery(),
+    ).outerjoin(
+        Property, Property.id == Conversation.property_id
+    ).outerjoin(
+        Unit, Unit.id == Conversation.unit_id
+    ).filter(Conversation.id == conversation_id))
+    if request_matches_etag(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    conversation = await db.scalar(select(Conversation).options(
         joinedload(Conversation.property),
         joinedload(Conversation.unit),
         joinedload(Conversation.tenant)
-    ).filter(Conversation.id == conversation_id).first()
+    ).filter(Conversation.id == conversation_id))
     
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
     # Get participants
-    participants = db.query(ConversationParticipant).filter(
+    participants = (await db.scalars(select(ConversationParticipant).filter(
         ConversationParticipant.conversation_id == conversation_id,
         ConversationParticipant.is_active == True
-    ).all()
+    ))).all()
     
-    return {
+    return json_response({
         'id': str(conversation.id),
         'type': conversation.type.value,
         'status': conversation.status.value,
@@ -263,45 +378,70 @@ async def get_conversation(
             } for p in participants
         ],
         'created_at': conversation.created_at.isoformat()
-    }
+    }, response)
 
 
 @router.get("/conversations/{conversation_id}/messages")
 async def get_messages(
-    conversation_id: str,
+    conversation_id: UUID,
     limit: int = Query(50, le=100),
     offset: int = 0,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor for older messages"),
+    include_total: bool = True,
+    stream: Optional[StreamFormat] = Query(None, description=STREAM_QUERY_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get messages in a conversation"""
+    """
+    Get messages in a conversation, newest page first.
+    
+    ``stream`` sends the whole history oldest first in constant memory; as
+    an export it leaves read state untouched.
+    """
     # Verify user has access
-    participant = db.query(ConversationParticipant).filter(
+    participant = await db.scalar(select(ConversationParticipant).filter(
         ConversationParticipant.conversation_id == conversation_id,
         ConversationParticipant.user_id == current_user.id,
         ConversationParticipant.is_active == True
-    ).first()
+    ))
     
     if not participant:
         raise HTTPException(status_code=403, detail="Access denied")
     
     # Get messages
-    messages = db.query(Message).filter(
+    message_query = select(Message).filter(
         Message.conversation_id == conversation_id,
         Message.is_deleted == False
-    ).order_by(desc(Message.created_at)).offset(offset).limit(limit).all()
-    
-    # Mark messages as read
-    db.query(Message).filter(
-        Message.conversation_id == conversation_id,
-        Message.sender_id != current_user.id,
-        Message.is_read == False
-    ).update({'is_read': True, 'read_at': datetime.utcnow()})
+    )
+    # Attachments are read by Message.to_dict; async sessions can't lazy-load them
+    page_query = message_query.options(selectinload(Message.attachments))
+    
+    if stream:
+        def serialize(msg):
+            msg_dict = msg.to_dict()
+            msg_dict['is_from_me'] = msg.sender_id == current_user.id
+            return msg_dict
+        
+        return streaming_response(
+            stream_entities(db, page_query.order_by(Message.created_at, Message.id), Message),
+            serialize,
+            stream,
+        )
     
-    # Update participant's last read time
-    participant.last_read_at = datetime.utcnow()
+    if cursor or not offset:
+        messages, next_cursor = await keyset_paginate_async(
+            db, page_query, Message, limit, cursor=cursor, descending=True
+        )
+    else:
+        messages = (await db.scalars(page_query.order_by(
+            desc(Message.created_at), desc(Message.id)
+        ).offset(offset).limit(limit))).all()
+        next_cursor = None
     
-    db.commit()
+    marked = await _mark_read(db, participant)
+    await db.commit()
+    if marked:
+        await _publish_read(participant)
     
     # Format messages
     result = []
@@ -310,32 +450,29 @@ async def get_messages(
         msg_dict['is_from_me'] = msg.sender_id == current_user.id
         result.append(msg_dict)
     
-    return {
+    return json_response({
         'messages': result,
-        'total': db.query(Message).filter(
-            Message.conversation_id == conversation_id,
-            Message.is_deleted == False
-        ).count(),
+        'total': await cached_count_async(db, message_query, ('messages', conversation_id)) if include_total else None,
         'limit': limit,
-        'offset': offset
-    }
+        'offset': offset,
+        'next_cursor': next_cursor
+    })
 
 
 @router.post("/conversations/{conversation_id}/messages")
 async def send_message(
-    conversation_id: str,
+    conversation_id: UUID,
     request: Dict[str, Any],
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Send a message in a conversation"""
     # Verify user has access and can reply
-    participant = db.query(ConversationParticipant).filter(
+    participant = await db.scalar(select(ConversationParticipant).filter(
         ConversationParticipant.conversation_id == conversation_id,
         ConversationParticipant.user_id == current_user.id,
         ConversationParticipant.is_active == True
-    ).first()
+    ))
     
     if not participant or not participant.can_reply:
         raise HTTPException(status_code=403, detail="Cannot send messages in this conversation")
@@ -348,35 +485,29 @@ async def send_message(
         sender_type=participant.participant_type,
         content=request['content'],
         content_type=request.get('content_type', 'text'),
-        created_at=datetime.utcnow()
+        created_at=datetime.utcnow(),
+        attachments=[]
     )
     
     db.add(message)
+    await db.flush()
     
-    # Update conversation last message time
-    conversation = db.query(Conversation).filter(
+    # Update conversation last message and recipients' unread counters
+    conversation = await db.scalar(select(Conversation).filter(
         Conversation.id == conversation_id
-    ).first()
-    conversation.last_message_at = datetime.utcnow()
-    conversation.updated_at = datetime.utcnow()
+    ))
+    await db.run_sync(record_message, conversation, message)
     
-    # Get other participants for notifications
-    other_participants = db.query(ConversationParticipant).filter(
+    # Notify the other participants; the outbox rows commit with the message
+    recipient_ids = (await db.scalars(select(ConversationParticipant.user_id).filter(
         ConversationParticipant.conversation_id == conversation_id,
         ConversationParticipant.user_id != current_user.id,
         ConversationParticipant.is_active == True
-    ).all()
-    
-    db.commit()
+    ))).all()
+    queue_message_notifications(db, message, recipient_ids, subject=conversation.subject)
     
-    # Send notifications
-    for participant in other_participants:
-        if participant.user_id:
-            background_tasks.add_task(
-                notification_service.send_message_notification,
-                participant.user_id,
-                message
-            )
+    await db.commit()
+    await _publish_message(message)
     
     return {
         'id': str(message.id),
@@ -386,58 +517,51 @@ async def send_message(
 
 @router.post("/conversations/{conversation_id}/mark-read")
 async def mark_conversation_read(
-    conversation_id: str,
-    db: Session = Depends(get_db),
+    conversation_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Mark all messages in conversation as read"""
     # Verify user has access
-    participant = db.query(ConversationParticipant).filter(
+    participant = await db.scalar(select(ConversationParticipant).filter(
         ConversationParticipant.conversation_id == conversation_id,
         ConversationParticipant.user_id == current_user.id,
         ConversationParticipant.is_active == True
-    ).first()
+    ))
     
     if not participant:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Mark messages as read
-    updated = db.query(Message).filter(
-        Message.conversation_id == conversation_id,
-        Message.sender_id != current_user.id,
-        Message.is_read == False
-    ).update({'is_read': True, 'read_at': datetime.utcnow()})
-    
-    # Update participant's last read time
-    participant.last_read_at = datetime.utcnow()
-    
-    db.commit()
+    marked = await _mark_read(db, participant)
+    await db.commit()
+    if marked:
+        await _publish_read(participant)
     
     return {
-        'messages_marked': updated
+        'messages_marked': marked
     }
 
 
 @router.put("/conversations/{conversation_id}/archive")
 async def archive_conversation(
-    conversation_id: str,
-    db: Session = Depends(get_db),
+    conversation_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Archive a conversation"""
     # Verify user has access
-    participant = db.query(ConversationParticipant).filter(
+    participant = await db.scalar(select(ConversationParticipant).filter(
         ConversationParticipant.conversation_id == conversation_id,
         ConversationParticipant.user_id == current_user.id,
         ConversationParticipant.is_active == True
-    ).first()
+    ))
     
     if not participant:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    conversation = db.query(Conversation).filter(
+    conversation = await db.scalar(select(Conversation).filter(
         Conversation.id == conversation_id
-    ).first()
+    ))
     
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
@@ -445,7 +569,7 @@ async def archive_conversation(
     conversation.status = ConversationStatus.ARCHIVED
     conversation.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     return {
         'status': 'archived'
@@ -455,11 +579,11 @@ async def archive_conversation(
 @router.get("/templates")
 async def list_message_templates(
     category: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get message templates"""
-    query = db.query(MessageTemplate).filter(
+    query = select(MessageTemplate).filter(
         or_(
             MessageTemplate.created_by_id == current_user.id,
             MessageTemplate.is_public == True
@@ -469,7 +593,7 @@ async def list_message_templates(
     if category:
         query = query.filter(MessageTemplate.category == category)
     
-    templates = query.order_by(desc(MessageTemplate.usage_count)).all()
+    templates = (await db.scalars(query.order_by(desc(MessageTemplate.usage_count)))).all()
     
     return {
         'templates': [
@@ -489,7 +613,7 @@ async def list_message_templates(
 @router.post("/templates")
 async def create_message_template(
     request: Dict[str, Any],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a message template"""
@@ -506,7 +630,7 @@ async def create_message_template(
     )
     
     db.add(template)
-    db.commit()
+    await db.commit()
     
     return {
         'id': str(template.id),
@@ -518,53 +642,153 @@ async def create_message_template(
 async def search_messages(
     q: str = Query(..., min_length=2),
     limit: int = Query(20, le=50),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor for older results"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Search messages across conversations"""
+    """Search messages across conversations, newest first"""
     # Get conversations user has access to
-    user_conversations = db.query(ConversationParticipant.conversation_id).filter(
+    user_conversations = select(ConversationParticipant.conversation_id).filter(
         ConversationParticipant.user_id == current_user.id,
         ConversationParticipant.is_active == True
     ).subquery()
     
-    # Search messages
-    messages = db.query(Message).filter(
-        Message.conversation_id.in_(user_conversations),
-        Message.content.ilike(f"%{q}%"),
-        Message.is_deleted == False
-    ).order_by(desc(Message.created_at)).limit(limit).all()
+    # Full-text match with the conversation subject and snippet in one query
+    search_query, sort_column, unique_sort = build_message_search(db, q)
+    search_query = search_query.filter(
+        Message.conversation_id.in_(select(user_conversations.c.conversation_id))
+    )
+    rows, next_cursor = await keyset_paginate_async(
+        db, search_query, Message, limit, cursor=cursor,
+        sort_column=sort_column, descending=True, unique_sort=unique_sort, scalars=False
+    )
     
     # Format results
-    results = []
-    for msg in messages:
-        conversation = db.query(Conversation).filter(
-            Conversation.id == msg.conversation_id
-        ).first()
-        
-        results.append({
-            'message_id': str(msg.id),
-            'conversation_id': str(msg.conversation_id),
-            'content': msg.content,
-            'sender_name': msg.sender_name,
-            'created_at': msg.created_at.isoformat(),
-            'conversation_subject': conversation.subject if conversation else None
-        })
+    results = [
+        {
+            'message_id': str(row.id),
+            'conversation_id': str(row.conversation_id),
+            'content': row.content,
+            'snippet': highlight_snippet(row.snippet),
+            'sender_name': row.sender_name,
+            'created_at': row.created_at.isoformat(),
+            'conversation_subject': row.conversation_subject
+        }
+        for row in rows
+    ]
     
     return {
         'results': results,
-        'query': q
+        'query': q,
+        'next_cursor': next_cursor
     }
 
 
-# Notification service placeholder
-class NotificationService:
-    """Placeholder for notification service"""
-    
-    async def send_message_notification(self, user_id: str, message: Message):
-        """Send notification about new message"""
-        # In production, this would:
-        # 1. Send push notification
-        # 2. Send email if enabled
-        # 3. Send SMS if enabled
-        print(f"Notification sent to user {user_id} about message {message.id}")
\ No newline at end of file
+async def _push_events(websocket: WebSocket, subscription) -> None:
+    """Forward the subscription's events; close the socket if it fell too far behind"""
+    while True:
+        payload = await subscription.next_event()
+        if payload is None:
+            # 1013 "try again later": the client reconnects and refetches
+            await websocket.close(code=1013, reason="Too many undelivered events")
+            return
+        await websocket.send_text(payload.decode())
+
+
+async def _handle_command(websocket: WebSocket, subscription, current_user: User, command: Dict[str, Any]) -> None:
+    kind = command.get('type')
+    if kind == 'ping':
+        await websocket.send_json({'type': 'pong'})
+        return
+    try:
+        conversation_id = UUID(str(command.get('conversation_id')))
+    except ValueError:
+        await websocket.send_json({'type': 'error', 'detail': 'Invalid conversation_id'})
+        return
+    channel = conversation_channel(conversation_id)
+    
+    if kind == 'unsubscribe':
+        await realtime_hub.leave(subscription, channel)
+    elif kind == 'typing':
+        # Joining checked access, so typing needs no database round trip
+        if channel not in subscription.channels:
+            await websocket.send_json({'type': 'error', 'detail': 'Not subscribed'})
+            return
+        await realtime_hub.publish(channel, {
+            'type': 'typing',
+            'conversation_id': str(conversation_id),
+            'user_id': str(current_user.id),
+            'name': f"{current_user.first_name} {current_user.last_name}",
+        })
+    elif kind in ('subscribe', 'read'):
+        async with AsyncSessionLocal() as db:
+            participant = await _active_participant(db, conversation_id, current_user.id)
+            if not participant:
+                await websocket.send_json({'type': 'error', 'detail': 'Access denied'})
+                return
+            if kind == 'subscribe':
+                await realtime_hub.join(subscription, channel)
+                return
+            marked = await _mark_read(db, participant)
+            await db.commit()
+        if marked:
+            await _publish_read(participant)
+    else:
+        await websocket.send_json({'type': 'error', 'detail': 'Unknown command'})
+
+
+@router.websocket("/ws")
+async def messaging_socket(
+    websocket: WebSocket,
+    current_user: User = Depends(get_websocket_user)
+):
+    """
+    Push channel for the messaging UI, in place of polling for messages.
+    
+    On connect the socket joins every active conversation of the user and
+    gets ``{"type": "ready", "conversations": [...]}``. Pushed events:
+    ``message`` (with the message as the messages endpoint renders it, minus
+    ``is_from_me``; compare ``sender_id``), ``read`` (a participant's read
+    receipt), ``typing`` and ``conversation`` (the user was added to one;
+    send ``subscribe`` to follow it).
+    
+    Client commands, as JSON: ``subscribe``/``unsubscribe``/``typing``/``read``
+    with a ``conversation_id``, and ``ping``. Database sessions are opened per
+    command, never held for the life of the socket.
+    """
+    await websocket.accept()
+    subscription = realtime_hub.subscribe()
+    pusher = None
+    try:
+        async with AsyncSessionLocal() as db:
+            conversation_ids = (await db.scalars(select(ConversationParticipant.conversation_id).filter(
+                ConversationParticipant.user_id == current_user.id,
+                ConversationParticipant.is_active == True
+            ))).all()
+        await realtime_hub.join(subscription, user_channel(current_user.id))
+        for conversation_id in conversation_ids:
+            await realtime_hub.join(subscription, conversation_channel(conversation_id))
+        await websocket.send_json({
+            'type': 'ready',
+            'conversations': [str(conversation_id) for conversation_id in conversation_ids]
+        })
+        
+        pusher = asyncio.create_task(_push_events(websocket, subscription))
+        while True:
+            try:
+                command = json.loads(await websocket.receive_text())
+            except ValueError:
+                await websocket.send_json({'type': 'error', 'detail': 'Invalid JSON'})
+                continue
+            if not isinstance(command, dict):
+                await websocket.send_json({'type': 'error', 'detail': 'Invalid command'})
+                continue
+            await _handle_command(websocket, subscription, current_user, command)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if pusher:
+            pusher.cancel()
+            await asyncio.gather(pusher, return_exceptions=True)
+        await realtime_hub.unsubscribe(subscription)
+
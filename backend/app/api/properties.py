@@ -1,22 +1,86 @@
 """
 Property API endpoints
 """
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, func, select
 from pydantic import BaseModel, Field
 from datetime import datetime
 
-from ..database import get_db
-from ..models import Property, PropertyType, Unit, User
+from ..database import get_async_db
+from ..models import Company, PortfolioRollup, Property, PropertyType, Unit, User
 from ..config import settings
+from ..services.cache_service import cache_response
+from ..services.metrics_service import get_property_metrics
+from ..services.rollup_service import refresh_property_rollup
+from ..services.search_service import apply_property_search
+from ..utils.conditional import (
+    collection_version, not_modified, probe_etag_async, request_matches_etag, set_etag,
+)
+from ..utils.pagination import keyset_paginate_async, cached_count_async, encode_cursor
+from ..utils.streaming import (
+    STREAM_QUERY_DESCRIPTION, StreamFormat, csv_response, ndjson_response, stream_entities, stream_rows,
+    streaming_response,
+)
 
 
 router = APIRouter()
 
 
+def _property_select():
+    """select(Property) with units eager-loaded for the occupancy_rate property"""
+    return select(Property).options(selectinload(Property.units))
+
+
+async def _get_property(db: AsyncSession, property_id: UUID) -> Optional[Property]:
+    """Load one property with its units, refreshing any copy already in the session"""
+    return await db.scalar(_property_select().filter(
+        Property.id == property_id,
+        # Property.company_id == current_user.company_id  # TODO: Add company filter
+    ).execution_options(populate_existing=True))
+
+
+PROPERTY_EXPORT_COLUMNS = (
+    "id", "name", "property_type", "address_line1", "address_line2", "city", "state",
+    "postal_code", "country", "year_built", "total_units", "total_square_feet",
+    "purchase_price", "current_value", "monthly_operating_expenses", "is_active", "created_at",
+)
+
+
+async def _owning_company_id(db: AsyncSession, company_id: Optional[UUID]) -> UUID:
+    """
+    The company a new property belongs to: ``company_id`` if it exists, or
+    the only company on record when none is given
+    """
+    if company_id is not None:
+        if await db.scalar(select(Company.id).filter(Company.id == company_id)) is None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Company not found"
+            )
+        return company_id
+    
+    company_ids = (await db.scalars(select(Company.id).limit(2))).all()
+    if len(company_ids) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="company_id is required" if company_ids else "Create a company first"
+        )
+    return company_ids[0]
+
+
+def _property_version(property_id: UUID):
+    """Version probe for one property: its updated_at plus its units' (occupancy_rate)"""
+    return select(
+        Property.id, Property.updated_at, func.count(Unit.id), func.max(Unit.updated_at)
+    ).outerjoin(Unit, Unit.property_id == Property.id).filter(
+        Property.id == property_id
+    ).group_by(Property.id)
+
+
 # Pydantic schemas
 class PropertyBase(BaseModel):
     name: str
@@ -40,7 +104,8 @@ class PropertyBase(BaseModel):
 
 
 class PropertyCreate(PropertyBase):
-    pass
+    # TODO: Take from current_user.company_id once authentication is implemented
+    company_id: Optional[UUID] = None
 
 
 class PropertyUpdate(BaseModel):
@@ -79,30 +144,42 @@ class PropertyResponse(PropertyBase):
 
 
 class PropertyListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
     results: List[PropertyResponse]
 
 
 # API Endpoints
 @router.get("/", response_model=PropertyListResponse)
 async def list_properties(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(True, description="Include a cached total count"),
     property_type: Optional[PropertyType] = None,
     city: Optional[str] = None,
     state: Optional[str] = None,
     is_active: Optional[bool] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
+    stream: Optional[StreamFormat] = Query(None, description=STREAM_QUERY_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
-    List properties with pagination and filtering
+    List properties with pagination and filtering.
+    
+    Pass ``cursor`` from the previous response for constant-time keyset
+    paging; ``page`` is kept for existing clients. ``search`` prefix-matches
+    name, address and city and orders results by relevance (paged by ``page``).
+    ``stream`` sends every match in constant memory instead of a page.
+    Returns a weak ETag; a matching ``If-None-Match`` gets a 304.
     """
     # Build query
-    query = db.query(Property)
+    query = _property_select()
     
     # Apply filters
     filters = []
@@ -122,28 +199,66 @@ async def list_properties(
     if is_active is not None:
         filters.append(Property.is_active == is_active)
     
-    if search:
-        search_filter = or_(
-            Property.name.ilike(f"%{search}%"),
-            Property.address_line1.ilike(f"%{search}%"),
-            Property.city.ilike(f"%{search}%"),
-        )
-        filters.append(search_filter)
-    
     if filters:
         query = query.filter(and_(*filters))
     
-    # Get total count
-    total = query.count()
+    # Full-text search (tsvector/pg_trgm on Postgres, FTS5 on SQLite)
+    search_rank = None
+    if search:
+        query, search_rank = apply_property_search(query, search, dialect=db.bind.dialect.name)
+    
+    # Weak ETag over the filtered set; company rollup rows change with any occupancy change
+    etag = await probe_etag_async(db, collection_version(query, Property.updated_at).add_columns(
+        select(func.max(PortfolioRollup.updated_at)).filter(
+            PortfolioRollup.property_id.is_(None)
+        ).scalar_subquery()
+    ), weak=True)
+    if request_matches_etag(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    if stream:
+        # Units for occupancy_rate are selectin-loaded per batch
+        order = (search_rank, Property.created_at, Property.id) if search_rank is not None \
+            else (Property.created_at, Property.id)
+        return streaming_response(
+            stream_entities(db, query.order_by(*order), Property),
+            lambda property: PropertyResponse.model_validate(property).model_dump(mode="json"),
+            stream,
+        )
+    
+    # Get total count (cached per filter set)
+    total = None
+    if include_total:
+        total = await cached_count_async(db, query, (
+            "properties", property_type, city, state, is_active, search
+        ))
     
     # Apply pagination
-    offset = (page - 1) * page_size
-    properties = query.offset(offset).limit(page_size).all()
+    if search_rank is not None:
+        # Ranked results page by offset; relevance order has no stable keyset
+        offset = (page - 1) * page_size
+        properties = (await db.scalars(query.order_by(
+            search_rank, Property.created_at, Property.id
+        ).offset(offset).limit(page_size))).all()
+        next_cursor = None
+    elif cursor or page == 1:
+        properties, next_cursor = await keyset_paginate_async(db, query, Property, page_size, cursor=cursor)
+    else:
+        # Legacy offset paging
+        offset = (page - 1) * page_size
+        properties = (await db.scalars(
+            query.order_by(Property.created_at, Property.id).offset(offset).limit(page_size)
+        )).all()
+        next_cursor = None
+        if len(properties) == page_size:
+            next_cursor = encode_cursor(properties[-1].created_at, properties[-1].id)
     
     return PropertyListResponse(
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
         results=properties
     )
 
@@ -151,7 +266,7 @@ async def list_properties(
 @router.post("/", response_model=PropertyResponse, status_code=status.HTTP_201_CREATED)
 async def create_property(
     property_data: PropertyCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
@@ -163,31 +278,59 @@ async def create_property(
     
     # Create property
     property = Property(
-        **property_data.dict(),
+        **property_data.dict(exclude={"company_id"}),
         # company_id=current_user.company_id  # TODO: Set from current user
-        company_id=UUID("123e4567-e89b-12d3-a456-426614174000")  # Placeholder
+        company_id=await _owning_company_id(db, property_data.company_id)
     )
     
     db.add(property)
-    db.commit()
-    db.refresh(property)
+    await db.flush()
+    await db.run_sync(refresh_property_rollup, property.id)
+    await db.commit()
     
-    return property
+    return await _get_property(db, property.id)
+
+
+@router.get("/export")
+async def export_properties(
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    is_active: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_db),
+    # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
+):
+    """
+    Stream every property as CSV or NDJSON
+    """
+    query = select(*[getattr(Property, column) for column in PROPERTY_EXPORT_COLUMNS])
+    
+    # TODO: Add company filter based on current user
+    if is_active is not None:
+        query = query.filter(Property.is_active == is_active)
+    
+    batches = stream_rows(db, query.order_by(Property.created_at, Property.id))
+    if format == "ndjson":
+        return ndjson_response(batches, lambda row: row._asdict(), filename="properties.ndjson")
+    return csv_response(batches, PROPERTY_EXPORT_COLUMNS, lambda row: row._asdict(), filename="properties.csv")
 
 
 @router.get("/{property_id}", response_model=PropertyResponse)
 async def get_property(
     property_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
-    Get a single property by ID
+    Get a single property by ID. A matching ``If-None-Match`` gets a 304
+    without loading the property.
     """
-    property = db.query(Property).filter(
-        Property.id == property_id,
-        # Property.company_id == current_user.company_id  # TODO: Add company filter
-    ).first()
+    etag = await probe_etag_async(db, _property_version(property_id))
+    if request_matches_etag(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    property = await _get_property(db, property_id)
     
     if not property:
         raise HTTPException(
@@ -202,7 +345,7 @@ async def get_property(
 async def update_property(
     property_id: UUID,
     property_update: PropertyUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
@@ -212,10 +355,7 @@ async def update_property(
     # if not current_user.has_permission("property:update"):
     #     raise HTTPException(status_code=403, detail="Not authorized to update properties")
     
-    property = db.query(Property).filter(
-        Property.id == property_id,
-        # Property.company_id == current_user.company_id  # TODO: Add company filter
-    ).first()
+    property = await _get_property(db, property_id)
     
     if not property:
         raise HTTPException(
@@ -228,8 +368,8 @@ async def update_property(
     for field, value in update_data.items():
         setattr(property, field, value)
     
-    db.commit()
-    db.refresh(property)
+    await db.run_sync(refresh_property_rollup, property.id)
+    await db.commit()
     
     return property
 
@@ -237,7 +377,7 @@ async def update_property(
 @router.delete("/{property_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_property(
     property_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
@@ -247,10 +387,10 @@ async def delete_property(
     # if not current_user.has_permission("property:delete"):
     #     raise HTTPException(status_code=403, detail="Not authorized to delete properties")
     
-    property = db.query(Property).filter(
+    property = await db.scalar(select(Property).filter(
         Property.id == property_id,
         # Property.company_id == current_user.company_id  # TODO: Add company filter
-    ).first()
+    ))
     
     if not property:
         raise HTTPException(
@@ -260,7 +400,7 @@ async def delete_property(
     
     # Soft delete
     property.is_active = False
-    db.commit()
+    await db.commit()
     
     return None
 
@@ -268,16 +408,16 @@ async def delete_property(
 @router.get("/{property_id}/units", response_model=List[dict])
 async def get_property_units(
     property_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
     Get all units for a property
     """
-    property = db.query(Property).filter(
+    property = await db.scalar(select(Property).filter(
         Property.id == property_id,
         # Property.company_id == current_user.company_id  # TODO: Add company filter
-    ).first()
+    ))
     
     if not property:
         raise HTTPException(
@@ -285,25 +425,27 @@ async def get_property_units(
             detail="Property not found"
         )
     
-    units = db.query(Unit).filter(Unit.property_id == property_id).all()
+    units = (await db.scalars(select(Unit).filter(Unit.property_id == property_id))).all()
     
     # Convert to dict for now, you should create proper Pydantic schemas
     return [unit.to_dict() for unit in units]
 
 
 @router.get("/{property_id}/statistics")
+@cache_response()
 async def get_property_statistics(
+    request: Request,
     property_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
     Get property statistics (occupancy, revenue, etc.)
     """
-    property = db.query(Property).filter(
+    property = await db.scalar(select(Property).filter(
         Property.id == property_id,
         # Property.company_id == current_user.company_id  # TODO: Add company filter
-    ).first()
+    ))
     
     if not property:
         raise HTTPException(
@@ -311,28 +453,19 @@ async def get_property_statistics(
             detail="Property not found"
         )
     
-    # Calculate statistics
-    total_units = property.total_units
-    occupied_units = db.query(Unit).filter(
-        Unit.property_id == property_id,
-        Unit.status == "occupied"
-    ).count()
-    
-    available_units = db.query(Unit).filter(
-        Unit.property_id == property_id,
-        Unit.status == "available"
-    ).count()
+    # Calculate statistics with grouped SQL aggregates (shared with the dashboard)
+    metrics = await db.run_sync(get_property_metrics, property_id)
     
-    maintenance_units = db.query(Unit).filter(
-        Unit.property_id == property_id,
-        Unit.status == "maintenance"
-    ).count()
+    total_units = metrics["total_units"]
+    occupied_units = metrics["occupied_units"]
+    available_units = metrics["available_units"]
+    maintenance_units = metrics["maintenance_units"]
     
     # Calculate financial metrics
-    monthly_revenue = property.monthly_revenue
-    annual_revenue = property.annual_revenue
-    occupancy_rate = property.occupancy_rate
-    net_operating_income = property.net_operating_income
+    monthly_revenue = metrics["monthly_revenue"]
+    annual_revenue = metrics["annual_revenue"]
+    occupancy_rate = metrics["occupancy_rate"]
+    net_operating_income = metrics["net_operating_income"]
     
     # Get maintenance requests count (if maintenance model exists)
     # open_maintenance = db.query(MaintenanceRequest).filter(
@@ -357,7 +490,7 @@ async def get_property_statistics(
             "available": available_units,
             "maintenance": maintenance_units,
             "total": total_units,
-            "vacant": property.vacant_units
+            "vacant": metrics["vacant_units"]
         },
         "financial": {
             "monthly_revenue": monthly_revenue,
@@ -1,17 +1,29 @@
 """
 Units API endpoints
 """
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import func, select
 from pydantic import BaseModel, Field
 from datetime import datetime
 
-from ..database import get_db
-from ..models import Unit, UnitStatus, UnitType, Property, Lease
+from ..database import get_async_db, get_db
+from ..models import Unit, UnitStatus, UnitType, Property, Lease, Tenant
 from ..config import settings
+from ..services.rollup_service import refresh_property_rollup
+from ..services.unit_import_service import UNIT_COLUMNS, import_units, read_import_rows, unit_type_for_bedrooms
+from ..services.unit_response_service import dump_unit, dump_unit_list, unit_payload, unit_select
+from ..utils.conditional import (
+    collection_version, not_modified, probe_etag_async, request_matches_etag, set_etag,
+)
+from ..utils.pagination import keyset_paginate_async, cached_count_async
+from ..utils.streaming import (
+    STREAM_QUERY_DESCRIPTION, StreamFormat, csv_response, ndjson_response, stream_rows, streaming_response,
+)
 
 
 router = APIRouter()
@@ -93,25 +105,51 @@ class UnitResponse(BaseModel):
 
 
 class UnitListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
     results: List[UnitResponse]
 
 
+async def _unit_row(db: AsyncSession, unit_id) -> Optional[Row]:
+    """One unit's payload columns (``unit_select``), or None"""
+    result = await db.execute(unit_select().filter(
+        Unit.id == unit_id,
+        # Property.company_id == current_user.company_id  # TODO: Add company filter
+    ))
+    return result.first()
+
+
+def _json_response(body: bytes, status_code: int = status.HTTP_200_OK, etag: Optional[str] = None) -> Response:
+    """Pre-encoded JSON body; FastAPI's response_model pass is skipped"""
+    response = Response(content=body, status_code=status_code, media_type="application/json")
+    set_etag(response, etag)
+    return response
+
+
 # API Endpoints
 @router.get("/", response_model=UnitListResponse)
 async def list_units(
+    request: Request,
     property_id: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size; omit to list every unit"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(True, description="Include a cached total count when paginating"),
+    stream: Optional[StreamFormat] = Query(None, description=STREAM_QUERY_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
-    List units with optional filtering
+    List units with optional filtering.
+    
+    Keyset-paginated when ``limit`` or ``cursor`` is given; otherwise every
+    matching unit is returned for existing clients. ``stream`` sends every
+    matching unit in constant memory instead. Returns a weak ETag; a
+    matching ``If-None-Match`` gets a 304.
     """
-    # Build query
-    query = db.query(Unit).join(
-        Property, Unit.property_id == Property.id
-    )
+    # Column-only select: property name and active tenant come from joins,
+    # rows never enter the identity map
+    query = unit_select()
     
     # TODO: Add company filter based on current user
     # query = query.filter(Property.company_id == current_user.company_id)
@@ -130,77 +168,56 @@ async def list_units(
         unit_status = status_map.get(status, status)
         query = query.filter(Unit.status == unit_status)
     
-    units = query.all()
-    
-    # Enrich unit data
-    unit_responses = []
-    for unit in units:
-        unit_dict = {
-            'id': unit.id,
-            'unit_number': unit.unit_number,
-            'unit_type': unit.unit_type,
-            'floor': unit.floor,
-            'status': unit.status,
-            'bedrooms': unit.bedrooms,
-            'bathrooms': unit.bathrooms,
-            'square_feet': unit.square_feet,
-            'market_rent': unit.market_rent,
-            'rent_amount': unit.market_rent,  # Alias
-            'deposit_amount': unit.deposit_amount,
-            'is_furnished': unit.is_furnished,
-            'features': unit.features or [],
-            'amenities': unit.features or [],  # Alias
-            'utilities_included': unit.utilities_included or [],
-            'notes': unit.notes,
-            'property_id': unit.property_id,
-            'property_name': unit.property_ref.name if unit.property_ref else None,
-            'tenant_name': None,
-            'lease_end': None,
-            'days_on_market': 0,
-            'last_maintenance': unit.updated_at,  # Placeholder
-            'created_at': unit.created_at,
-            'updated_at': unit.updated_at
-        }
-        
-        # Get current tenant info if occupied
-        if unit.status == UnitStatus.OCCUPIED:
-            active_lease = db.query(Lease).filter(
-                Lease.unit_id == unit.id,
-                Lease.status == 'active'
-            ).first()
-            
-            if active_lease and active_lease.tenant:
-                unit_dict['tenant_name'] = f"{active_lease.tenant.first_name} {active_lease.tenant.last_name}"
-                unit_dict['lease_end'] = active_lease.end_date
-        
-        # Calculate days on market for vacant units
-        if unit.status == UnitStatus.AVAILABLE:
-            # Simple calculation - days since last updated
-            days_vacant = (datetime.utcnow() - unit.updated_at).days
-            unit_dict['days_on_market'] = days_vacant
-        
-        unit_responses.append(UnitResponse(**unit_dict))
-    
-    return UnitListResponse(
-        total=len(unit_responses),
-        results=unit_responses
+    # Weak ETag over the filtered set (property and tenant names come from
+    # the joins; days_on_market moves with the date)
+    etag = await probe_etag_async(
+        db,
+        collection_version(query, Unit.updated_at, Property.updated_at, Lease.updated_at, Tenant.updated_at),
+        weak=True, daily=True,
     )
+    if request_matches_etag(request, etag):
+        return not_modified(etag)
+    
+    if stream:
+        # Batches come straight off a server-side cursor
+        now = datetime.utcnow()
+        streamed = streaming_response(
+            stream_rows(db, query.order_by(Unit.created_at, Unit.id)),
+            lambda row: unit_payload(row, now),
+            stream,
+        )
+        set_etag(streamed, etag)
+        return streamed
+    
+    total = None
+    if limit is not None or cursor:
+        rows, next_cursor = await keyset_paginate_async(
+            db, query, Unit, limit or settings.DEFAULT_PAGE_SIZE, cursor=cursor, scalars=False
+        )
+        if include_total:
+            total = await cached_count_async(db, query, ("units", property_id, status))
+    else:
+        rows = (await db.execute(query.order_by(Unit.created_at, Unit.id))).all()
+        next_cursor = None
+        total = len(rows)
+    
+    return _json_response(dump_unit_list(rows, total, next_cursor), etag=etag)
 
 
 @router.post("/", response_model=UnitResponse, status_code=status.HTTP_201_CREATED)
 async def create_unit(
     unit_data: UnitCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
     Create a new unit
     """
     # TODO: Verify property belongs to user's company
-    property = db.query(Property).filter(
+    property = await db.scalar(select(Property).filter(
         Property.id == unit_data.property_id,
         # Property.company_id == current_user.company_id
-    ).first()
+    ))
     
     if not property:
         raise HTTPException(
@@ -209,10 +226,10 @@ async def create_unit(
         )
     
     # Check if unit number already exists in this property
-    existing = db.query(Unit).filter(
+    existing = await db.scalar(select(Unit.id).filter(
         Unit.property_id == unit_data.property_id,
         Unit.unit_number == unit_data.unit_number
-    ).first()
+    ).limit(1))
     
     if existing:
         raise HTTPException(
@@ -221,15 +238,11 @@ async def create_unit(
         )
     
     # Determine unit type based on bedrooms
-    unit_type = UnitType.STUDIO if unit_data.bedrooms == 0 else \
-                UnitType.ONE_BEDROOM if unit_data.bedrooms == 1 else \
-                UnitType.TWO_BEDROOM if unit_data.bedrooms == 2 else \
-                UnitType.THREE_BEDROOM if unit_data.bedrooms == 3 else \
-                UnitType.FOUR_BEDROOM
+    unit_type = unit_type_for_bedrooms(unit_data.bedrooms)
     
     # Create unit
     unit = Unit(
-        property_id=unit_data.property_id,
+        property_id=property.id,
         unit_number=unit_data.unit_number,
         unit_type=unit_type,
         bedrooms=unit_data.bedrooms,
@@ -245,111 +258,118 @@ async def create_unit(
     db.add(unit)
     
     # Update property unit count
-    property.total_units = db.query(Unit).filter(
+    property.total_units = await db.scalar(select(func.count(Unit.id)).filter(
         Unit.property_id == property.id
-    ).count() + 1
-    
-    db.commit()
-    db.refresh(unit)
-    
-    # Return enriched response
-    return UnitResponse(
-        id=unit.id,
-        unit_number=unit.unit_number,
-        unit_type=unit.unit_type,
-        floor=unit.floor,
-        status=unit.status,
-        bedrooms=unit.bedrooms,
-        bathrooms=unit.bathrooms,
-        square_feet=unit.square_feet,
-        market_rent=unit.market_rent,
-        rent_amount=unit.market_rent,
-        deposit_amount=unit.deposit_amount,
-        is_furnished=unit.is_furnished,
-        features=unit.features or [],
-        amenities=unit.features or [],
-        utilities_included=unit.utilities_included or [],
-        notes=unit.notes,
-        property_id=unit.property_id,
-        property_name=property.name,
-        tenant_name=None,
-        lease_end=None,
-        days_on_market=0,
-        last_maintenance=unit.updated_at,
-        created_at=unit.created_at,
-        updated_at=unit.updated_at
-    )
+    )) + 1
+    
+    # Rollup maintenance is sync ORM code; run_sync drives it on this session
+    await db.run_sync(refresh_property_rollup, property.id)
+    await db.commit()
+    
+    return _json_response(dump_unit(await _unit_row(db, unit.id)), status.HTTP_201_CREATED)
+
+
+@router.post("/import")
+def import_units_upload(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON (one unit object per line)"),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults from the file extension"),
+    db: Session = Depends(get_db),
+    # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
+):
+    """
+    Bulk-create units from an upload.
+    
+    Columns match the export (``rent_amount``/``amenities`` are accepted as
+    aliases; list cells in CSV are ';'-separated). Rows are validated and
+    inserted in chunks, and each property's unit count and rollup are
+    refreshed once. Nothing is imported if any row is invalid; the response
+    then lists the row errors.
+    """
+    if format is None:
+        format = "ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv"
+    
+    # Sync route: parsing and executemany run in the threadpool, off the event loop
+    result = import_units(db, read_import_rows(file.file, format))
+    
+    if result["errors"]:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=result
+        )
+    
+    return result
+
+
+@router.get("/export")
+async def export_units(
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    property_id: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
+):
+    """
+    Stream every unit (optionally one property's) as CSV or NDJSON, in the
+    format the import endpoint accepts
+    """
+    query = select(*[getattr(Unit, column) for column in UNIT_COLUMNS])
+    
+    # TODO: Add company filter based on current user
+    if property_id:
+        query = query.filter(Unit.property_id == property_id)
+    
+    batches = stream_rows(db, query.order_by(Unit.created_at, Unit.id))
+    if format == "ndjson":
+        return ndjson_response(batches, lambda row: row._asdict(), filename="units.ndjson")
+    return csv_response(batches, UNIT_COLUMNS, lambda row: row._asdict(), filename="units.csv")
 
 
 @router.get("/{unit_id}", response_model=UnitResponse)
 async def get_unit(
     unit_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
-    Get a single unit by ID
+    Get a single unit by ID. A matching ``If-None-Match`` gets a 304
+    without loading the unit.
     """
-    unit = db.query(Unit).join(
-        Property, Unit.property_id == Property.id
-    ).filter(
-        Unit.id == unit_id,
-        # Property.company_id == current_user.company_id  # TODO: Add company filter
-    ).first()
+    etag = await probe_etag_async(db, unit_select().with_only_columns(
+        Unit.id, Unit.updated_at, Property.updated_at, Lease.id, Lease.updated_at, Tenant.updated_at,
+        maintain_column_froms=True,
+    ).filter(Unit.id == unit_id), daily=True)
+    if request_matches_etag(request, etag):
+        return not_modified(etag)
     
-    if not unit:
+    row = await _unit_row(db, unit_id)
+    
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Unit not found"
         )
     
-    # Build response
-    unit_dict = {
-        'id': unit.id,
-        'unit_number': unit.unit_number,
-        'unit_type': unit.unit_type,
-        'floor': unit.floor,
-        'status': unit.status,
-        'bedrooms': unit.bedrooms,
-        'bathrooms': unit.bathrooms,
-        'square_feet': unit.square_feet,
-        'market_rent': unit.market_rent,
-        'rent_amount': unit.market_rent,
-        'deposit_amount': unit.deposit_amount,
-        'is_furnished': unit.is_furnished,
-        'features': unit.features or [],
-        'amenities': unit.features or [],
-        'utilities_included': unit.utilities_included or [],
-        'notes': unit.notes,
-        'property_id': unit.property_id,
-        'property_name': unit.property_ref.name if unit.property_ref else None,
-        'tenant_name': None,
-        'lease_end': None,
-        'days_on_market': 0,
-        'last_maintenance': unit.updated_at,
-        'created_at': unit.created_at,
-        'updated_at': unit.updated_at
-    }
-    
-    return UnitResponse(**unit_dict)
+    return _json_response(dump_unit(row), etag=etag)
 
 
 @router.patch("/{unit_id}", response_model=UnitResponse)
 async def update_unit(
     unit_id: UUID,
     unit_update: UnitUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
     Update a unit
     """
-    unit = db.query(Unit).join(
+    unit = await db.scalar(select(Unit).join(
         Property, Unit.property_id == Property.id
+    ).options(
+        contains_eager(Unit.property_ref)
     ).filter(
         Unit.id == unit_id,
         # Property.company_id == current_user.company_id  # TODO: Add company filter
-    ).first()
+    ))
     
     if not unit:
         raise HTTPException(
@@ -362,55 +382,29 @@ async def update_unit(
     for field, value in update_data.items():
         setattr(unit, field, value)
     
-    db.commit()
-    db.refresh(unit)
-    
-    # Build response
-    unit_dict = {
-        'id': unit.id,
-        'unit_number': unit.unit_number,
-        'unit_type': unit.unit_type,
-        'floor': unit.floor,
-        'status': unit.status,
-        'bedrooms': unit.bedrooms,
-        'bathrooms': unit.bathrooms,
-        'square_feet': unit.square_feet,
-        'market_rent': unit.market_rent,
-        'rent_amount': unit.market_rent,
-        'deposit_amount': unit.deposit_amount,
-        'is_furnished': unit.is_furnished,
-        'features': unit.features or [],
-        'amenities': unit.features or [],
-        'utilities_included': unit.utilities_included or [],
-        'notes': unit.notes,
-        'property_id': unit.property_id,
-        'property_name': unit.property_ref.name if unit.property_ref else None,
-        'tenant_name': None,
-        'lease_end': None,
-        'days_on_market': 0,
-        'last_maintenance': unit.updated_at,
-        'created_at': unit.created_at,
-        'updated_at': unit.updated_at
-    }
-    
-    return UnitResponse(**unit_dict)
+    await db.run_sync(refresh_property_rollup, unit.property_id)
+    await db.commit()
+    
+    return _json_response(dump_unit(await _unit_row(db, unit.id)))
 
 
 @router.delete("/{unit_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_unit(
     unit_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user)  # TODO: Implement authentication
 ):
     """
     Delete a unit
     """
-    unit = db.query(Unit).join(
+    unit = await db.scalar(select(Unit).join(
         Property, Unit.property_id == Property.id
+    ).options(
+        contains_eager(Unit.property_ref)
     ).filter(
         Unit.id == unit_id,
         # Property.company_id == current_user.company_id  # TODO: Add company filter
-    ).first()
+    ))
     
     if not unit:
         raise HTTPException(
@@ -419,10 +413,10 @@ async def delete_unit(
         )
     
     # Check if unit has active lease
-    active_lease = db.query(Lease).filter(
+    active_lease = await db.scalar(select(Lease.id).filter(
         Lease.unit_id == unit_id,
         Lease.status == 'active'
-    ).first()
+    ).limit(1))
     
     if active_lease:
         raise HTTPException(
@@ -431,13 +425,14 @@ async def delete_unit(
         )
     
     # Delete unit
-    db.delete(unit)
+    await db.delete(unit)
     
     # Update property unit count
-    unit.property_ref.total_units = db.query(Unit).filter(
+    unit.property_ref.total_units = await db.scalar(select(func.count(Unit.id)).filter(
         Unit.property_id == unit.property_id
-    ).count() - 1
+    )) - 1
     
-    db.commit()
+    await db.run_sync(refresh_property_rollup, unit.property_id)
+    await db.commit()
     
     return None
\ No newline at end of file
@@ -2,7 +2,7 @@
 Application configuration settings
 """
 import os
-from typing import Optional
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn, validator, Field
 from typing import Union
@@ -42,6 +42,29 @@ class Settings(BaseSettings):
         # Default to SQLite for development
         return "sqlite:///./property_mgmt.db"
     
+    # Connection pools (sync and async engines each get one per worker).
+    # Pre-ping and recycle only apply to server databases; SQLite files use a
+    # plain pool and in-memory SQLite a single shared connection.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # seconds; below the server/proxy idle timeout
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 500  # compiled SQL statements cached per engine
+    DB_ASYNCPG_STATEMENT_CACHE_SIZE: int = 100  # prepared statements per asyncpg connection; 0 behind PgBouncer
+
+    # SQLite profile, applied to every connection the engines open. WAL lets
+    # readers run alongside the single writer; NORMAL sync is durable across
+    # application crashes in WAL mode (only an OS crash can drop the last
+    # commits). Disable to run on SQLite's defaults.
+    SQLITE_PRAGMAS_ENABLED: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # bytes of the file read through mmap
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024  # page cache per connection
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # wait this long for the write lock before "database is locked"
+    SQLITE_FOREIGN_KEYS: bool = True
+    
     # Security settings
     SECRET_KEY: str = "dev-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
@@ -74,6 +97,30 @@ class Settings(BaseSettings):
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
     
+    # Request instrumentation (Server-Timing, request logs, /metrics)
+    INSTRUMENTATION_ENABLED: bool = True
+    SLOW_REQUEST_MS: float = 1000.0
+
+    # Response cache for polled dashboard endpoints ("memory", "redis" or "none")
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_URL: str = ""
+    RESPONSE_CACHE_TTL: float = 30.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+
+    # WebSocket fan-out for messaging ("memory" for one worker, "redis" across workers)
+    REALTIME_BACKEND: str = "memory"
+    REALTIME_URL: str = ""
+    REALTIME_QUEUE_SIZE: int = 256  # undelivered events per connection before it is dropped
+
+    # Notification outbox and its worker (notification_worker.py)
+    OUTBOX_DIGEST_WINDOW: float = 30.0  # seconds a queued notification waits, so bursts share a digest
+    OUTBOX_BATCH_SIZE: int = 200
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_CLAIM_TIMEOUT: float = 300.0  # claimed rows older than this are taken over (worker crashed)
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_RETRY_BASE: float = 10.0  # first retry delay in seconds; doubles per attempt
+    OUTBOX_RETRY_MAX: float = 3600.0
+
     # AI Services API Keys
     OPENAI_API_KEY: str = ""
     GEMINI_API_KEY: str = ""
@@ -82,6 +129,20 @@ class Settings(BaseSettings):
     TWILIO_AUTH_TOKEN: str = ""
     TWILIO_PHONE_NUMBER: str = ""
     
+    # Provider call limits, per worker. Calls past the timeout (including the
+    # wait for a slot) fall back to the mock responses.
+    AI_REQUEST_TIMEOUT: float = 30.0
+    AI_MAX_CONCURRENCY: int = 8
+    AI_PROVIDER_TIMEOUTS: Dict[str, float] = {"twilio": 10.0}
+    AI_PROVIDER_CONCURRENCY: Dict[str, int] = {"elevenlabs": 2, "twilio": 4}
+    AI_ANALYSIS_CONCURRENCY: int = 16  # unit optimizations in flight per /ai/analyze-portfolio request
+    AI_PORTFOLIO_MAX_UNITS: int = 10000
+
+    # Parsed completions cached in a SQLite file shared by the workers on a host ("" disables)
+    AI_CACHE_PATH: str = "./ai_cache.db"
+    AI_CACHE_TTL: float = 7 * 24 * 3600.0
+    AI_CACHE_MAX_ENTRIES: int = 50000
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,25 +1,143 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.pool import NullPool, StaticPool
+from typing import Any, AsyncGenerator, Dict, Generator, List
 
 from .config import settings
+from .utils.instrumentation import (
+    TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_engine, instrument_pool,
+)
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Pool and cache arguments for ``create_engine``/``create_async_engine``,
+    by dialect:
+
+    - Postgres: a sized, timed pool with pre-ping and recycle (stale
+      connections behind load balancers and PgBouncer)
+    - SQLite file: a sized, timed pool; nothing to ping or recycle. aiosqlite
+      keeps NullPool, since each pooled connection would pin a worker thread
+    - SQLite in-memory: one shared connection, the only way every session
+      sees the same database
+    """
+    url = make_url(url)
+    options: Dict[str, Any] = {"query_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    sized_pool = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+    if url.get_backend_name() == "sqlite":
+        if _is_memory_sqlite(url):
+            options.update(poolclass=StaticPool, connect_args={"check_same_thread": False})
+        elif is_async:
+            options.update(poolclass=NullPool)
+        else:
+            options.update(poolclass=TimedQueuePool, **sized_pool)
+        return options
+
+    options.update(
+        poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        **sized_pool,
+    )
+    return options
+
+
+def sqlite_pragmas() -> List[str]:
+    """
+    The SQLite profile from settings, as PRAGMA statements. ``journal_mode``
+    is stored in the database file; the rest only last for the connection,
+    so they are applied to each one as it opens.
+    """
+    if not settings.SQLITE_PRAGMAS_ENABLED:
+        return []
+    return [
+        f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}",
+        # Negative values are KiB rather than pages
+        f"PRAGMA cache_size = -{int(settings.SQLITE_CACHE_SIZE_KB)}",
+        f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA foreign_keys = {'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF'}",
+    ]
+
+
+def configure_sqlite(engine: Engine) -> None:
+    """Apply ``sqlite_pragmas`` on every new connection of a SQLite engine (sync or aiosqlite)"""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas()
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
 
 
 # Create database engine
-engine = create_engine(
-    str(settings.DATABASE_URL),
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-)
+engine = create_engine(str(settings.DATABASE_URL), **engine_options(str(settings.DATABASE_URL)))
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(url: str) -> str:
+    """
+    Swap the configured sync driver for its asyncio counterpart:
+    asyncpg for Postgres, aiosqlite for SQLite.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "postgresql":
+        query = dict(url.query)
+        # asyncpg spells libpq's sslmode as ssl
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        query.setdefault("prepared_statement_cache_size", str(settings.DB_ASYNCPG_STATEMENT_CACHE_SIZE))
+        url = url.set(drivername="postgresql+asyncpg", query=query)
+    elif url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+# Async engine for routes that must not block the event loop
+ASYNC_DATABASE_URL = async_database_url(str(settings.DATABASE_URL))
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+
+# WAL, page cache, busy timeout and foreign keys on each SQLite connection
+configure_sqlite(engine)
+configure_sqlite(async_engine.sync_engine)
+
+# Count and time every statement for the per-request instrumentation
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+# Checkout waits and live pool state for /metrics and /metrics/pool
+instrument_pool(engine, "sync")
+instrument_pool(async_engine.sync_engine, "async")
+
+# Objects stay usable after commit; async sessions can't lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -36,6 +154,15 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async counterpart of get_db. Queries are awaited, so a slow query
+    no longer stalls every other request on the event loop.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db() -> None:
     """
     Initialize database tables
@@ -48,6 +175,12 @@ def init_db() -> None:
         unit,
         tenant,
         lease,
+        rollup,
+        notification,
     )
     
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+
+    # Full-text search objects live outside the ORM metadata
+    from .services.search_service import install_search
+    install_search(engine)
\ No newline at end of file
@@ -1,14 +1,18 @@
 """
 Main FastAPI application entry point
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
 from .config import settings
-from .database import init_db
+from .database import async_engine, init_db
 from .api import api_router
+from .services.ai_service import ai_service
+from .services.realtime_service import hub as realtime_hub
+from .utils.instrumentation import InstrumentationMiddleware, pool_status, render_metrics
+from .utils.responses import FastJSONResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,6 +33,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down...")
+    await realtime_hub.close()
+    await async_engine.dispose()
 
 
 # Create FastAPI app
@@ -37,6 +43,8 @@ app = FastAPI(
     version=settings.APP_VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     lifespan=lifespan,
+    # orjson rendering; see utils/responses.py
+    default_response_class=FastJSONResponse,
 )
 
 # Configure CORS
@@ -46,8 +54,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "Server-Timing", "ETag"],
 )
 
+# Per-request SQL counts and latency; added last so it also times CORS
+if settings.INSTRUMENTATION_ENABLED:
+    app.add_middleware(InstrumentationMiddleware, slow_request_ms=settings.SLOW_REQUEST_MS)
+
 
 # Root endpoint
 @app.get("/")
@@ -75,6 +88,28 @@ async def health_check():
     }
 
 
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Request latency, DB time and statement count histograms per route, and
+    the LLM response cache counters
+    """
+    body = render_metrics()
+    if ai_service.cache:
+        body += ai_service.cache.render()
+    return Response(body, media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/pool", include_in_schema=False)
+async def pool_metrics():
+    """
+    Live connection pool state for this worker: size, checked out, overflow
+    and checkout wait, per engine
+    """
+    return pool_status()
+
+
 # Include API routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
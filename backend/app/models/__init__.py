@@ -14,6 +14,8 @@ from .messaging import (
     Conversation, ConversationParticipant, Message, MessageAttachment, MessageTemplate,
     MessageType, ParticipantType, ConversationStatus
 )
+from .rollup import PortfolioRollup
+from .notification import NotificationOutbox, OutboxStatus
 
 __all__ = [
     # Base
@@ -64,4 +66,11 @@ __all__ = [
     "MessageType",
     "ParticipantType",
     "ConversationStatus",
+    
+    # Rollups
+    "PortfolioRollup",
+    
+    # Notifications
+    "NotificationOutbox",
+    "OutboxStatus",
 ]
\ No newline at end of file
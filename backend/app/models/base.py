@@ -3,22 +3,63 @@ Base model class with common fields and methods
 """
 from datetime import datetime
 from typing import Any
+import os
+import time
 import uuid
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import BINARY, Column, DateTime
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.declarative import declared_attr
+from sqlalchemy.types import TypeDecorator
 
 from ..database import Base
-from ..config import settings
 
 
-# Helper function for UUID/String column type
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (version 7): a 48-bit millisecond timestamp followed
+    by random bits. New keys land at the end of the primary key index
+    instead of on a random page.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
+class GUID(TypeDecorator):
+    """
+    UUID column: native ``uuid`` on Postgres, 16 raw bytes (BINARY(16)) on
+    SQLite. Accepts UUIDs or their string form and always returns
+    ``uuid.UUID``, so keys compare and join the same way on both.
+    """
+    impl = BINARY(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(BINARY(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if dialect.name == "postgresql" else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        if isinstance(value, str):
+            # Row written before the binary key migration
+            return uuid.UUID(value)
+        return uuid.UUID(bytes=bytes(value))
+
+
+# Helper function for UUID columns (primary and foreign keys)
 def get_uuid_column():
-    """Get appropriate ID column type based on database"""
-    if 'sqlite' in str(settings.DATABASE_URL):
-        return String(36)
-    else:
-        from sqlalchemy.dialects.postgresql import UUID
-        return UUID(as_uuid=True)
+    """Get the ID column type (native UUID on Postgres, BINARY(16) on SQLite)"""
+    return GUID()
 
 
 class BaseModel(Base):
@@ -27,14 +68,10 @@ class BaseModel(Base):
     """
     __abstract__ = True
     
-    # Use String for SQLite, UUID for PostgreSQL
+    # Native UUID on Postgres, BINARY(16) on SQLite; time-ordered for index locality
     @declared_attr
     def id(cls):
-        if 'sqlite' in str(settings.DATABASE_URL):
-            return Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-        else:
-            from sqlalchemy.dialects.postgresql import UUID
-            return Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+        return Column(GUID(), primary_key=True, default=uuid7)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
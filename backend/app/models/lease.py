@@ -1,8 +1,8 @@
 """
 Lease model
 """
-from sqlalchemy import Column, String, Float, Boolean, Date, ForeignKey, JSON, Enum as SQLEnum, CheckConstraint, Integer
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Float, Boolean, Date, ForeignKey, JSON, Enum as SQLEnum, CheckConstraint, Integer, Index, select
+from sqlalchemy.orm import aliased, relationship
 import enum
 from datetime import date
 
@@ -35,6 +35,10 @@ class Lease(BaseModel):
         CheckConstraint('end_date > start_date', name='check_end_date_after_start_date'),
         CheckConstraint('rent_amount > 0', name='check_positive_rent'),
         CheckConstraint('deposit_amount >= 0', name='check_non_negative_deposit'),
+        Index('ix_leases_unit_id_status', 'unit_id', 'status'),
+        Index('ix_leases_status_end_date', 'status', 'end_date'),
+        Index('ix_leases_tenant_id', 'tenant_id'),
+        Index('ix_leases_created_at_id', 'created_at', 'id'),
     )
     
     # Lease Information
@@ -116,4 +120,17 @@ class Lease(BaseModel):
         return self.rent_amount + (self.pet_deposit / 12 if self.pets_allowed and self.pet_deposit else 0)
     
     def __repr__(self):
-        return f"<Lease(number='{self.lease_number}', status='{self.status}', id='{self.id}')>"
\ No newline at end of file
+        return f"<Lease(number='{self.lease_number}', status='{self.status}', id='{self.id}')>"
+
+
+def latest_active_lease_id():
+    """
+    Id of the latest active lease (by start date) on ``Lease.unit_id``, as a
+    subquery correlated to ``Lease``. A unit can hold more than one active
+    lease; this picks the one that counts as the unit's current lease.
+    """
+    active = aliased(Lease)
+    return select(active.id).where(
+        active.unit_id == Lease.unit_id,
+        active.status == LeaseStatus.ACTIVE,
+    ).order_by(active.start_date.desc(), active.id.desc()).limit(1).correlate(Lease).scalar_subquery()
@@ -6,7 +6,7 @@ from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
 
-from .base import BaseModel
+from .base import BaseModel, get_uuid_column
 
 
 class MaintenanceStatus(str, enum.Enum):
@@ -38,10 +38,10 @@ class MaintenanceRequest(BaseModel):
     status = Column(Enum(MaintenanceStatus), default=MaintenanceStatus.PENDING, nullable=False)
     
     # Location
-    unit_id = Column(String, ForeignKey("units.id"), nullable=False)
+    unit_id = Column(get_uuid_column(), ForeignKey("units.id"), nullable=False)
     
     # Requestor Information
-    tenant_id = Column(String, ForeignKey("tenants.id"))  # Optional - can be reported by staff
+    tenant_id = Column(get_uuid_column(), ForeignKey("tenants.id"))  # Optional - can be reported by staff
     reported_by_name = Column(String(255))
     reported_by_phone = Column(String(50))
     reported_by_email = Column(String(255))
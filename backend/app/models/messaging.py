@@ -1,13 +1,12 @@
 """
 Messaging models for unified communication hub
 """
-from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, ForeignKey, JSON, Enum as SQLAlchemyEnum
+from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, ForeignKey, JSON, Enum as SQLAlchemyEnum, Index
 from sqlalchemy.orm import relationship as db_relationship
 from datetime import datetime
-import uuid
 import enum
 
-from .base import BaseModel
+from .base import BaseModel, get_uuid_column, uuid7
 
 
 class MessageType(enum.Enum):
@@ -40,29 +39,32 @@ class ConversationStatus(enum.Enum):
 class Conversation(BaseModel):
     """Conversation between participants"""
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index('ix_conversations_last_message_at_id', 'last_message_at', 'id'),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(get_uuid_column(), primary_key=True, default=uuid7)
     type = Column(SQLAlchemyEnum(MessageType), default=MessageType.DIRECT)
     status = Column(SQLAlchemyEnum(ConversationStatus), default=ConversationStatus.ACTIVE)
     
     # Participants
-    created_by_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    created_by_id = Column(get_uuid_column(), ForeignKey("users.id"), nullable=False)
     created_by = db_relationship("User", foreign_keys=[created_by_id])
     
     # Subject/Topic
     subject = Column(String(255))
     
     # Related entities
-    property_id = Column(String(36), ForeignKey("properties.id"))
+    property_id = Column(get_uuid_column(), ForeignKey("properties.id"))
     property = db_relationship("Property")
     
-    unit_id = Column(String(36), ForeignKey("units.id"))
+    unit_id = Column(get_uuid_column(), ForeignKey("units.id"))
     unit = db_relationship("Unit")
     
-    tenant_id = Column(String(36), ForeignKey("tenants.id"))
+    tenant_id = Column(get_uuid_column(), ForeignKey("tenants.id"))
     tenant = db_relationship("Tenant")
     
-    maintenance_request_id = Column(String(36), ForeignKey("maintenance_requests.id"))
+    maintenance_request_id = Column(get_uuid_column(), ForeignKey("maintenance_requests.id"))
     maintenance_request = db_relationship("MaintenanceRequest")
     
     # Metadata
@@ -75,6 +77,11 @@ class Conversation(BaseModel):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     last_message_at = Column(DateTime, default=datetime.utcnow)
     
+    # Denormalized last message for the inbox (maintained by inbox_service)
+    last_message_id = Column(get_uuid_column())
+    last_message_sender_id = Column(get_uuid_column())
+    last_message_preview = Column(String(255))
+    
     # Relationships
     messages = db_relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
     participants = db_relationship("ConversationParticipant", back_populates="conversation", cascade="all, delete-orphan")
@@ -99,13 +106,17 @@ class Conversation(BaseModel):
 class ConversationParticipant(BaseModel):
     """Participants in a conversation"""
     __tablename__ = "conversation_participants"
+    __table_args__ = (
+        Index('ix_conversation_participants_user_id_active', 'user_id', 'is_active', 'conversation_id'),
+        Index('ix_conversation_participants_conversation_id_user_id', 'conversation_id', 'user_id'),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    conversation_id = Column(String(36), ForeignKey("conversations.id"), nullable=False)
+    id = Column(get_uuid_column(), primary_key=True, default=uuid7)
+    conversation_id = Column(get_uuid_column(), ForeignKey("conversations.id"), nullable=False)
     conversation = db_relationship("Conversation", back_populates="participants")
     
     # Participant info
-    user_id = Column(String(36), ForeignKey("users.id"))
+    user_id = Column(get_uuid_column(), ForeignKey("users.id"))
     user = db_relationship("User")
     
     participant_type = Column(SQLAlchemyEnum(ParticipantType), nullable=False)
@@ -124,6 +135,9 @@ class ConversationParticipant(BaseModel):
     last_read_at = Column(DateTime)
     is_active = Column(Boolean, default=True)
     
+    # Messages from others since last read (maintained by inbox_service)
+    unread_count = Column(Integer, default=0, nullable=False)
+    
     # Notifications
     email_notifications = Column(Boolean, default=True)
     sms_notifications = Column(Boolean, default=False)
@@ -133,13 +147,18 @@ class ConversationParticipant(BaseModel):
 class Message(BaseModel):
     """Individual messages in conversations"""
     __tablename__ = "messages"
-    
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    conversation_id = Column(String(36), ForeignKey("conversations.id"), nullable=False)
+    __table_args__ = (
+        Index('ix_messages_conversation_id_created_at', 'conversation_id', 'created_at', 'id'),
+        Index('ix_messages_conversation_id_unread', 'conversation_id', 'is_read', 'sender_id'),
+        Index('ix_messages_sender_id', 'sender_id'),
+    )
+    
+    id = Column(get_uuid_column(), primary_key=True, default=uuid7)
+    conversation_id = Column(get_uuid_column(), ForeignKey("conversations.id"), nullable=False)
     conversation = db_relationship("Conversation", back_populates="messages")
     
     # Sender
-    sender_id = Column(String(36), ForeignKey("users.id"))
+    sender_id = Column(get_uuid_column(), ForeignKey("users.id"))
     sender = db_relationship("User")
     sender_name = Column(String(255), nullable=False)
     sender_type = Column(SQLAlchemyEnum(ParticipantType))
@@ -188,8 +207,8 @@ class MessageAttachment(BaseModel):
     """Attachments for messages"""
     __tablename__ = "message_attachments"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    message_id = Column(String(36), ForeignKey("messages.id"), nullable=False)
+    id = Column(get_uuid_column(), primary_key=True, default=uuid7)
+    message_id = Column(get_uuid_column(), ForeignKey("messages.id"), nullable=False)
     message = db_relationship("Message", back_populates="attachments")
     
     # File info
@@ -224,7 +243,7 @@ class MessageTemplate(BaseModel):
     """Reusable message templates"""
     __tablename__ = "message_templates"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(get_uuid_column(), primary_key=True, default=uuid7)
     
     # Template info
     name = Column(String(255), nullable=False)
@@ -240,7 +259,7 @@ class MessageTemplate(BaseModel):
     last_used_at = Column(DateTime)
     
     # Ownership
-    created_by_id = Column(String(36), ForeignKey("users.id"))
+    created_by_id = Column(get_uuid_column(), ForeignKey("users.id"))
     created_by = db_relationship("User")
     is_public = Column(Boolean, default=False)
     
@@ -0,0 +1,51 @@
+"""
+Notification outbox model
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, JSON, String, Text, Enum as SQLAlchemyEnum
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import enum
+
+from .base import BaseModel, get_uuid_column
+
+
+class OutboxStatus(str, enum.Enum):
+    """Delivery state of an outbox row; delivered rows are deleted"""
+    PENDING = "pending"
+    PROCESSING = "processing"
+    FAILED = "failed"
+
+
+class NotificationOutbox(BaseModel):
+    """
+    A notification waiting to be delivered.
+
+    Rows are added in the same transaction as the write they announce, so a
+    committed message always has its notifications queued and a rolled back
+    one never does. The notification worker (``notification_worker.py``)
+    claims due rows in batches and sends one digest per recipient.
+    """
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index('ix_notification_outbox_status_available_at', 'status', 'available_at'),
+    )
+
+    recipient_id = Column(get_uuid_column(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    recipient = relationship("User")
+
+    # What happened
+    kind = Column(String(50), nullable=False, default="message")
+    conversation_id = Column(get_uuid_column())
+    message_id = Column(get_uuid_column())
+    payload = Column(JSON, default=dict)  # sender_name, subject, preview
+
+    # Delivery
+    status = Column(SQLAlchemyEnum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # not claimed before this
+    attempts = Column(Integer, default=0, nullable=False)
+    claimed_by = Column(String(100))
+    claimed_at = Column(DateTime)
+    last_error = Column(Text)
+
+    def __repr__(self):
+        return f"<NotificationOutbox {self.kind} to {self.recipient_id} ({self.status.value})>"
@@ -1,7 +1,7 @@
 """
 Property model
 """
-from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, JSON, Enum as SQLEnum, Table, DateTime
+from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, JSON, Enum as SQLEnum, Table, DateTime, Index
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
@@ -37,6 +37,10 @@ class Property(BaseModel):
     Property model representing real estate properties
     """
     __tablename__ = "properties"
+    __table_args__ = (
+        Index('ix_properties_company_id_created_at', 'company_id', 'created_at'),
+        Index('ix_properties_created_at_id', 'created_at', 'id'),
+    )
     
     # Basic Information
     name = Column(String(255), nullable=False)
@@ -0,0 +1,49 @@
+"""
+Portfolio rollup model
+"""
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from .base import BaseModel, get_uuid_column
+
+
+class PortfolioRollup(BaseModel):
+    """
+    Materialized occupancy and revenue totals.
+
+    One row per property plus one company-wide row (``property_id`` is NULL)
+    per company, kept current by the write endpoints so dashboard reads are a
+    single indexed lookup instead of a scan over ``units``.
+    """
+    __tablename__ = "portfolio_rollups"
+    __table_args__ = (
+        UniqueConstraint('company_id', 'property_id', name='uq_portfolio_rollup_scope'),
+        Index('ix_portfolio_rollups_property_id', 'property_id'),
+    )
+
+    # Scope
+    company_id = Column(get_uuid_column(), ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    property_id = Column(get_uuid_column(), ForeignKey("properties.id", ondelete="CASCADE"))
+
+    # Counts
+    property_count = Column(Integer, default=0, nullable=False)
+    total_units = Column(Integer, default=0, nullable=False)  # Sum of Property.total_units
+    unit_count = Column(Integer, default=0, nullable=False)  # Actual unit rows
+    occupied_units = Column(Integer, default=0, nullable=False)
+    available_units = Column(Integer, default=0, nullable=False)
+    maintenance_units = Column(Integer, default=0, nullable=False)
+
+    # Financial
+    monthly_revenue = Column(Float, default=0, nullable=False)
+    monthly_expenses = Column(Float, default=0, nullable=False)
+
+    # Relationships
+    property_ref = relationship("Property")
+
+    @property
+    def is_company_total(self):
+        """Check if this row holds company-wide totals"""
+        return self.property_id is None
+
+    def __repr__(self):
+        return f"<PortfolioRollup(company_id='{self.company_id}', property_id='{self.property_id}', id='{self.id}')>"
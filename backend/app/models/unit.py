@@ -1,12 +1,13 @@
 """
 Unit model
 """
-from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, JSON, Enum as SQLEnum, Index, and_
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 import enum
 
 from .base import BaseModel, get_uuid_column
+from .lease import Lease, latest_active_lease_id
 
 
 class UnitStatus(str, enum.Enum):
@@ -35,6 +36,11 @@ class Unit(BaseModel):
     Unit model representing individual rental units within a property
     """
     __tablename__ = "units"
+    __table_args__ = (
+        Index('ix_units_property_id_status', 'property_id', 'status'),
+        Index('ix_units_status', 'status'),
+        Index('ix_units_created_at_id', 'created_at', 'id'),
+    )
     
     # Basic Information
     unit_number = Column(String(50), nullable=False)
@@ -72,6 +78,13 @@ class Unit(BaseModel):
     property_ref = relationship("Property", back_populates="units")
     leases = relationship("Lease", back_populates="unit")
     maintenance_requests = relationship("MaintenanceRequest", back_populates="unit")
+    # The latest active lease, as unit_response_service picks it
+    active_lease = relationship(
+        "Lease",
+        primaryjoin=lambda: and_(Unit.id == Lease.unit_id, Lease.id == latest_active_lease_id()),
+        uselist=False,
+        viewonly=True
+    )
     
     @property
     def is_occupied(self):
@@ -86,10 +99,8 @@ class Unit(BaseModel):
     @property
     def current_tenant(self):
         """Get current tenant if unit is occupied"""
-        # Find active lease
-        for lease in self.leases:
-            if lease.status == 'active':
-                return lease.tenant
+        if self.active_lease:
+            return self.active_lease.tenant
         return None
     
     @property
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import AliasChoices, BaseModel, EmailStr, Field
 from typing import Optional, List, Dict
 from datetime import date
+from uuid import UUID
 from enum import Enum
 
 # Property Schemas
@@ -19,7 +20,7 @@ class PropertyUpdate(PropertyBase):
     address: Optional[Dict[str, str]] = None
 
 class PropertyResponse(PropertyBase):
-    id: str
+    id: UUID
     total_units: int = 0
     occupied_units: int = 0
     monthly_revenue: float = 0
@@ -31,7 +32,7 @@ class PropertyResponse(PropertyBase):
 # Unit Schemas
 class UnitBase(BaseModel):
     unit_number: str
-    property_id: str
+    property_id: UUID
     bedrooms: int = 1
     bathrooms: float = 1.0
     square_feet: Optional[int] = None
@@ -48,7 +49,7 @@ class UnitUpdate(UnitBase):
     status: Optional[str] = None
 
 class UnitResponse(UnitBase):
-    id: str
+    id: UUID
     status: str
     property_name: Optional[str] = None
     
@@ -68,7 +69,7 @@ class TenantCreate(TenantBase):
     pass
 
 class TenantResponse(TenantBase):
-    id: str
+    id: UUID
     full_name: str
     
     class Config:
@@ -76,8 +77,8 @@ class TenantResponse(TenantBase):
 
 # Lease Schemas
 class LeaseBase(BaseModel):
-    unit_id: str
-    tenant_id: str
+    unit_id: UUID
+    tenant_id: UUID
     start_date: date
     end_date: date
     monthly_rent: float
@@ -95,7 +96,9 @@ class LeaseUpdate(BaseModel):
     auto_renew: Optional[bool] = None
 
 class LeaseResponse(LeaseBase):
-    id: str
+    id: UUID
+    # The Lease model stores this as rent_amount
+    monthly_rent: float = Field(validation_alias=AliasChoices("monthly_rent", "rent_amount"))
     status: str
     is_expiring_soon: bool
     
@@ -104,7 +107,7 @@ class LeaseResponse(LeaseBase):
 
 # Payment Schemas
 class PaymentBase(BaseModel):
-    lease_id: str
+    lease_id: UUID
     amount: float
     payment_type: str = "rent"
     payment_method: Optional[str] = None
@@ -114,8 +117,8 @@ class PaymentCreate(PaymentBase):
     payment_date: Optional[date] = None
 
 class PaymentResponse(PaymentBase):
-    id: str
-    tenant_id: str
+    id: UUID
+    tenant_id: UUID
     payment_date: date
     status: str
     
@@ -1,12 +1,15 @@
 """
 AI-powered property management services
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator, Awaitable, Callable
 import json
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import logging
 from ..config import settings
+from .llm_cache_service import cache_key, create_cache
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +42,75 @@ except ImportError:
     TWILIO_AVAILABLE = False
     logger.warning("Twilio library not installed. Install with: pip install twilio")
 
+PROVIDERS = ("openai", "gemini", "elevenlabs", "twilio")
+
+
+class ProviderGate:
+    """
+    Concurrency limit and timeout for one provider's calls.
+
+    Async SDK calls are awaited under the limit; blocking SDKs run on the
+    gate's own threads (as many as the limit), never on the event loop. The
+    timeout covers waiting for a slot plus the call, and raises
+    ``asyncio.TimeoutError``. Cancelling the caller cancels an async request;
+    a blocking call can't be interrupted and finishes on its thread, which
+    stays counted against the limit until it does.
+    """
+    
+    def __init__(self, name: str, max_concurrency: int, timeout: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"ai-{name}")
+        self.in_flight = 0
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+    
+    async def run(self, call: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Await an async SDK call within the limit and timeout"""
+        return await self._guard(self._limited(call, *args, **kwargs))
+    
+    async def run_sync(self, call: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking SDK call on the gate's threads within the limit and timeout"""
+        loop = asyncio.get_running_loop()
+        return await self._guard(self._limited(
+            loop.run_in_executor, self._executor, functools.partial(call, *args, **kwargs)
+        ))
+    
+    async def _limited(self, call, *args, **kwargs):
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                self.in_flight -= 1
+    
+    async def _guard(self, awaitable) -> Any:
+        self.calls += 1
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"{self.name} call timed out after {self.timeout}s")
+            raise
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            'max_concurrency': self.max_concurrency,
+            'timeout_s': self.timeout,
+            'in_flight': self.in_flight,
+            'calls': self.calls,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+        }
+
 
 class AIPropertyManager:
     """World-class AI service for property management"""
@@ -49,10 +121,24 @@ class AIPropertyManager:
         self.gemini_vision = None
         self.twilio_client = None
         
+        # Every provider call goes through its gate: bounded, timed, off the event loop
+        self.gates = {
+            name: ProviderGate(
+                name,
+                settings.AI_PROVIDER_CONCURRENCY.get(name, settings.AI_MAX_CONCURRENCY),
+                settings.AI_PROVIDER_TIMEOUTS.get(name, settings.AI_REQUEST_TIMEOUT),
+            )
+            for name in PROVIDERS
+        }
+        # Parsed completions, shared by the workers on this host; None when AI_CACHE_PATH is empty
+        self.cache = create_cache()
+        
         # Initialize AI clients if available and configured
         if OPENAI_AVAILABLE and settings.OPENAI_API_KEY:
             try:
-                self.openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+                self.openai_client = openai.AsyncOpenAI(
+                    api_key=settings.OPENAI_API_KEY, timeout=self.gates['openai'].timeout
+                )
                 logger.info("OpenAI client initialized")
             except Exception as e:
                 logger.error(f"Failed to initialize OpenAI: {e}")
@@ -80,6 +166,24 @@ class AIPropertyManager:
             except Exception as e:
                 logger.error(f"Failed to initialize Twilio: {e}")
     
+    async def complete(self, **kwargs):
+        """``chat.completions.create`` on the async OpenAI client, within the openai gate"""
+        return await self.gates['openai'].run(self.openai_client.chat.completions.create, **kwargs)
+    
+    async def complete_json(self, model: str, messages: List[Dict], **params) -> Any:
+        """
+        ``complete`` with the reply parsed as JSON, served from the response
+        cache when the same request was answered before (or is in flight)
+        """
+        async def compute():
+            response = await self.complete(model=model, messages=messages, **params)
+            return json.loads(response.choices[0].message.content)
+        
+        if self.cache is None:
+            return await compute()
+        key = cache_key('openai', model, messages, **params)
+        return await self.cache.get_or_compute(key, 'openai', model, compute)
+    
     async def optimize_rent_advanced(self, unit_data: Dict, market_data: Dict) -> Dict:
         """Advanced rent optimization using GPT-4 with market analysis"""
         
@@ -111,7 +215,7 @@ class AIPropertyManager:
         """
         
         try:
-            response = await self.openai_client.chat.completions.create(
+            result = await self.complete_json(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are a data-driven real estate pricing expert. Always provide specific, actionable recommendations backed by analysis. Respond in valid JSON format."},
@@ -121,8 +225,6 @@ class AIPropertyManager:
                 max_tokens=800
             )
             
-            result = json.loads(response.choices[0].message.content)
-            
             # Add value calculations
             current_rent = unit_data.get('market_rent', 0)
             suggested_rent = result.get('optimal_rent', current_rent)
@@ -141,6 +243,30 @@ class AIPropertyManager:
             logger.error(f"Rent optimization failed: {str(e)}")
             return self._get_mock_rent_optimization(unit_data)
     
+    async def optimize_rents(self, units: List[Dict], market_data: Dict, concurrency: int) -> AsyncIterator[Dict]:
+        """
+        ``optimize_rent_advanced`` for many units, at most ``concurrency`` at
+        a time, yielding each result (tagged with ``unit_id`` and
+        ``unit_number``) as it finishes. Closing the iterator early, e.g.
+        when a streaming client disconnects, cancels the calls still pending.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def optimize(unit: Dict) -> Dict:
+            async with semaphore:
+                result = await self.optimize_rent_advanced(unit_data=unit, market_data=market_data)
+            result['unit_id'] = unit['unit_id']
+            result['unit_number'] = unit['unit_number']
+            return result
+        
+        tasks = [asyncio.create_task(optimize(unit)) for unit in units]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+    
     def _get_mock_rent_optimization(self, unit_data: Dict) -> Dict:
         """Fallback mock optimization when AI is unavailable"""
         current_rent = unit_data.get('market_rent', 1500)
@@ -243,21 +369,25 @@ class AIPropertyManager:
                 enhanced_message = await self._enhance_sms_message(message, tenant_profile)
                 message = enhanced_message or message
             
-            # For demo purposes, simulate SMS sending
-            logger.info(f"SMS would be sent to {phone}: {message}")
-            
-            return {
-                'success': True,
-                'sid': f"mock_sid_{datetime.now().timestamp()}",
-                'message': message,
-                'status': 'sent',
-                'mock_data': True
-            }
+            # For demo purposes, simulate SMS sending (within the Twilio gate, like a real send)
+            return await self.gates['twilio'].run(self._simulate_sms, phone, message)
             
         except Exception as e:
             logger.error(f"SMS failed: {str(e)}")
             return {'success': False, 'error': str(e)}
     
+    async def _simulate_sms(self, phone: str, message: str) -> Dict:
+        """Stand-in for ``twilio_client.messages.create``; nothing is sent"""
+        logger.info(f"SMS would be sent to {phone}: {message}")
+        
+        return {
+            'success': True,
+            'sid': f"mock_sid_{datetime.now().timestamp()}",
+            'message': message,
+            'status': 'sent',
+            'mock_data': True
+        }
+    
     async def _enhance_sms_message(self, message: str, tenant_profile: Dict) -> str:
         """Enhance SMS message using AI"""
         try:
@@ -273,7 +403,7 @@ class AIPropertyManager:
             Make it friendly but professional. Keep under 160 characters.
             """
             
-            response = await self.openai_client.chat.completions.create(
+            response = await self.complete(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are an expert at tenant communication."},
@@ -311,7 +441,7 @@ class AIPropertyManager:
         """
         
         try:
-            response = await self.openai_client.chat.completions.create(
+            return await self.complete_json(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are a tenant retention expert. Respond in valid JSON format."},
@@ -320,8 +450,6 @@ class AIPropertyManager:
                 temperature=0.3
             )
             
-            return json.loads(response.choices[0].message.content)
-            
         except Exception as e:
             logger.error(f"Churn prediction failed: {str(e)}")
             return self._get_mock_churn_prediction()
@@ -362,7 +490,7 @@ class AIPropertyManager:
         """
         
         try:
-            response = await self.openai_client.chat.completions.create(
+            result = await self.complete_json(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are a luxury real estate copywriter. Respond in valid JSON format."},
@@ -371,7 +499,6 @@ class AIPropertyManager:
                 temperature=0.8
             )
             
-            result = json.loads(response.choices[0].message.content)
             result['generated_at'] = datetime.now().isoformat()
             return result
             
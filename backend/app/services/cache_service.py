@@ -0,0 +1,239 @@
+"""
+Response cache for read-heavy endpoints
+
+``@cache_response`` stores an endpoint's rendered JSON body with a strong
+ETag, keyed by company scope, request path and query params. Browsers that
+send the ETag back in ``If-None-Match`` get a 304 straight from the cache,
+before the endpoint (or the database) runs.
+
+Entries are never deleted one by one. Each key embeds a generation counter
+for its scope; committing a change to a property, unit, lease or
+maintenance request bumps the counters (via SQLAlchemy session events), so
+stale entries simply stop being addressed and age out by TTL or LRU.
+
+The backend is pluggable: an in-process LRU with TTL (default, per worker)
+or a Redis-compatible store shared by all workers.
+"""
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from ..config import settings
+from ..models import Lease, MaintenanceRequest, Property, Unit
+from ..utils.conditional import conditional_response
+from ..utils.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Scope of entries that aggregate across companies (no company filter yet)
+PORTFOLIO_SCOPE = "*"
+# Bumped when a write can't be attributed to a company; invalidates every scope
+EPOCH_KEY = "gen:__all__"
+KEY_PREFIX = "resp"
+
+WATCHED_MODELS = (Property, Unit, Lease, MaintenanceRequest)
+
+
+class MemoryCacheBackend:
+    """In-process LRU with per-entry TTL. Entries are per worker."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            return [self._get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl if ttl else None, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key: str) -> None:
+        with self._lock:
+            current = self._get(key)
+            self._entries[key] = (None, str(int(current or 0) + 1).encode())
+            self._entries.move_to_end(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCacheBackend:
+    """
+    Redis-compatible store shared across workers. Reads use the asyncio
+    client; generation bumps come from sync session events and use a
+    blocking client.
+    """
+
+    def __init__(self, url: str):
+        self._client = redis_asyncio.Redis.from_url(url)
+        self._sync_client = redis.Redis.from_url(url)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self._client.mget(keys)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        await self._client.set(key, value, ex=int(ttl) if ttl else None)
+
+    def incr(self, key: str) -> None:
+        self._sync_client.incr(key)
+
+    def clear(self) -> None:
+        for key in self._sync_client.scan_iter(f"{KEY_PREFIX}:*"):
+            self._sync_client.delete(key)
+        self._sync_client.delete(EPOCH_KEY, *self._sync_client.keys("gen:*"))
+
+
+def create_backend():
+    """Backend selected by RESPONSE_CACHE_BACKEND ("memory", "redis" or "none")"""
+    if settings.RESPONSE_CACHE_BACKEND == "none":
+        return None
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        if REDIS_AVAILABLE and settings.RESPONSE_CACHE_URL:
+            return RedisCacheBackend(settings.RESPONSE_CACHE_URL)
+        logger.warning("Redis response cache unavailable (install redis and set RESPONSE_CACHE_URL); using memory")
+    return MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+backend = create_backend()
+
+
+def _generation_key(scope: str) -> str:
+    return f"gen:{scope}"
+
+
+def invalidate(company_ids: Iterable[Any] = ()) -> None:
+    """
+    Retire cached responses for the given companies and the portfolio-wide
+    scope; with no company ids, retire everything.
+    """
+    if backend is None:
+        return
+    company_ids = [str(company_id) for company_id in company_ids]
+    try:
+        if not company_ids:
+            backend.incr(EPOCH_KEY)
+            return
+        for scope in [PORTFOLIO_SCOPE, *company_ids]:
+            backend.incr(_generation_key(scope))
+    except Exception:
+        # A failed bump must not fail the write that triggered it
+        logger.exception("Response cache invalidation failed")
+
+
+def _company_of(session: Session, instance: Any) -> Optional[Any]:
+    """Company owning a changed row, without issuing SQL; None when unknown"""
+    if isinstance(instance, Unit):
+        property = session.identity_map.get(identity_key(Property, instance.property_id))
+        return property.company_id if property is not None else None
+    return getattr(instance, "company_id", None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    changed = [
+        instance for instance in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(instance, WATCHED_MODELS)
+    ]
+    if not changed:
+        return
+    pending: Set[Optional[str]] = session.info.setdefault("response_cache_invalidate", set())
+    for instance in changed:
+        company_id = _company_of(session, instance)
+        pending.add(str(company_id) if company_id is not None else None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_changes(orm_execute_state) -> None:
+    # Bulk INSERT/UPDATE/DELETE statements bypass the flush; their rows are unknown
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, WATCHED_MODELS):
+        orm_execute_state.session.info.setdefault("response_cache_invalidate", set()).add(None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    pending = session.info.pop("response_cache_invalidate", None)
+    if pending:
+        invalidate(() if None in pending else pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop("response_cache_invalidate", None)
+
+
+def _request_scope(kwargs: Dict[str, Any]) -> str:
+    # TODO: Always scope by company once authentication is implemented
+    current_user = kwargs.get("current_user")
+    company_id = getattr(current_user, "company_id", None)
+    return str(company_id) if company_id else PORTFOLIO_SCOPE
+
+
+def cache_response(ttl: Optional[float] = None) -> Callable:
+    """
+    Cache a JSON endpoint's response per company scope, path and query
+    params, with ETag/304 support. The endpoint must accept ``request: Request``
+    and return plain data (not a Response).
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs["request"]
+            if backend is None:
+                body = dumps(await func(*args, **kwargs))
+                return conditional_response(request, body, f'"{hashlib.sha1(body).hexdigest()}"')
+
+            scope = _request_scope(kwargs)
+            epoch, generation = await backend.get_many([EPOCH_KEY, _generation_key(scope)])
+            params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+            digest = hashlib.sha1(f"{request.url.path}?{params}".encode()).hexdigest()
+            key = f"{KEY_PREFIX}:{scope}:{int(epoch or 0)}.{int(generation or 0)}:{digest}"
+
+            cached = (await backend.get_many([key]))[0]
+            if cached is not None:
+                etag, body = cached.split(b"\n", 1)
+                return conditional_response(request, body, etag.decode())
+
+            body = dumps(await func(*args, **kwargs))
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            await backend.set(key, etag.encode() + b"\n" + body, ttl or settings.RESPONSE_CACHE_TTL)
+            return conditional_response(request, body, etag)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,112 @@
+"""
+Conversation inbox maintenance service
+
+Keeps the denormalized inbox fields in step with messages: the last
+message id/sender/preview on ``Conversation`` and the per-participant
+``unread_count``. Endpoints call these before they commit, so the inbox
+state lands in the same transaction as the message write.
+"""
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import ColumnElement, func, or_, select, true
+from sqlalchemy.orm import QueryableAttribute, Session
+
+from ..models import Conversation, ConversationParticipant, Message
+
+PREVIEW_LENGTH = 255
+
+
+def message_preview(content: Optional[str]) -> str:
+    """Single-line preview of a message body, truncated to fit the column"""
+    preview = " ".join((content or "").split())
+    if len(preview) > PREVIEW_LENGTH:
+        preview = preview[:PREVIEW_LENGTH - 1] + "…"
+    return preview
+
+
+def _unread_for_participant(sender_id: Any):
+    """
+    Which participants count a message from ``sender_id`` (a value or the
+    ``Message.sender_id`` column) as unread: everyone but its sender.
+    Participants without a user and messages without a sender count for
+    everyone. Shared by the incremental and rebuild paths so they agree.
+    """
+    if sender_id is None:
+        return true()
+    conditions = [
+        ConversationParticipant.user_id.is_(None),
+        ConversationParticipant.user_id != sender_id,
+    ]
+    if isinstance(sender_id, (ColumnElement, QueryableAttribute)):
+        conditions.append(sender_id.is_(None))
+    return or_(*conditions)
+
+
+def record_message(db: Session, conversation: Conversation, message: Message) -> None:
+    """
+    Make ``message`` the conversation's last message and bump the unread
+    counter of every other active participant.
+
+    The message must be flushed (so it has an id) before calling.
+    """
+    conversation.last_message_id = message.id
+    conversation.last_message_sender_id = message.sender_id
+    conversation.last_message_preview = message_preview(message.content)
+    conversation.last_message_at = message.created_at or datetime.utcnow()
+    conversation.updated_at = datetime.utcnow()
+
+    recipients = db.query(ConversationParticipant).filter(
+        ConversationParticipant.conversation_id == conversation.id,
+        ConversationParticipant.is_active == True,
+        _unread_for_participant(message.sender_id)
+    )
+
+    # Relative UPDATE so concurrent senders don't lose increments
+    recipients.update(
+        {ConversationParticipant.unread_count: ConversationParticipant.unread_count + 1},
+        synchronize_session=False
+    )
+
+
+def mark_participant_read(db: Session, participant: ConversationParticipant) -> None:
+    """Reset a participant's unread counter and stamp their last read time"""
+    participant.unread_count = 0
+    participant.last_read_at = datetime.utcnow()
+
+
+def rebuild_inbox_state(db: Session, conversation_id: Optional[Any] = None) -> None:
+    """
+    Recompute last-message fields and unread counters from the messages
+    table, for one conversation or all of them, with two correlated UPDATEs.
+    A participant's unread messages are the ones ``record_message`` counts
+    for them that arrived after their ``last_read_at``. The caller commits.
+    """
+    def latest(column):
+        return select(column).where(
+            Message.conversation_id == Conversation.id,
+            Message.is_deleted == False
+        ).order_by(Message.created_at.desc(), Message.id.desc()).limit(1).scalar_subquery()
+
+    conversations = db.query(Conversation)
+    participants = db.query(ConversationParticipant)
+    if conversation_id is not None:
+        conversations = conversations.filter(Conversation.id == str(conversation_id))
+        participants = participants.filter(ConversationParticipant.conversation_id == str(conversation_id))
+
+    conversations.update({
+        Conversation.last_message_id: latest(Message.id),
+        Conversation.last_message_sender_id: latest(Message.sender_id),
+        Conversation.last_message_preview: latest(func.substr(Message.content, 1, PREVIEW_LENGTH)),
+    }, synchronize_session=False)
+
+    participants.update({
+        ConversationParticipant.unread_count: select(func.count(Message.id)).where(
+            Message.conversation_id == ConversationParticipant.conversation_id,
+            _unread_for_participant(Message.sender_id),
+            or_(
+                ConversationParticipant.last_read_at.is_(None),
+                Message.created_at > ConversationParticipant.last_read_at
+            )
+        ).scalar_subquery()
+    }, synchronize_session=False)
@@ -0,0 +1,231 @@
+"""
+LLM response cache
+
+Completions for the same unit data are requested over and over (listing
+copy, rent optimization, churn prediction), and each one costs a provider
+round trip. ``LLMCache`` keeps parsed responses in a SQLite file so every
+worker on the host, and the next deploy, reuses them:
+
+- Keys hash the provider, model, prompt (whitespace-normalized, so the
+  indentation of a prompt template doesn't matter) and call parameters.
+  The prompt embeds the unit data, so changed data means a new key; stale
+  entries are never addressed again and age out.
+- Entries expire after AI_CACHE_TTL seconds. Past AI_CACHE_MAX_ENTRIES the
+  least recently used are evicted.
+- Identical requests in flight in this worker share one lookup and one
+  provider call. When every caller has gone away (a streaming client
+  disconnected) the call is cancelled.
+
+Only values that ``compute`` returns are stored; provider errors and
+timeouts propagate to the callers, so fallback answers are never cached.
+"""
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = {
+    "hits": "Lookups answered from the cache.",
+    "misses": "Lookups that called the provider.",
+    "coalesced": "Lookups that joined an identical request already in flight.",
+    "stored": "Responses written to the cache.",
+    "evicted": "Entries removed to stay under AI_CACHE_MAX_ENTRIES.",
+    "errors": "Cache store reads or writes that failed (treated as misses).",
+}
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapse runs of whitespace, so template indentation doesn't change the key"""
+    return " ".join(text.split())
+
+
+def cache_key(provider: str, model: str, messages: List[Dict[str, Any]], **params) -> str:
+    """SHA-256 over the provider, model, normalized messages and call parameters"""
+    payload = {
+        "provider": provider,
+        "model": model,
+        "messages": [
+            {**message, "content": normalize_prompt(message["content"])}
+            if isinstance(message.get("content"), str) else message
+            for message in messages
+        ],
+        "params": params,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class _Flight:
+    """A lookup (and provider call, on a miss) shared by identical requests"""
+
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class LLMCache:
+    """
+    SQLite-backed TTL + LRU store for provider responses, with in-flight
+    coalescing. Store access runs on a thread; a failing store only costs
+    hits, never the call.
+    """
+
+    def __init__(self, path: str, ttl: float, max_entries: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " provider TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)")
+
+    def _read(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row:
+                self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0] if row else None
+
+    def _write(self, key: str, provider: str, model: str, value: str) -> int:
+        """Store ``value``, then drop expired entries and the least recently used past the limit"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, provider, model, value, now, now + self.ttl, now),
+                )
+                self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+                excess = self._conn.execute("SELECT count(*) FROM llm_cache").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM llm_cache WHERE key IN "
+                        "(SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                        (excess,),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return max(excess, 0)
+
+    async def _fill(self, key: str, provider: str, model: str, compute: Callable[[], Awaitable[Any]]) -> str:
+        try:
+            cached = await asyncio.to_thread(self._read, key)
+        except sqlite3.Error as exc:
+            self.counts["errors"] += 1
+            logger.warning(f"LLM cache read failed: {exc}")
+            cached = None
+        if cached is not None:
+            self.counts["hits"] += 1
+            return cached
+
+        self.counts["misses"] += 1
+        value = json.dumps(await compute())
+        try:
+            self.counts["evicted"] += await asyncio.to_thread(self._write, key, provider, model, value)
+            self.counts["stored"] += 1
+        except sqlite3.Error as exc:
+            self.counts["errors"] += 1
+            logger.warning(f"LLM cache write failed: {exc}")
+        return value
+
+    def _landed(self, key: str, task: "asyncio.Task") -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Retrieved here too, in case every caller was cancelled first
+            task.exception()
+
+    async def get_or_compute(self, key: str, provider: str, model: str,
+                             compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        The cached value for ``key``, or ``await compute()`` stored under it.
+        ``compute`` must return something JSON-serializable; every caller
+        gets its own decoded copy.
+        """
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(self._fill(key, provider, model, compute)))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(functools.partial(self._landed, key))
+        else:
+            self.counts["coalesced"] += 1
+
+        flight.waiters += 1
+        try:
+            return json.loads(await asyncio.shield(flight.task))
+        except asyncio.CancelledError:
+            if flight.waiters == 1:
+                # Nobody else is waiting for this call
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def entries(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM llm_cache").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def status(self) -> Dict[str, Any]:
+        lookups = self.counts["hits"] + self.counts["misses"] + self.counts["coalesced"]
+        return {
+            **self.counts,
+            'hit_rate': round((self.counts["hits"] + self.counts["coalesced"]) / lookups, 4) if lookups else 0.0,
+            'in_flight': len(self._inflight),
+            'entries': self.entries(),
+            'max_entries': self.max_entries,
+            'ttl_s': self.ttl,
+        }
+
+    def render(self) -> str:
+        """Prometheus text exposition of the counters and the entry count"""
+        lines = []
+        for name, documentation in COUNTERS.items():
+            metric = f"ai_cache_{name}_total"
+            lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} counter", f"{metric} {self.counts[name]}"]
+        lines += [
+            "# HELP ai_cache_entries Responses stored in the LLM cache.",
+            "# TYPE ai_cache_entries gauge",
+            f"ai_cache_entries {self.entries()}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def create_cache() -> Optional[LLMCache]:
+    """Cache at AI_CACHE_PATH, or None when it is empty (caching off)"""
+    if not settings.AI_CACHE_PATH:
+        return None
+    try:
+        return LLMCache(settings.AI_CACHE_PATH, settings.AI_CACHE_TTL, settings.AI_CACHE_MAX_ENTRIES)
+    except sqlite3.Error as exc:
+        logger.warning(f"LLM cache unavailable at {settings.AI_CACHE_PATH}: {exc}")
+        return None
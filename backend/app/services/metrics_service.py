@@ -0,0 +1,210 @@
+"""
+Portfolio metrics aggregation service
+
+Computes occupancy, revenue and NOI figures with grouped SQL queries so the
+number of round trips stays constant regardless of portfolio size.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from ..models import Property, Unit, UnitStatus
+
+
+def _property_filters(property_id: Optional[Any] = None, company_id: Optional[Any] = None) -> list:
+    """Build the shared WHERE clauses applied to the properties table"""
+    filters = []
+    if property_id is not None:
+        filters.append(Property.id == str(property_id))
+    if company_id is not None:
+        filters.append(Property.company_id == str(company_id))
+    return filters
+
+
+def _occupied_revenue():
+    return func.coalesce(func.sum(case((Unit.status == UnitStatus.OCCUPIED, Unit.market_rent), else_=0)), 0)
+
+
+def _status_count(unit_status: UnitStatus):
+    return func.coalesce(func.sum(case((Unit.status == unit_status, 1), else_=0)), 0)
+
+
+def get_property_totals(
+    db: Session,
+    property_id: Optional[Any] = None,
+    company_id: Optional[Any] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Per-property unit counts and revenue in a single query (units are
+    pre-aggregated in a grouped subquery and outer-joined to properties)
+    """
+    unit_totals = db.query(
+        Unit.property_id.label("property_id"),
+        func.count(Unit.id).label("unit_count"),
+        _status_count(UnitStatus.OCCUPIED).label("occupied"),
+        _status_count(UnitStatus.AVAILABLE).label("available"),
+        _status_count(UnitStatus.MAINTENANCE).label("maintenance"),
+        _occupied_revenue().label("revenue"),
+    ).group_by(Unit.property_id).subquery()
+
+    query = db.query(
+        Property.id,
+        Property.company_id,
+        Property.name,
+        Property.total_units,
+        Property.monthly_operating_expenses,
+        func.coalesce(unit_totals.c.unit_count, 0),
+        func.coalesce(unit_totals.c.occupied, 0),
+        func.coalesce(unit_totals.c.available, 0),
+        func.coalesce(unit_totals.c.maintenance, 0),
+        func.coalesce(unit_totals.c.revenue, 0),
+    ).outerjoin(
+        unit_totals, unit_totals.c.property_id == Property.id
+    ).filter(
+        *_property_filters(property_id, company_id)
+    ).order_by(Property.created_at, Property.id)
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    return [
+        {
+            "property_id": prop_id,
+            "company_id": prop_company_id,
+            "name": name,
+            "total_units": total_units or 0,
+            "unit_count": unit_count,
+            "occupied_units": occupied,
+            "available_units": available,
+            "maintenance_units": maintenance,
+            "monthly_revenue": float(revenue),
+            "monthly_expenses": float(expenses or 0),
+        }
+        for (
+            prop_id, prop_company_id, name, total_units, expenses,
+            unit_count, occupied, available, maintenance, revenue,
+        ) in query.all()
+    ]
+
+
+def format_property_breakdown(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a per-property totals row for the dashboard breakdown"""
+    total_units = totals["total_units"]
+    occupancy_rate = (totals["occupied_units"] / total_units) * 100 if total_units else 0.0
+    return {
+        "id": str(totals["property_id"]),
+        "name": totals["name"],
+        "occupancy_rate": round(occupancy_rate, 1),
+        "monthly_revenue": round(totals["monthly_revenue"], 2),
+        "units": total_units,
+    }
+
+
+def get_property_breakdown(
+    db: Session,
+    property_id: Optional[Any] = None,
+    company_id: Optional[Any] = None,
+    limit: Optional[int] = 5,
+) -> List[Dict[str, Any]]:
+    """Per-property occupancy and revenue for the dashboard"""
+    return [
+        format_property_breakdown(totals)
+        for totals in get_property_totals(db, property_id=property_id, company_id=company_id, limit=limit)
+    ]
+
+
+def get_portfolio_metrics(
+    db: Session,
+    property_id: Optional[Any] = None,
+    company_id: Optional[Any] = None,
+    breakdown_limit: Optional[int] = 5,
+) -> Dict[str, Any]:
+    """
+    Aggregate portfolio metrics for a company, a single property or everything.
+
+    Issues two grouped queries (property totals, unit status totals) plus one
+    for the per-property breakdown when ``breakdown_limit`` is not 0.
+    """
+    property_filters = _property_filters(property_id, company_id)
+
+    # Property-level totals
+    total_properties, total_units, monthly_expenses = db.query(
+        func.count(Property.id),
+        func.coalesce(func.sum(Property.total_units), 0),
+        func.coalesce(func.sum(Property.monthly_operating_expenses), 0),
+    ).filter(*property_filters).one()
+
+    # Unit status breakdown with occupied revenue, grouped in the database
+    unit_rows = db.query(
+        Unit.status,
+        func.count(Unit.id),
+        func.coalesce(func.sum(Unit.market_rent), 0),
+    ).join(
+        Property, Unit.property_id == Property.id
+    ).filter(*property_filters).group_by(Unit.status).all()
+
+    unit_breakdown = {unit_status.value: 0 for unit_status in UnitStatus}
+    monthly_revenue = 0.0
+    for unit_status, count, rent in unit_rows:
+        unit_breakdown[UnitStatus(unit_status).value] = count
+        if unit_status == UnitStatus.OCCUPIED:
+            monthly_revenue = float(rent)
+
+    properties_breakdown = []
+    if breakdown_limit != 0:
+        properties_breakdown = get_property_breakdown(
+            db, property_id=property_id, company_id=company_id, limit=breakdown_limit
+        )
+
+    return summarize_metrics(
+        total_properties=total_properties,
+        total_units=total_units or 0,
+        unit_breakdown=unit_breakdown,
+        monthly_revenue=monthly_revenue,
+        monthly_expenses=float(monthly_expenses or 0),
+        properties_breakdown=properties_breakdown,
+    )
+
+
+def summarize_metrics(
+    total_properties: int,
+    total_units: int,
+    unit_breakdown: Dict[str, int],
+    monthly_revenue: float,
+    monthly_expenses: float,
+    properties_breakdown: Optional[List[Dict[str, Any]]] = None,
+    unit_count: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Derive rates and NOI from raw totals into the shared metrics shape"""
+    if unit_count is None:
+        unit_count = sum(unit_breakdown.values())
+    occupied_units = unit_breakdown.get(UnitStatus.OCCUPIED.value, 0)
+
+    # Mirrors Property.vacant_units: fall back to declared total when no unit rows exist
+    vacant_units = unit_count - occupied_units if unit_count else total_units
+
+    occupancy_rate = (occupied_units / total_units) * 100 if total_units > 0 else 0.0
+
+    return {
+        "total_properties": total_properties,
+        "total_units": total_units,
+        "unit_count": unit_count,
+        "unit_breakdown": unit_breakdown,
+        "occupied_units": occupied_units,
+        "available_units": unit_breakdown.get(UnitStatus.AVAILABLE.value, 0),
+        "maintenance_units": unit_breakdown.get(UnitStatus.MAINTENANCE.value, 0),
+        "vacant_units": vacant_units,
+        "occupancy_rate": occupancy_rate,
+        "monthly_revenue": monthly_revenue,
+        "annual_revenue": monthly_revenue * 12,
+        "monthly_expenses": monthly_expenses,
+        "net_operating_income": monthly_revenue - monthly_expenses,
+        "properties_breakdown": properties_breakdown or [],
+    }
+
+
+def get_property_metrics(db: Session, property_id: Any) -> Dict[str, Any]:
+    """Metrics for a single property, without the per-property breakdown"""
+    return get_portfolio_metrics(db, property_id=property_id, breakdown_limit=0)
@@ -0,0 +1,299 @@
+"""
+Notification outbox service
+
+Endpoints call ``queue_message_notifications`` before they commit, so the
+outbox rows land in the same transaction as the message. The notification
+worker (``notification_worker.py``, a separate process) drains the table:
+
+- ``claim_batch`` moves up to a batch of due rows to ``processing`` in one
+  ``UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED) RETURNING``.
+  Concurrent workers on Postgres skip each other's locked rows; SQLite
+  renders no row locks but runs the statement under its single write lock,
+  which serializes claimers the same way. Rows a crashed worker left in
+  ``processing`` become claimable again after OUTBOX_CLAIM_TIMEOUT.
+- ``deliver_batch`` sends one digest per recipient for the claimed rows and
+  deletes them. A failed digest goes back to ``pending`` with exponential
+  backoff, and to ``failed`` after OUTBOX_MAX_ATTEMPTS claims.
+
+Messages are queued OUTBOX_DIGEST_WINDOW seconds out, so a burst to the
+same recipient comes due together and goes out as one digest.
+"""
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import Message, NotificationOutbox, OutboxStatus, User
+from ..utils.instrumentation import Histogram
+from .inbox_service import message_preview
+from .notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+# Messages listed in a digest body before "and N more"
+DIGEST_LINES = 10
+# Seconds between backlog counts while the worker is busy
+BACKLOG_INTERVAL = 5.0
+
+BATCH_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+LAG_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+DigestSender = Callable[[User, List[NotificationOutbox]], None]
+
+
+def queue_message_notifications(db, message: Message, recipient_ids: Iterable[Any], subject: Optional[str] = None) -> None:
+    """
+    Queue a new-message notification for each recipient. Works with sync and
+    async sessions alike; call it before the commit that saves ``message``.
+    """
+    due = datetime.utcnow() + timedelta(seconds=settings.OUTBOX_DIGEST_WINDOW)
+    payload = {
+        'sender_name': message.sender_name,
+        'subject': subject,
+        'preview': message_preview(message.content),
+    }
+    db.add_all([
+        NotificationOutbox(
+            recipient_id=recipient_id,
+            kind='message',
+            conversation_id=message.conversation_id,
+            message_id=message.id,
+            payload=payload,
+            available_at=due,
+        )
+        for recipient_id in dict.fromkeys(recipient_ids) if recipient_id
+    ])
+
+
+def claim_batch(db: Session, worker_id: str, limit: int, now: Optional[datetime] = None) -> List[NotificationOutbox]:
+    """
+    Claim up to ``limit`` due rows for this worker and commit the claim. Use
+    a session with ``expire_on_commit=False``, or every returned row is
+    reloaded one by one when delivery reads it.
+    """
+    now = now or datetime.utcnow()
+    stale = now - timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT)
+    due = select(NotificationOutbox.id).where(or_(
+        and_(NotificationOutbox.status == OutboxStatus.PENDING, NotificationOutbox.available_at <= now),
+        and_(NotificationOutbox.status == OutboxStatus.PROCESSING, NotificationOutbox.claimed_at < stale),
+    )).order_by(NotificationOutbox.available_at).limit(limit).with_for_update(skip_locked=True)
+
+    rows = db.scalars(
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id.in_(due))
+        .values(
+            status=OutboxStatus.PROCESSING,
+            claimed_by=worker_id,
+            claimed_at=now,
+            attempts=NotificationOutbox.attempts + 1,
+        )
+        .returning(NotificationOutbox),
+        execution_options={"synchronize_session": False},
+    ).all()
+    db.commit()
+    return rows
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, capped at OUTBOX_RETRY_MAX seconds"""
+    delay = min(settings.OUTBOX_RETRY_BASE * 2 ** max(attempts - 1, 0), settings.OUTBOX_RETRY_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def render_digest(entries: List[NotificationOutbox]):
+    """Subject and body for one recipient's pending messages, newest first"""
+    entries = sorted(entries, key=lambda row: row.created_at, reverse=True)
+    conversations = {row.conversation_id for row in entries}
+    subject = f"{len(entries)} new message{'s' if len(entries) != 1 else ''}"
+    if len(conversations) > 1:
+        subject += f" in {len(conversations)} conversations"
+
+    lines = [
+        f"{row.payload.get('sender_name') or 'Someone'}: {row.payload.get('preview') or ''}"
+        for row in entries[:DIGEST_LINES]
+    ]
+    if len(entries) > DIGEST_LINES:
+        lines.append(f"...and {len(entries) - DIGEST_LINES} more")
+    return subject, "\n".join(lines)
+
+
+def send_digest(user: User, entries: List[NotificationOutbox]) -> None:
+    """Default delivery: an in-app notification, plus email when the user has an address"""
+    subject, body = render_digest(entries)
+    NotificationService.send_notification(str(user.id), subject, "message_digest")
+    if user.email:
+        NotificationService.send_email(user.email, subject, body)
+
+
+def deliver_batch(db: Session, rows: List[NotificationOutbox], stats: Optional["WorkerStats"] = None,
+                  send: DigestSender = send_digest) -> None:
+    """Send one digest per recipient for claimed ``rows``; delete what went out, reschedule the rest"""
+    now = datetime.utcnow()
+    by_recipient: Dict[Any, List[NotificationOutbox]] = defaultdict(list)
+    for row in rows:
+        by_recipient[row.recipient_id].append(row)
+    users = {user.id: user for user in db.scalars(select(User).where(User.id.in_(list(by_recipient))))}
+
+    done = []
+    for recipient_id, entries in by_recipient.items():
+        user = users.get(recipient_id)
+        if user is None or not user.is_active:
+            # Nobody to tell any more
+            done.extend(entries)
+            if stats:
+                stats.record("skipped", len(entries))
+            continue
+        try:
+            send(user, entries)
+        except Exception as exc:
+            logger.warning("Notification digest to %s failed: %s", recipient_id, exc)
+            # One retry time for the whole digest, so its rows come due together again
+            retry_at = now + timedelta(seconds=retry_delay(max(row.attempts for row in entries)))
+            for row in entries:
+                row.last_error = str(exc)[:1000]
+                row.claimed_by = None
+                if row.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    row.status = OutboxStatus.FAILED
+                else:
+                    row.status = OutboxStatus.PENDING
+                    row.available_at = retry_at
+            if stats:
+                failed = sum(1 for row in entries if row.status == OutboxStatus.FAILED)
+                stats.record("failed", failed)
+                stats.record("retried", len(entries) - failed)
+            continue
+
+        done.extend(entries)
+        if stats:
+            stats.record("delivered", len(entries))
+            stats.record("digests")
+            for row in entries:
+                stats.delivery_lag.observe((), (now - row.created_at).total_seconds())
+
+    if done:
+        db.execute(
+            delete(NotificationOutbox).where(NotificationOutbox.id.in_([row.id for row in done])),
+            execution_options={"synchronize_session": False},
+        )
+    db.commit()
+
+
+def outbox_backlog(db: Session) -> Dict[str, Any]:
+    """Rows per status and the age of the oldest due pending row"""
+    counts = dict(db.execute(
+        select(NotificationOutbox.status, func.count()).group_by(NotificationOutbox.status)
+    ).all())
+    oldest = db.scalar(select(func.min(NotificationOutbox.available_at)).where(
+        NotificationOutbox.status == OutboxStatus.PENDING
+    ))
+    now = datetime.utcnow()
+    return {
+        **{status.value: counts.get(status, 0) for status in OutboxStatus},
+        'oldest_due_s': max((now - oldest).total_seconds(), 0.0) if oldest else 0.0,
+    }
+
+
+class WorkerStats:
+    """Throughput counters and histograms for one worker process"""
+
+    COUNTERS = {
+        "claimed": "Outbox rows claimed.",
+        "delivered": "Outbox rows delivered.",
+        "digests": "Digests sent (one per recipient per batch).",
+        "retried": "Outbox rows rescheduled after a failed delivery.",
+        "failed": "Outbox rows given up on after OUTBOX_MAX_ATTEMPTS.",
+        "skipped": "Outbox rows dropped because the recipient is gone or inactive.",
+    }
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.counts = dict.fromkeys(self.COUNTERS, 0)
+        self.backlog: Dict[str, Any] = {}
+        self.backlog_read = 0.0
+        self._lock = threading.Lock()
+        self.batch_duration = Histogram(
+            "notification_batch_seconds", "Time to claim and deliver one batch.", (), BATCH_SECONDS_BUCKETS,
+        )
+        self.batch_size = Histogram(
+            "notification_batch_rows", "Outbox rows claimed per batch.", (), BATCH_SIZE_BUCKETS,
+        )
+        self.delivery_lag = Histogram(
+            "notification_delivery_lag_seconds", "Time from queueing to delivery, per row.", (), LAG_BUCKETS,
+        )
+
+    def record(self, counter: str, value: int = 1) -> None:
+        with self._lock:
+            self.counts[counter] += value
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals, per-second rates since start and the last backlog reading"""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            **counts,
+            'delivered_per_s': round(counts['delivered'] / elapsed, 2),
+            'digests_per_s': round(counts['digests'] / elapsed, 2),
+            'uptime_s': round(elapsed, 1),
+            'backlog': self.backlog,
+        }
+
+    def render(self) -> str:
+        """Prometheus text exposition"""
+        lines = []
+        with self._lock:
+            counts = dict(self.counts)
+        for name, documentation in self.COUNTERS.items():
+            metric = f"notification_outbox_{name}_total"
+            lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} counter", f"{metric} {counts[name]}"]
+        lines += [
+            "# HELP notification_outbox_rows Outbox rows by status.",
+            "# TYPE notification_outbox_rows gauge",
+        ]
+        for status in OutboxStatus:
+            lines.append(f'notification_outbox_rows{{status="{status.value}"}} {self.backlog.get(status.value, 0)}')
+        lines += [
+            "# HELP notification_outbox_oldest_due_seconds Age of the oldest due pending row.",
+            "# TYPE notification_outbox_oldest_due_seconds gauge",
+            f"notification_outbox_oldest_due_seconds {self.backlog.get('oldest_due_s', 0.0):.3f}",
+        ]
+        histograms = [self.batch_duration.render(), self.batch_size.render(), self.delivery_lag.render()]
+        return "\n".join(lines + histograms) + "\n"
+
+
+def run_worker(session_factory, worker_id: str, batch_size: int, poll_interval: float,
+               stats: WorkerStats, stop: threading.Event, once: bool = False) -> None:
+    """Claim and deliver batches until ``stop`` is set; sleep ``poll_interval`` when nothing is due"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        db = session_factory()
+        try:
+            rows = claim_batch(db, worker_id, batch_size)
+            if rows:
+                stats.record("claimed", len(rows))
+                stats.batch_size.observe((), len(rows))
+                deliver_batch(db, rows, stats)
+                stats.batch_duration.observe((), time.perf_counter() - started)
+            if not rows or time.monotonic() - stats.backlog_read >= BACKLOG_INTERVAL:
+                stats.backlog = outbox_backlog(db)
+                stats.backlog_read = time.monotonic()
+        except Exception:
+            db.rollback()
+            logger.exception("Notification batch failed")
+            rows = []
+        finally:
+            db.close()
+
+        if once and not rows:
+            return
+        if len(rows) < batch_size:
+            # Caught up: wait for more, unless asked to stop
+            stop.wait(poll_interval)
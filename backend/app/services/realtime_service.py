@@ -0,0 +1,205 @@
+"""
+Real-time fan-out for messaging
+
+Endpoints publish events (new messages, read receipts, typing) to named
+channels; WebSocket connections subscribe to the channels they may see and
+get each event pushed instead of polling the messages endpoint.
+
+``RealtimeHub`` keeps this worker's subscribers per channel. How an event
+reaches the hubs is up to the broker: in process (default; only this
+worker's connections see it) or Redis pub/sub, so a message posted to one
+uvicorn worker reaches sockets held by the others.
+
+Events are rendered to JSON once per publish and the same bytes go to every
+subscriber. A subscriber that falls ``REALTIME_QUEUE_SIZE`` events behind is
+cut off rather than buffered without bound; its client reconnects and
+catches up through the REST endpoints.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Set
+
+from ..config import settings
+from ..utils.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+CHANNEL_PREFIX = "realtime:"
+
+Dispatch = Callable[[str, bytes], None]
+
+
+def conversation_channel(conversation_id: Any) -> str:
+    """Events for everyone in a conversation: messages, read receipts, typing"""
+    return f"conversation:{conversation_id}"
+
+
+def user_channel(user_id: Any) -> str:
+    """Events for one user across conversations, e.g. being added to a new one"""
+    return f"user:{user_id}"
+
+
+class Subscription:
+    """One connection's queue of pending events, across the channels it joined"""
+
+    def __init__(self, max_queued: int):
+        self.channels: Set[str] = set()
+        self.overflowed = False
+        self._queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize=max_queued)
+
+    def deliver(self, payload: bytes) -> None:
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Drop the backlog and wake the reader with the end marker
+            self.overflowed = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+
+    async def next_event(self) -> Optional[bytes]:
+        """The next payload, or None once the subscriber has fallen too far behind"""
+        return await self._queue.get()
+
+
+class MemoryBroker:
+    """Hands events straight to this worker's hub"""
+
+    def __init__(self):
+        self._dispatch: Optional[Dispatch] = None
+
+    def attach(self, dispatch: Dispatch) -> None:
+        self._dispatch = dispatch
+
+    async def publish(self, channel: str, payload: bytes) -> None:
+        if self._dispatch:
+            self._dispatch(channel, payload)
+
+    async def listen(self, channel: str) -> None:
+        pass
+
+    async def unlisten(self, channel: str) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisBroker:
+    """
+    Redis pub/sub shared by all workers. Each worker subscribes only to the
+    channels its own connections joined, over one pub/sub connection read by
+    a background task.
+    """
+
+    def __init__(self, url: str):
+        self._client = redis_asyncio.Redis.from_url(url)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._dispatch: Optional[Dispatch] = None
+        self._reader: Optional[asyncio.Task] = None
+
+    def attach(self, dispatch: Dispatch) -> None:
+        self._dispatch = dispatch
+
+    async def publish(self, channel: str, payload: bytes) -> None:
+        await self._client.publish(CHANNEL_PREFIX + channel, payload)
+
+    async def listen(self, channel: str) -> None:
+        await self._pubsub.subscribe(CHANNEL_PREFIX + channel)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+
+    async def unlisten(self, channel: str) -> None:
+        await self._pubsub.unsubscribe(CHANNEL_PREFIX + channel)
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Realtime broker read failed; retrying")
+                await asyncio.sleep(1.0)
+                continue
+            if message and message["type"] == "message" and self._dispatch:
+                channel = message["channel"].decode()[len(CHANNEL_PREFIX):]
+                self._dispatch(channel, message["data"])
+
+    async def close(self) -> None:
+        if self._reader:
+            self._reader.cancel()
+        await self._pubsub.aclose()
+        await self._client.aclose()
+
+
+class RealtimeHub:
+    """This worker's subscribers per channel, fed by the broker"""
+
+    def __init__(self, broker, max_queued: int = 256):
+        self.broker = broker
+        self.max_queued = max_queued
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        broker.attach(self.dispatch)
+
+    def subscribe(self) -> Subscription:
+        return Subscription(self.max_queued)
+
+    async def join(self, subscription: Subscription, channel: str) -> None:
+        if channel in subscription.channels:
+            return
+        subscription.channels.add(channel)
+        subscribers = self._subscribers[channel]
+        subscribers.add(subscription)
+        if len(subscribers) == 1:
+            await self.broker.listen(channel)
+
+    async def leave(self, subscription: Subscription, channel: str) -> None:
+        subscription.channels.discard(channel)
+        subscribers = self._subscribers.get(channel)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[channel]
+            await self.broker.unlisten(channel)
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        for channel in list(subscription.channels):
+            await self.leave(subscription, channel)
+
+    async def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        """Send ``event`` to every subscriber of ``channel``, in any worker"""
+        try:
+            await self.broker.publish(channel, dumps(event))
+        except Exception:
+            # Pushes are best effort; the write they announce is already committed
+            logger.exception("Realtime publish to %s failed", channel)
+
+    def dispatch(self, channel: str, payload: bytes) -> None:
+        for subscription in list(self._subscribers.get(channel, ())):
+            subscription.deliver(payload)
+
+    async def close(self) -> None:
+        await self.broker.close()
+
+
+def create_broker():
+    """Broker selected by REALTIME_BACKEND ("memory" or "redis")"""
+    if settings.REALTIME_BACKEND == "redis":
+        if REDIS_AVAILABLE and settings.REALTIME_URL:
+            return RedisBroker(settings.REALTIME_URL)
+        logger.warning("Redis realtime broker unavailable (install redis and set REALTIME_URL); using memory")
+    return MemoryBroker()
+
+
+hub = RealtimeHub(create_broker(), settings.REALTIME_QUEUE_SIZE)
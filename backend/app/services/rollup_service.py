@@ -0,0 +1,288 @@
+"""
+Portfolio rollup maintenance service
+
+Keeps the ``portfolio_rollups`` table in step with units, leases and
+properties. Write endpoints call ``refresh_property_rollup`` before they
+commit, so the rollup change lands in the same transaction as the write.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import Property, PortfolioRollup, UnitStatus
+from .metrics_service import get_property_totals, format_property_breakdown, summarize_metrics
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_FIELDS = (
+    "property_count",
+    "total_units",
+    "unit_count",
+    "occupied_units",
+    "available_units",
+    "maintenance_units",
+    "monthly_revenue",
+    "monthly_expenses",
+)
+
+FLOAT_TOLERANCE = 0.01
+
+
+def _empty_snapshot() -> Dict[str, Any]:
+    return {field: 0 for field in ROLLUP_FIELDS}
+
+
+def _snapshot_from_totals(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a get_property_totals row into rollup column values"""
+    snapshot = {field: totals.get(field, 0) for field in ROLLUP_FIELDS}
+    snapshot["property_count"] = 1
+    return snapshot
+
+
+def _snapshot_from_row(row: Optional[PortfolioRollup]) -> Dict[str, Any]:
+    if row is None:
+        return _empty_snapshot()
+    return {field: getattr(row, field) or 0 for field in ROLLUP_FIELDS}
+
+
+def _company_row_query(db: Session, company_id: Any):
+    return db.query(PortfolioRollup).filter(
+        PortfolioRollup.company_id == str(company_id),
+        PortfolioRollup.property_id.is_(None)
+    )
+
+
+def _expected_rollups(db: Session, company_id: Optional[Any] = None) -> Dict[tuple, Dict[str, Any]]:
+    """
+    Recompute every rollup row from source tables.
+
+    Returns a mapping of ``(company_id, property_id)`` to column values;
+    company-wide rows use ``property_id=None``.
+    """
+    expected = {}
+    for totals in get_property_totals(db, company_id=company_id):
+        prop_company_id = str(totals["company_id"])
+        snapshot = _snapshot_from_totals(totals)
+        expected[(prop_company_id, str(totals["property_id"]))] = snapshot
+
+        company_snapshot = expected.setdefault((prop_company_id, None), _empty_snapshot())
+        for field in ROLLUP_FIELDS:
+            company_snapshot[field] += snapshot[field]
+    return expected
+
+
+def rebuild_rollups(db: Session, company_id: Optional[Any] = None) -> int:
+    """
+    Recompute rollups from scratch for one company or the whole database.
+
+    The caller is responsible for committing. Returns the number of rows written.
+    """
+    db.flush()
+
+    delete_query = db.query(PortfolioRollup)
+    if company_id is not None:
+        delete_query = delete_query.filter(PortfolioRollup.company_id == str(company_id))
+    delete_query.delete(synchronize_session=False)
+
+    expected = _expected_rollups(db, company_id=company_id)
+    db.bulk_insert_mappings(PortfolioRollup, [
+        dict(snapshot, company_id=scope_company_id, property_id=scope_property_id)
+        for (scope_company_id, scope_property_id), snapshot in expected.items()
+    ])
+    db.flush()
+
+    return len(expected)
+
+
+def refresh_property_rollup(db: Session, property_id: Any) -> None:
+    """
+    Bring one property's rollup row up to date and apply the difference to
+    its company row. Call after mutating units/leases and before commit.
+
+    Cost is bounded by the size of the property, not the portfolio.
+    """
+    # SessionLocal runs with autoflush off; make pending unit changes visible
+    db.flush()
+
+    property_id = str(property_id)
+    property_row = db.query(PortfolioRollup).filter(
+        PortfolioRollup.property_id == property_id
+    ).first()
+
+    totals = get_property_totals(db, property_id=property_id)
+    if totals:
+        company_id = str(totals[0]["company_id"])
+        fresh = _snapshot_from_totals(totals[0])
+    elif property_row is not None:
+        # Property was hard-deleted
+        company_id = str(property_row.company_id)
+        fresh = _empty_snapshot()
+    else:
+        return
+
+    company_row = _company_row_query(db, company_id).first()
+    if company_row is None:
+        if db.query(PortfolioRollup.id).first() is None:
+            # First write since rollups were enabled: build every company, so
+            # portfolio-wide reads never sum a partial set
+            rebuild_rollups(db)
+        else:
+            # First write for a new company
+            rebuild_rollups(db, company_id=company_id)
+        return
+
+    delta = {
+        field: fresh[field] - old
+        for field, old in _snapshot_from_row(property_row).items()
+    }
+
+    if not totals:
+        db.delete(property_row)
+    elif property_row is None:
+        db.add(PortfolioRollup(company_id=company_id, property_id=property_id, **fresh))
+    else:
+        for field, value in fresh.items():
+            setattr(property_row, field, value)
+
+    changes = {
+        getattr(PortfolioRollup, field): getattr(PortfolioRollup, field) + value
+        for field, value in delta.items()
+        if value
+    }
+    if changes:
+        # Relative UPDATE so concurrent writers to the same company don't clobber each other
+        db.query(PortfolioRollup).filter(
+            PortfolioRollup.id == company_row.id
+        ).update(changes, synchronize_session=False)
+        db.expire(company_row)
+
+
+def check_rollups(db: Session, company_id: Optional[Any] = None) -> List[Dict[str, Any]]:
+    """
+    Compare stored rollups against source tables and report drift.
+
+    Each entry names the scope, the field and the expected/actual values;
+    an empty list means the rollups are consistent.
+    """
+    expected = _expected_rollups(db, company_id=company_id)
+
+    stored_query = db.query(PortfolioRollup)
+    if company_id is not None:
+        stored_query = stored_query.filter(PortfolioRollup.company_id == str(company_id))
+    stored = {
+        (str(row.company_id), str(row.property_id) if row.property_id is not None else None): row
+        for row in stored_query.all()
+    }
+
+    drift = []
+    for scope in expected.keys() | stored.keys():
+        scope_company_id, scope_property_id = scope
+        expected_values = expected.get(scope, _empty_snapshot())
+        actual_values = _snapshot_from_row(stored.get(scope))
+
+        if scope not in stored or scope not in expected:
+            drift.append({
+                "company_id": scope_company_id,
+                "property_id": scope_property_id,
+                "field": None,
+                "expected": "present" if scope in expected else "absent",
+                "actual": "present" if scope in stored else "absent",
+            })
+            continue
+
+        for field in ROLLUP_FIELDS:
+            if abs(expected_values[field] - actual_values[field]) > FLOAT_TOLERANCE:
+                drift.append({
+                    "company_id": scope_company_id,
+                    "property_id": scope_property_id,
+                    "field": field,
+                    "expected": expected_values[field],
+                    "actual": actual_values[field],
+                })
+
+    if drift:
+        logger.warning(f"Portfolio rollup drift detected in {len(drift)} field(s)")
+    return drift
+
+
+def _has_uncovered_company(db: Session) -> bool:
+    """Whether any company with properties lacks its company-wide rollup row"""
+    covered = db.query(PortfolioRollup.id).filter(
+        PortfolioRollup.company_id == Property.company_id,
+        PortfolioRollup.property_id.is_(None),
+    )
+    return db.query(Property.id).filter(~covered.exists()).first() is not None
+
+
+def get_rollup_metrics(
+    db: Session,
+    property_id: Optional[Any] = None,
+    company_id: Optional[Any] = None,
+    breakdown_limit: Optional[int] = 5,
+) -> Optional[Dict[str, Any]]:
+    """
+    Read dashboard metrics from the rollup table.
+
+    Returns None when the rollups don't cover the requested scope (not
+    built yet, or a company with properties has no company row) so callers
+    can fall back to live aggregation.
+    """
+    query = db.query(
+        func.count(PortfolioRollup.id),
+        *[func.coalesce(func.sum(getattr(PortfolioRollup, field)), 0) for field in ROLLUP_FIELDS]
+    )
+    if property_id is not None:
+        query = query.filter(PortfolioRollup.property_id == str(property_id))
+    else:
+        query = query.filter(PortfolioRollup.property_id.is_(None))
+    if company_id is not None:
+        query = query.filter(PortfolioRollup.company_id == str(company_id))
+
+    row_count, *values = query.one()
+    if not row_count:
+        return None
+    if property_id is None and company_id is None and _has_uncovered_company(db):
+        return None
+    totals = dict(zip(ROLLUP_FIELDS, values))
+
+    properties_breakdown = []
+    if breakdown_limit != 0:
+        breakdown_query = db.query(
+            Property.id, Property.name, Property.total_units,
+            PortfolioRollup.occupied_units, PortfolioRollup.monthly_revenue,
+        ).join(
+            PortfolioRollup, PortfolioRollup.property_id == Property.id
+        ).order_by(Property.created_at, Property.id)
+        if property_id is not None:
+            breakdown_query = breakdown_query.filter(Property.id == str(property_id))
+        if company_id is not None:
+            breakdown_query = breakdown_query.filter(Property.company_id == str(company_id))
+        if breakdown_limit is not None:
+            breakdown_query = breakdown_query.limit(breakdown_limit)
+
+        properties_breakdown = [
+            format_property_breakdown({
+                "property_id": prop_id,
+                "name": name,
+                "total_units": total_units or 0,
+                "occupied_units": occupied,
+                "monthly_revenue": float(revenue),
+            })
+            for prop_id, name, total_units, occupied, revenue in breakdown_query.all()
+        ]
+
+    return summarize_metrics(
+        total_properties=totals["property_count"],
+        total_units=totals["total_units"],
+        unit_breakdown={
+            UnitStatus.OCCUPIED.value: totals["occupied_units"],
+            UnitStatus.AVAILABLE.value: totals["available_units"],
+            UnitStatus.MAINTENANCE.value: totals["maintenance_units"],
+        },
+        unit_count=totals["unit_count"],
+        monthly_revenue=float(totals["monthly_revenue"]),
+        monthly_expenses=float(totals["monthly_expenses"]),
+        properties_breakdown=properties_breakdown,
+    )
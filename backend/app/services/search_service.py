@@ -0,0 +1,304 @@
+"""
+Full-text search service
+
+Replaces ``ILIKE '%term%'`` scans with an index-backed search:
+
+* PostgreSQL: a generated ``search_vector`` tsvector column with a GIN index
+  for ranked prefix matching, plus ``pg_trgm`` GIN indexes so substring
+  matches on name/address/city stay index-assisted.
+* SQLite (development): an FTS5 external-content table kept in sync with
+  triggers, ranked with bm25.
+
+Message content gets the same treatment for inbox search, with highlighted
+snippets. ``install_search`` is idempotent and runs from ``init_db``.
+"""
+import html
+import logging
+import re
+from typing import Any, List, Optional, Tuple, Union
+
+from sqlalchemy import Float, Integer, Select, column, func, literal_column, or_, select, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+
+from ..models import Conversation, Message, Property
+
+logger = logging.getLogger(__name__)
+
+# Indexed property columns, in bm25 weight order
+PROPERTY_SEARCH_COLUMNS = ("name", "address_line1", "city")
+SQLITE_BM25_WEIGHTS = (10.0, 2.0, 4.0)
+
+PROPERTY_FTS_TABLE = "properties_fts"
+MESSAGE_FTS_TABLE = "messages_fts"
+
+# Snippet highlight markers (private-use code points, swapped for <mark>
+# after the surrounding text has been HTML-escaped)
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_END = "\ue001"
+SNIPPET_TOKENS = 16
+
+SQLITE_TOKENIZER = "tokenize='unicode61 remove_diacritics 2', prefix='2 3'"
+
+
+def _sqlite_fts_ddl(source: str, fts_table: str, columns: Tuple[str, ...]) -> List[str]:
+    """FTS5 external-content table over ``source`` plus its sync triggers"""
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{name}" for name in columns)
+    old_values = ", ".join(f"old.{name}" for name in columns)
+    insert_new = f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.rowid, {new_values});"
+    delete_old = (
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) "
+        f"VALUES ('delete', old.rowid, {old_values});"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+        f"{column_list}, content='{source}', content_rowid='rowid', {SQLITE_TOKENIZER})",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {source} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {source} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {column_list} ON {source} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def _sqlite_fts_drop_ddl(fts_table: str) -> List[str]:
+    return [
+        f"DROP TRIGGER IF EXISTS {fts_table}_au",
+        f"DROP TRIGGER IF EXISTS {fts_table}_ad",
+        f"DROP TRIGGER IF EXISTS {fts_table}_ai",
+        f"DROP TABLE IF EXISTS {fts_table}",
+    ]
+
+
+SQLITE_PROPERTY_DDL = _sqlite_fts_ddl("properties", PROPERTY_FTS_TABLE, PROPERTY_SEARCH_COLUMNS)
+SQLITE_MESSAGE_DDL = _sqlite_fts_ddl("messages", MESSAGE_FTS_TABLE, ("content",))
+
+POSTGRES_PROPERTY_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE properties ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(city, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(address_line1, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_properties_search_vector ON properties USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_properties_name_trgm ON properties USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_properties_address_line1_trgm ON properties USING gin (address_line1 gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_properties_city_trgm ON properties USING gin (city gin_trgm_ops)",
+]
+
+POSTGRES_PROPERTY_DROP_DDL = [
+    "DROP INDEX IF EXISTS ix_properties_city_trgm",
+    "DROP INDEX IF EXISTS ix_properties_address_line1_trgm",
+    "DROP INDEX IF EXISTS ix_properties_name_trgm",
+    "DROP INDEX IF EXISTS ix_properties_search_vector",
+    "ALTER TABLE properties DROP COLUMN IF EXISTS search_vector",
+]
+
+POSTGRES_MESSAGE_DDL = [
+    """
+    ALTER TABLE messages ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_messages_search_vector ON messages USING gin (search_vector)",
+]
+
+POSTGRES_MESSAGE_DROP_DDL = [
+    "DROP INDEX IF EXISTS ix_messages_search_vector",
+    "ALTER TABLE messages DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _execute_all(bind: Connection, statements: List[str]) -> None:
+    for statement in statements:
+        bind.execute(text(statement))
+
+
+def _install(bind: Any, postgres_ddl: List[str], sqlite_ddl: List[str], fts_table: str, rebuild: bool) -> None:
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            _install(conn, postgres_ddl, sqlite_ddl, fts_table, rebuild)
+        return
+
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        _execute_all(bind, postgres_ddl)
+    elif dialect == "sqlite":
+        exists = bind.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": fts_table}
+        ).first()
+        _execute_all(bind, sqlite_ddl)
+        if rebuild or not exists:
+            bind.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+    else:
+        logger.warning(f"Full-text search not supported on {dialect}; falling back to ILIKE")
+
+
+def _drop(bind: Connection, postgres_ddl: List[str], sqlite_ddl: List[str]) -> None:
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        _execute_all(bind, postgres_ddl)
+    elif dialect == "sqlite":
+        _execute_all(bind, sqlite_ddl)
+
+
+def install_property_search(bind: Any, rebuild: bool = False) -> None:
+    """
+    Create the property search column/indexes (Postgres) or FTS5 table and
+    triggers (SQLite). Safe to call on every startup.
+
+    On SQLite the FTS table is (re)populated when first created or when
+    ``rebuild`` is set, e.g. after a VACUUM renumbers rowids.
+    """
+    _install(bind, POSTGRES_PROPERTY_DDL, SQLITE_PROPERTY_DDL, PROPERTY_FTS_TABLE, rebuild)
+
+
+def drop_property_search(bind: Connection) -> None:
+    """Remove everything install_property_search created"""
+    _drop(bind, POSTGRES_PROPERTY_DROP_DDL, _sqlite_fts_drop_ddl(PROPERTY_FTS_TABLE))
+
+
+def install_message_search(bind: Any, rebuild: bool = False) -> None:
+    """Message content counterpart of install_property_search"""
+    _install(bind, POSTGRES_MESSAGE_DDL, SQLITE_MESSAGE_DDL, MESSAGE_FTS_TABLE, rebuild)
+
+
+def drop_message_search(bind: Connection) -> None:
+    """Remove everything install_message_search created"""
+    _drop(bind, POSTGRES_MESSAGE_DROP_DDL, _sqlite_fts_drop_ddl(MESSAGE_FTS_TABLE))
+
+
+def install_search(bind: Any, rebuild: bool = False) -> None:
+    """Install every search index; called from init_db"""
+    install_property_search(bind, rebuild=rebuild)
+    install_message_search(bind, rebuild=rebuild)
+
+
+def search_terms(search: str) -> List[str]:
+    """Split user input into lowercase word tokens; punctuation is dropped"""
+    return re.findall(r"\w+", search.lower())
+
+
+def _tsquery(terms: List[str]):
+    """Postgres prefix query: every term must match the start of a word"""
+    return func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+
+
+def _fts5_match(terms: List[str]) -> str:
+    """FTS5 prefix query; quoting keeps terms from being read as operators"""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _ilike_filter(search: str):
+    pattern = f"%{search}%"
+    return or_(*[getattr(Property, name).ilike(pattern) for name in PROPERTY_SEARCH_COLUMNS])
+
+
+def apply_property_search(query: Query, search: str, dialect: Optional[str] = None) -> Tuple[Query, Optional[Any]]:
+    """
+    Restrict a Property query (or ``select(Property)`` with ``dialect``
+    given) to rows matching ``search``.
+
+    Every word is prefix-matched ("main st" finds "123 Main Street").
+    Every match is kept, so filters the caller applies before or after
+    see the whole match set and counts are exact. Returns the filtered
+    query and a rank expression to order by (best match first), or None
+    when the input has no searchable words and the plain ILIKE filter was
+    applied instead.
+    """
+    terms = search_terms(search)
+    dialect = dialect or query.session.get_bind().dialect.name
+
+    if not terms or dialect not in ("postgresql", "sqlite"):
+        return query.filter(_ilike_filter(search)), None
+
+    if dialect == "postgresql":
+        ts_query = _tsquery(terms)
+        search_vector = literal_column("properties.search_vector")
+        # Substring ILIKE keeps mid-word matches working; pg_trgm indexes back it
+        query = query.filter(or_(search_vector.op("@@")(ts_query), _ilike_filter(search)))
+        rank = func.ts_rank(search_vector, ts_query) + func.similarity(Property.name, search)
+        return query, rank.desc()
+
+    match = _fts5_match(terms)
+    weights = ", ".join(str(weight) for weight in SQLITE_BM25_WEIGHTS)
+    matches = text(
+        f"SELECT rowid AS property_rowid, bm25({PROPERTY_FTS_TABLE}, {weights}) AS rank "
+        f"FROM {PROPERTY_FTS_TABLE} WHERE {PROPERTY_FTS_TABLE} MATCH :match"
+    ).bindparams(match=match).columns(
+        column("property_rowid", Integer), column("rank", Float)
+    ).subquery("property_search")
+
+    query = query.join(matches, matches.c.property_rowid == literal_column("properties.rowid"))
+    # bm25 scores are negative; lower is a better match
+    return query, matches.c.rank.asc()
+
+
+def highlight_snippet(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a search snippet and turn the highlight markers into <mark> tags"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+
+
+def build_message_search(db: Union[Session, AsyncSession], search: str) -> Tuple[Select, Any, bool]:
+    """
+    Select for non-deleted messages matching ``search``, one row per message
+    with the conversation subject and a highlighted snippet.
+
+    Rows expose ``id``, ``conversation_id``, ``sender_name``, ``content``,
+    ``created_at``, ``conversation_subject`` and ``snippet`` (pass it through
+    highlight_snippet). Returns the statement and the column to keyset-paginate
+    on, newest first, and whether that column is unique on its own; callers
+    add access filters.
+    """
+    terms = search_terms(search)
+    dialect = db.get_bind().dialect.name
+    columns = (
+        Message.id,
+        Message.conversation_id,
+        Message.sender_name,
+        Message.content,
+        Message.created_at,
+        Conversation.subject.label("conversation_subject"),
+    )
+    sort_column = Message.created_at
+    unique_sort = False
+
+    if terms and dialect == "postgresql":
+        ts_query = _tsquery(terms)
+        snippet = func.ts_headline(
+            "simple", Message.content, ts_query,
+            f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, "
+            f"MaxWords={SNIPPET_TOKENS}, MinWords={SNIPPET_TOKENS // 2}"
+        )
+        query = select(*columns, snippet.label("snippet")).where(
+            literal_column("messages.search_vector").op("@@")(ts_query)
+        )
+    elif terms and dialect == "sqlite":
+        snippet = func.snippet(
+            literal_column(MESSAGE_FTS_TABLE), 0, HIGHLIGHT_START, HIGHLIGHT_END, "…", SNIPPET_TOKENS
+        )
+        # Rowids follow insertion order, and FTS5 can walk them backwards and
+        # stop at the page limit instead of sorting every match by created_at
+        sort_column = literal_column(f"{MESSAGE_FTS_TABLE}.rowid", Integer).label("search_rowid")
+        unique_sort = True
+        query = select(*columns, snippet.label("snippet"), sort_column).select_from(Message).join(
+            table(MESSAGE_FTS_TABLE),
+            literal_column(f"{MESSAGE_FTS_TABLE}.rowid") == literal_column("messages.rowid")
+        ).where(
+            text(f"{MESSAGE_FTS_TABLE} MATCH :message_match").bindparams(message_match=_fts5_match(terms))
+        )
+    else:
+        query = select(*columns, literal_column("NULL").label("snippet")).where(
+            Message.content.ilike(f"%{search}%")
+        )
+
+    query = query.join(
+        Conversation, Conversation.id == Message.conversation_id
+    ).where(Message.is_deleted == False)
+    return query, sort_column, unique_sort
@@ -0,0 +1,247 @@
+"""
+Bulk unit import service
+
+Reads CSV or NDJSON uploads row by row, validates them in chunks and
+inserts each valid chunk with one executemany. ``Property.total_units``
+and the rollups are refreshed once per touched property at the end
+instead of once per unit. An import is all or nothing: any invalid row
+rolls the whole upload back and the row errors are returned.
+"""
+import csv
+import io
+import json
+import logging
+import uuid
+from collections import Counter
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, ValidationError, field_validator
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+
+from ..models import Property, Unit, UnitStatus, UnitType
+from .rollup_service import refresh_property_rollup
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_IMPORT_ERRORS = 100
+
+# Column order for exports; imports accept the same columns
+UNIT_COLUMNS = (
+    "property_id", "unit_number", "unit_type", "floor", "status", "bedrooms", "bathrooms",
+    "square_feet", "market_rent", "deposit_amount", "is_furnished", "features",
+    "utilities_included", "notes",
+)
+
+
+def unit_type_for_bedrooms(bedrooms: int) -> UnitType:
+    """Default unit type when only a bedroom count is given"""
+    return UnitType.STUDIO if bedrooms == 0 else \
+        UnitType.ONE_BEDROOM if bedrooms == 1 else \
+        UnitType.TWO_BEDROOM if bedrooms == 2 else \
+        UnitType.THREE_BEDROOM if bedrooms == 3 else \
+        UnitType.FOUR_BEDROOM
+
+
+class UnitImportRow(BaseModel):
+    """One uploaded unit; ``rent_amount``/``amenities`` are accepted as aliases"""
+    property_id: str
+    unit_number: str
+    unit_type: Optional[UnitType] = None
+    floor: Optional[int] = None
+    status: UnitStatus = UnitStatus.AVAILABLE
+    bedrooms: int = 1
+    bathrooms: float = 1.0
+    square_feet: Optional[float] = None
+    market_rent: float
+    deposit_amount: Optional[float] = None
+    is_furnished: bool = False
+    features: List[str] = []
+    utilities_included: List[str] = []
+    notes: Optional[str] = None
+
+    @field_validator("unit_number")
+    @classmethod
+    def strip_unit_number(cls, value: str) -> str:
+        return value.strip()
+
+    @field_validator("property_id")
+    @classmethod
+    def normalize_property_id(cls, value: str) -> str:
+        # Canonical form, so ids match however they were written
+        return str(uuid.UUID(value.strip()))
+
+    @field_validator("features", "utilities_included", mode="before")
+    @classmethod
+    def split_list(cls, value: Any) -> Any:
+        # CSV cells hold ';'-separated values
+        if isinstance(value, str):
+            return [item.strip() for item in value.split(";") if item.strip()]
+        return value
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "UnitImportRow":
+        raw = dict(raw)
+        if "market_rent" not in raw and "rent_amount" in raw:
+            raw["market_rent"] = raw.pop("rent_amount")
+        if "features" not in raw and "amenities" in raw:
+            raw["features"] = raw.pop("amenities")
+        return cls.model_validate(raw)
+
+    def to_mapping(self) -> Dict[str, Any]:
+        mapping = self.model_dump()
+        mapping["unit_type"] = self.unit_type or unit_type_for_bedrooms(self.bedrooms)
+        if mapping["deposit_amount"] is None:
+            mapping["deposit_amount"] = self.market_rent  # Default to one month rent
+        return mapping
+
+
+def read_import_rows(file: BinaryIO, format: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Yield ``(line number, raw row, parse error)`` from an uploaded CSV (with
+    a header row) or NDJSON file, without reading it all into memory.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        if format == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                # Blank cells mean "use the default"
+                yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}, None
+        else:
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    yield line_number, None, "Invalid JSON"
+                    continue
+                if not isinstance(row, dict):
+                    yield line_number, None, "Expected a JSON object"
+                    continue
+                yield line_number, row, None
+    finally:
+        # Leave closing the upload to its owner
+        text.detach()
+
+
+class _UnitImport:
+    """State for one import: known properties, seen unit numbers, errors"""
+
+    def __init__(self, db: Session, chunk_size: int):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.properties: Dict[str, Any] = {}
+        self.missing_properties: Set[str] = set()
+        self.seen: Set[Tuple[str, str]] = set()
+        self.inserted: Counter = Counter()
+        self.errors: List[Dict[str, Any]] = []
+        self.rows = 0
+
+    def error(self, line: int, message: str) -> None:
+        self.errors.append({"line": line, "error": message})
+
+    def _resolve_properties(self, property_ids: Set[str]) -> None:
+        unknown = property_ids - self.properties.keys() - self.missing_properties
+        if not unknown:
+            return
+        # TODO: Restrict to the current user's company once auth is implemented
+        found = {str(pid): pid for (pid,) in self.db.execute(
+            select(Property.id).filter(Property.id.in_(unknown))
+        )}
+        self.properties.update(found)
+        self.missing_properties.update(unknown - found.keys())
+
+    def flush_chunk(self, chunk: List[Tuple[int, UnitImportRow]]) -> None:
+        self._resolve_properties({row.property_id for _, row in chunk})
+
+        # One query for unit numbers already taken in this chunk's properties
+        keys = {(row.property_id, row.unit_number) for _, row in chunk if row.property_id in self.properties}
+        existing: Set[Tuple[str, str]] = set()
+        if keys:
+            existing = {(str(pid), number) for pid, number in self.db.execute(
+                select(Unit.property_id, Unit.unit_number).filter(
+                    tuple_(Unit.property_id, Unit.unit_number).in_(
+                        [(self.properties[pid], number) for pid, number in keys]
+                    )
+                )
+            )}
+
+        mappings = []
+        for line, row in chunk:
+            key = (row.property_id, row.unit_number)
+            if row.property_id not in self.properties:
+                self.error(line, f"Property {row.property_id} not found")
+            elif key in existing:
+                self.error(line, f"Unit {key[1]} already exists in property {row.property_id}")
+            elif key in self.seen:
+                self.error(line, f"Duplicate unit {key[1]} for property {row.property_id} in upload")
+            else:
+                self.seen.add(key)
+                mapping = row.to_mapping()
+                mapping["property_id"] = self.properties[row.property_id]
+                mappings.append(mapping)
+
+        # Once anything failed the upload is rolled back; keep validating only
+        if mappings and not self.errors:
+            self.db.bulk_insert_mappings(Unit, mappings)
+            for mapping in mappings:
+                self.inserted[str(mapping["property_id"])] += 1
+
+    def finish(self) -> None:
+        """Recount total_units once per touched property and refresh its rollup"""
+        property_ids = [self.properties[pid] for pid in self.inserted]
+        unit_count = select(func.count(Unit.id)).filter(Unit.property_id == Property.id).scalar_subquery()
+        self.db.query(Property).filter(Property.id.in_(property_ids)).update(
+            {Property.total_units: unit_count}, synchronize_session=False
+        )
+        for property_id in property_ids:
+            refresh_property_rollup(self.db, property_id)
+
+
+def import_units(
+    db: Session,
+    rows: Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """
+    Validate and insert units from ``read_import_rows``. Commits when every
+    row is valid; otherwise rolls back and returns the first errors.
+    """
+    state = _UnitImport(db, chunk_size)
+    chunk: List[Tuple[int, UnitImportRow]] = []
+
+    for line, raw, parse_error in rows:
+        state.rows += 1
+        if parse_error:
+            state.error(line, parse_error)
+        else:
+            try:
+                chunk.append((line, UnitImportRow.from_raw(raw)))
+            except ValidationError as e:
+                for err in e.errors():
+                    state.error(line, f"{'.'.join(map(str, err['loc']))}: {err['msg']}")
+        if len(chunk) >= chunk_size:
+            state.flush_chunk(chunk)
+            chunk = []
+        if len(state.errors) >= MAX_IMPORT_ERRORS:
+            break
+    if chunk:
+        state.flush_chunk(chunk)
+
+    if state.errors:
+        db.rollback()
+        errors = sorted(state.errors, key=lambda error: error["line"])[:MAX_IMPORT_ERRORS]
+        return {"imported": 0, "rows": state.rows, "errors": errors}
+
+    state.finish()
+    db.commit()
+    logger.info("Imported %d units into %d properties", sum(state.inserted.values()), len(state.inserted))
+    return {
+        "imported": sum(state.inserted.values()),
+        "rows": state.rows,
+        "properties": {pid: count for pid, count in state.inserted.items()},
+        "errors": [],
+    }
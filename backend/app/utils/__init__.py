@@ -2,10 +2,55 @@
 Utility functions for the application
 """
 from .security import verify_password, get_password_hash, create_access_token, verify_token
+from .pagination import (
+    encode_cursor, decode_cursor, keyset_paginate, cached_count,
+    keyset_paginate_async, cached_count_async,
+)
+from .conditional import (
+    make_etag, etag_matches, request_matches_etag, not_modified, set_etag,
+    collection_version, probe_etag, probe_etag_async,
+)
+from .streaming import (
+    stream_rows, stream_entities, stream_rows_sync, ndjson_response, json_array_response, streaming_response, csv_response,
+)
+from .responses import FastJSONResponse, dumps, json_response
+from .instrumentation import (
+    InstrumentationMiddleware, current_stats, instrument_engine, instrument_pool, pool_status, render_metrics,
+)
 
 __all__ = [
     "verify_password",
     "get_password_hash",
     "create_access_token",
-    "verify_token"
+    "verify_token",
+    "encode_cursor",
+    "decode_cursor",
+    "keyset_paginate",
+    "cached_count",
+    "keyset_paginate_async",
+    "cached_count_async",
+    "make_etag",
+    "etag_matches",
+    "request_matches_etag",
+    "not_modified",
+    "set_etag",
+    "collection_version",
+    "probe_etag",
+    "probe_etag_async",
+    "stream_rows",
+    "stream_entities",
+    "stream_rows_sync",
+    "ndjson_response",
+    "json_array_response",
+    "streaming_response",
+    "csv_response",
+    "FastJSONResponse",
+    "dumps",
+    "json_response",
+    "InstrumentationMiddleware",
+    "current_stats",
+    "instrument_engine",
+    "instrument_pool",
+    "pool_status",
+    "render_metrics",
 ]
\ No newline at end of file
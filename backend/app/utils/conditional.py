@@ -0,0 +1,93 @@
+"""
+ETag and conditional GET helpers
+
+Entity endpoints build their ETag from a cheap version probe (ids,
+``updated_at`` columns, counts) run before the ORM load; when it matches
+the client's ``If-None-Match`` they answer 304 without loading or
+serializing anything. Collections use a weak ETag over the filtered set's
+``count`` and ``max(updated_at)``.
+"""
+import hashlib
+from datetime import date
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """Quoted ETag hashed from the version parts (ids, timestamps, counts)"""
+    digest = hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:32]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def request_matches_etag(request: Request, etag: Optional[str]) -> bool:
+    """True when the client's If-None-Match already covers ``etag``"""
+    return etag is not None and etag_matches(request.headers.get("if-none-match"), etag)
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 carrying the current ETag"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: Optional[str]) -> None:
+    """Attach ``etag`` to a 200 so the client can revalidate next time"""
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def conditional_response(request: Request, body: bytes, etag: str, media_type: str = "application/json") -> Response:
+    """200 with the body, or an empty 304 when the client already has this ETag"""
+    if request_matches_etag(request, etag):
+        return not_modified(etag)
+    response = Response(content=body, media_type=media_type)
+    set_etag(response, etag)
+    return response
+
+
+def collection_version(statement: Select, *max_columns: Any) -> Select:
+    """
+    ``count`` plus ``max`` of each column over a filtered select, ignoring
+    its ordering, eager loads and pagination
+    """
+    subquery = statement.order_by(None).limit(None).offset(None).with_only_columns(
+        *[column.label(f"v{i}") for i, column in enumerate(max_columns)],
+        maintain_column_froms=True,
+    ).subquery()
+    return select(func.count(), *[func.max(column) for column in subquery.c])
+
+
+def _row_etag(row: Optional[Any], weak: bool, daily: bool) -> Optional[str]:
+    if row is None:
+        return None
+    parts = list(row)
+    if daily:
+        # Responses with date-relative fields (expiring soon, days on market)
+        parts.append(date.today())
+    return make_etag(*parts, weak=weak)
+
+
+def probe_etag(db: Session, statement: Select, weak: bool = False, daily: bool = False) -> Optional[str]:
+    """ETag from the single row a version probe returns; None when it returns no row"""
+    return _row_etag(db.execute(statement).first(), weak, daily)
+
+
+async def probe_etag_async(db: AsyncSession, statement: Select, weak: bool = False, daily: bool = False) -> Optional[str]:
+    """Async ``probe_etag``"""
+    return _row_etag((await db.execute(statement)).first(), weak, daily)
@@ -0,0 +1,319 @@
+"""
+Per-request SQL and latency instrumentation
+
+SQLAlchemy cursor events add each statement's count and duration to the
+``RequestStats`` of the request being served (held in a contextvar, so it
+follows the request across awaits and threadpool hops). The ASGI
+middleware reports the totals three ways:
+
+- a ``Server-Timing`` header (``db`` and ``app`` durations), visible in
+  browser dev tools
+- one structured JSON log line per request on the ``app.requests`` logger
+- Prometheus histograms per route, rendered by ``render_metrics`` for the
+  ``/metrics`` endpoint
+
+Engines built on the ``Timed*Pool`` classes also time every connection
+checkout. ``pool_status`` reports their live state (checked out, overflow,
+checkout wait) for ``/metrics/pool``, and the same numbers are rendered as
+Prometheus gauges.
+"""
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.requests")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class RequestStats:
+    """SQL totals for one request"""
+
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats for the request being served, or None outside a request"""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # The execution context is per statement, so a failed statement can't
+    # skew the timing of the next one
+    context._instrument_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started = getattr(context, "_instrument_started", None)
+    if stats is not None and started is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the statement hooks to a sync engine (use ``async_engine.sync_engine`` for async)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class Histogram:
+    """Cumulative Prometheus histogram keyed by label values"""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            # [per-bucket counts..., sum, count]
+            series = self._series.setdefault(label_values, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for label_values, values in sorted(series.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            bucket_labels = f"{labels}," if labels else ""
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{self.name}_bucket{{{bucket_labels}le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{bucket_labels}le="+Inf"}} {values[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {values[-1]}")
+        return "\n".join(lines)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Time to serve a request, by route template.",
+    ("method", "route", "status"), DURATION_BUCKETS,
+)
+request_db_duration = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request.",
+    ("method", "route"), DURATION_BUCKETS,
+)
+request_queries = Histogram(
+    "http_request_queries", "SQL statements executed per request.",
+    ("method", "route"), QUERY_BUCKETS,
+)
+pool_wait = Histogram(
+    "db_pool_wait_seconds", "Time to check out a pooled connection, including opening one.",
+    ("pool",), POOL_WAIT_BUCKETS,
+)
+METRICS = [request_duration, request_db_duration, request_queries, pool_wait]
+
+
+class PoolWaitStats:
+    """Checkout totals for one pool"""
+
+    __slots__ = ("checkouts", "wait_time", "max_wait", "timeouts")
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+
+
+_pool_stats: Dict[str, PoolWaitStats] = {}
+_pool_engines: Dict[str, Engine] = {}
+_pool_lock = threading.Lock()
+
+
+def _record_checkout(name: str, waited: float, timed_out: bool) -> None:
+    pool_wait.observe((name,), waited)
+    with _pool_lock:
+        stats = _pool_stats.setdefault(name, PoolWaitStats())
+        stats.checkouts += 1
+        stats.wait_time += waited
+        stats.max_wait = max(stats.max_wait, waited)
+        stats.timeouts += timed_out
+
+
+class _TimedPoolMixin:
+    """Times ``connect()``: the wait for a free connection, or for a new one to open"""
+
+    metrics_name = "default"
+
+    def connect(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            _record_checkout(self.metrics_name, time.perf_counter() - started, timed_out)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting under the same name
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool that reports checkout waits"""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports checkout waits"""
+
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    """Report ``engine``'s pool as ``name`` in ``pool_status`` and ``/metrics``"""
+    engine.pool.metrics_name = name
+    _pool_engines[name] = engine
+
+
+def pool_status() -> Dict[str, Dict[str, Any]]:
+    """Live state of every instrumented pool in this worker"""
+    status = {}
+    for name, engine in _pool_engines.items():
+        pool = engine.pool
+        entry: Dict[str, Any] = {"class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update({
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                # Negative until the pool has opened pool_size connections
+                "overflow": pool.overflow(),
+            })
+        with _pool_lock:
+            stats = _pool_stats.get(name) or PoolWaitStats()
+            entry["checkouts"] = stats.checkouts
+            entry["wait_ms_mean"] = round(stats.wait_time / stats.checkouts * 1000, 3) if stats.checkouts else 0.0
+            entry["wait_ms_max"] = round(stats.max_wait * 1000, 3)
+            entry["timeouts"] = stats.timeouts
+        status[name] = entry
+    return status
+
+
+def _render_pool_gauges() -> str:
+    gauges = {
+        "db_pool_size": ("gauge", "Configured pool size.", "size"),
+        "db_pool_checked_out": ("gauge", "Connections currently checked out.", "checked_out"),
+        "db_pool_overflow": ("gauge", "Connections open beyond the pool size (negative: not yet opened).", "overflow"),
+        "db_pool_timeouts_total": ("counter", "Checkouts that gave up after the pool timeout.", "timeouts"),
+    }
+    status = pool_status()
+    lines = []
+    for metric, (kind, documentation, key) in gauges.items():
+        lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} {kind}"]
+        for name, entry in sorted(status.items()):
+            if key in entry:
+                lines.append(f'{metric}{{pool="{_escape(name)}"}} {entry[key]}')
+    return "\n".join(lines)
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of every registered histogram and the pool gauges"""
+    return "\n".join([metric.render() for metric in METRICS] + [_render_pool_gauges()]) + "\n"
+
+
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    return (
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+        f"app;dur={elapsed * 1000:.1f}"
+    )
+
+
+def _route_template(scope: Scope) -> str:
+    """Route path template (``/api/v1/units/{unit_id}``) so labels stay low-cardinality"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware collecting SQL totals and latency for each HTTP request"""
+
+    def __init__(self, app: ASGIApp, slow_request_ms: float = 1000.0):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        response = {"status": 500, "finished": None}
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stats, time.perf_counter() - started))
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                response["finished"] = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            # Background tasks run after the body is sent; don't bill them to latency
+            elapsed = (response["finished"] or time.perf_counter()) - started
+            self._record(scope, response["status"], stats, elapsed)
+
+    def _record(self, scope: Scope, status: int, stats: RequestStats, elapsed: float) -> None:
+        method, route = scope["method"], _route_template(scope)
+        request_duration.observe((method, route, str(status)), elapsed)
+        request_db_duration.observe((method, route), stats.db_time)
+        request_queries.observe((method, route), stats.queries)
+
+        duration_ms = elapsed * 1000
+        level = logging.WARNING if duration_ms >= self.slow_request_ms else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps({
+                "event": "request",
+                "method": method,
+                "route": route,
+                "path": scope["path"],
+                "status": status,
+                "duration_ms": round(duration_ms, 2),
+                "db_ms": round(stats.db_time * 1000, 2),
+                "queries": stats.queries,
+            }))
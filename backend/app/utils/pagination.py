@@ -0,0 +1,194 @@
+"""
+Keyset (cursor) pagination helpers
+
+List endpoints page on ``(sort column, id)`` instead of OFFSET, so fetching
+page N costs the same as fetching page 1. Cursors are opaque to clients:
+a URL-safe base64 blob holding the last row's sort value (a timestamp or
+an integer) and id.
+"""
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(sort_value: Union[datetime, int], row_id: Any) -> str:
+    """Build an opaque cursor pointing just past the given row"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Union[datetime, int], str]:
+    """Parse a cursor produced by encode_cursor, rejecting anything malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(sort_value, int):
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def _apply_keyset(query, model, cursor, sort_column, descending, unique_sort):
+    """Add the cursor filter and keyset ordering to a Query or Select"""
+    sort_column = sort_column if sort_column is not None else model.created_at
+    id_column = model.id
+
+    if cursor:
+        last_value, last_id = decode_cursor(cursor)
+        if unique_sort:
+            query = query.filter(sort_column < last_value if descending else sort_column > last_value)
+        elif descending:
+            query = query.filter(or_(
+                sort_column < last_value,
+                and_(sort_column == last_value, id_column < last_id)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > last_value,
+                and_(sort_column == last_value, id_column > last_id)
+            ))
+
+    order = [sort_column] if unique_sort else [sort_column, id_column]
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in order])
+    return query, sort_column.key
+
+
+def _page(rows: List[Any], limit: int, sort_attr: str) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and build the next cursor"""
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_attr), last.id)
+
+
+def keyset_paginate(
+    query: Query,
+    model: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    sort_column: Any = None,
+    descending: bool = False,
+    unique_sort: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Apply keyset pagination ordered by ``(sort_column, model.id)``.
+
+    ``sort_column`` defaults to ``model.created_at``. Set ``unique_sort`` when
+    the sort column alone identifies a row (e.g. a rowid) to drop the id
+    tie-break, letting the database walk that column's order directly.
+    Returns the page of rows and the cursor for the next page (None on the
+    last page).
+    """
+    query, sort_attr = _apply_keyset(query, model, cursor, sort_column, descending, unique_sort)
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.limit(limit + 1).all()
+    return _page(rows, limit, sort_attr)
+
+
+async def keyset_paginate_async(
+    db: AsyncSession,
+    statement: Select,
+    model: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    sort_column: Any = None,
+    descending: bool = False,
+    unique_sort: bool = False,
+    scalars: bool = True,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    keyset_paginate for a ``select()`` run on an AsyncSession. Pass
+    ``scalars=False`` when the statement selects columns rather than a
+    single entity.
+    """
+    statement, sort_attr = _apply_keyset(statement, model, cursor, sort_column, descending, unique_sort)
+
+    result = await db.execute(statement.limit(limit + 1))
+    rows = list(result.scalars().all() if scalars else result.all())
+    return _page(rows, limit, sort_attr)
+
+
+class CountCache:
+    """
+    Small in-process TTL cache for collection totals.
+
+    COUNT(*) over a filtered table is linear in the matching rows; caching it
+    per filter set keeps deep scrolling constant-time at the cost of the
+    total being up to ``ttl`` seconds stale.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Any, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Any, compute: Callable[[], int]) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        value = compute()
+        self._store(key, value, now)
+        return value
+
+    def _store(self, key: Any, value: int, now: float) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop expired entries first, then the oldest if still full
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (now + self.ttl, value)
+
+    async def get_or_compute_async(self, key: Any, compute: Callable[[], Awaitable[int]]) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        value = await compute()
+        self._store(key, value, now)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache()
+
+
+def cached_count(query: Query, key: Any) -> int:
+    """Total for a filtered query, served from the shared count cache"""
+    return count_cache.get_or_compute(key, lambda: query.order_by(None).count())
+
+
+
+async def cached_count_async(db: AsyncSession, statement: Select, key: Any) -> int:
+    """cached_count for a ``select()`` run on an AsyncSession"""
+    async def compute() -> int:
+        counted = select(func.count()).select_from(statement.order_by(None).subquery())
+        return await db.scalar(counted)
+
+    return await count_cache.get_or_compute_async(key, compute)
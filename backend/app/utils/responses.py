@@ -0,0 +1,64 @@
+"""
+Fast JSON responses
+
+``FastJSONResponse`` (the app's default response class) renders with
+orjson, which encodes datetimes, dates, UUIDs and enums natively. Anything
+else falls back to FastAPI's ``jsonable_encoder``, so output matches the
+stock ``JSONResponse``.
+
+Endpoints returning plain dicts still pay for FastAPI's ``jsonable_encoder``
+pass before rendering, and on large payloads that pass costs far more than
+the JSON encoding. Large plain-dict endpoints return ``json_response(...)``
+to skip it. Endpoints that return ORM objects or other values only
+``jsonable_encoder`` understands keep returning them and go through the
+encoder as before.
+"""
+import json
+from typing import Any, Mapping, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def json_default(value: Any) -> Any:
+    """orjson fallback for types it doesn't encode natively (Decimal, models, sets...)"""
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Encode ``content`` as the stock JSONResponse would, through orjson"""
+    try:
+        return orjson.dumps(content, default=json_default, option=ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        # Integers beyond 64 bits and the like: the stdlib handles them
+        return json.dumps(
+            jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(
+    content: Any,
+    response: Optional[Response] = None,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> FastJSONResponse:
+    """
+    Return ``content`` without FastAPI's ``jsonable_encoder`` pass. Headers
+    already set on the endpoint's injected ``response`` (ETag, cookies) are
+    carried over, since FastAPI ignores it once a Response is returned.
+    """
+    rendered = FastJSONResponse(content, status_code=status_code, headers=headers)
+    if response is not None:
+        rendered.headers.raw.extend(response.headers.raw)
+    return rendered
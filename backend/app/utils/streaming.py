@@ -0,0 +1,163 @@
+"""
+Streaming response helpers
+
+Rows come from ``stream_rows`` (or ``stream_rows_sync`` for sync
+sessions), which read the result through a server-side cursor in
+``yield_per`` batches, and are encoded and sent a batch at a time, so
+memory stays flat however many rows a response holds.
+
+List endpoints take ``stream=json`` (one chunked JSON array) or
+``stream=ndjson`` (one object per line) to return every matching row this
+way instead of a page.
+"""
+import csv
+import enum
+import io
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Literal, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import iterate_in_threadpool
+
+from .responses import dumps
+
+STREAM_BATCH_SIZE = 1000
+
+StreamFormat = Literal["json", "ndjson"]
+STREAM_QUERY_DESCRIPTION = "Stream every matching row as a chunked JSON array or NDJSON instead of a page"
+
+
+async def stream_rows(
+    db: AsyncSession,
+    statement: Select,
+    batch_size: int = STREAM_BATCH_SIZE,
+    scalars: bool = False,
+) -> AsyncIterator[Sequence[Any]]:
+    """Yield lists of up to ``batch_size`` rows (or entities) from a server-side cursor"""
+    result = await db.stream(statement.execution_options(yield_per=batch_size))
+    if scalars:
+        result = result.scalars()
+    async for partition in result.partitions():
+        yield partition
+
+
+async def stream_entities(
+    db: AsyncSession,
+    statement: Select,
+    model: Any,
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> AsyncIterator[Sequence[Any]]:
+    """
+    Stream ORM entities with their eager loads. Primary keys come off the
+    server-side cursor in ``statement``'s order; each batch of entities is
+    then loaded by id, so selectin loads run once per batch (SQLAlchemy
+    can't run them inside a ``yield_per`` result).
+    """
+    keys = statement.with_only_columns(model.id, maintain_column_froms=True)
+    async for batch in stream_rows(db, keys, batch_size):
+        ids = [row[0] for row in batch]
+        loaded = {
+            entity.id: entity
+            for entity in (await db.scalars(statement.order_by(None).filter(model.id.in_(ids)))).unique()
+        }
+        yield [loaded[id] for id in ids if id in loaded]
+
+
+def stream_rows_sync(
+    db: Session,
+    statement: Select,
+    batch_size: int = STREAM_BATCH_SIZE,
+    scalars: bool = False,
+) -> AsyncIterator[Sequence[Any]]:
+    """``stream_rows`` for a sync session; batches are fetched in the threadpool"""
+    def batches() -> Iterator[Sequence[Any]]:
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        if scalars:
+            result = result.scalars()
+        yield from result.partitions()
+
+    return iterate_in_threadpool(batches())
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (list, tuple)):
+        # Multi-valued cells (features, utilities) are ';'-separated
+        return ";".join(map(str, value))
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _attachment(filename: Optional[str]) -> Dict[str, str]:
+    return {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else {}
+
+
+def ndjson_response(
+    batches: AsyncIterator[Sequence[Any]],
+    serialize: Callable[[Any], Dict[str, Any]],
+    filename: Optional[str] = None,
+) -> StreamingResponse:
+    """One JSON object per line, one chunk per batch"""
+    async def body():
+        async for batch in batches:
+            yield b"".join(dumps(serialize(row)) + b"\n" for row in batch)
+
+    return StreamingResponse(body(), media_type="application/x-ndjson", headers=_attachment(filename))
+
+
+def json_array_response(
+    batches: AsyncIterator[Sequence[Any]],
+    serialize: Callable[[Any], Dict[str, Any]],
+) -> StreamingResponse:
+    """A single JSON array, sent one chunk per batch"""
+    async def body():
+        separator = b"["
+        async for batch in batches:
+            if batch:
+                yield separator + b",".join(dumps(serialize(row)) for row in batch)
+                separator = b","
+        yield b"[]" if separator == b"[" else b"]"
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
+def streaming_response(
+    batches: AsyncIterator[Sequence[Any]],
+    serialize: Callable[[Any], Dict[str, Any]],
+    format: StreamFormat,
+) -> StreamingResponse:
+    """Response for a list endpoint's ``stream`` parameter"""
+    if format == "ndjson":
+        return ndjson_response(batches, serialize)
+    return json_array_response(batches, serialize)
+
+
+def csv_response(
+    batches: AsyncIterator[Sequence[Any]],
+    columns: Sequence[str],
+    serialize: Callable[[Any], Dict[str, Any]],
+    filename: Optional[str] = None,
+) -> StreamingResponse:
+    """CSV with a header row, one chunk per batch"""
+    async def body():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        async for batch in batches:
+            for row in batch:
+                values = serialize(row)
+                writer.writerow([_csv_value(values.get(column)) for column in columns])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    return StreamingResponse(body(), media_type="text/csv", headers=_attachment(filename))
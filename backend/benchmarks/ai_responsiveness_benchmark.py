@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+AI provider responsiveness benchmark
+
+Swaps the OpenAI client for a local mock provider whose completions take
+``--delay`` seconds, fires concurrent ``POST /api/v1/ai/assistant/chat``
+requests at the app (in process, one event loop, like a uvicorn worker) and
+polls ``GET /health`` meanwhile. Three runs:
+
+- blocking: the completion blocks the event loop, as calling the sync
+  ``openai.OpenAI`` client from an ``async def`` route did. Every other
+  request waits behind each completion.
+- gated: the async client under its ProviderGate (``--limit`` concurrent
+  calls). Completions overlap and ``/health`` stays fast.
+- timeout: the same with a gate timeout below the provider delay; chats
+  fall back to canned answers after the timeout instead of waiting.
+
+Prints chat and health latencies for each run.
+
+Usage:
+    python benchmarks/ai_responsiveness_benchmark.py
+    python benchmarks/ai_responsiveness_benchmark.py --requests 50 --delay 2 --limit 10
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_ai.db")
+
+import httpx
+
+from app.main import app
+from app.services.ai_service import ProviderGate, ai_service
+from app.services.auth_service import get_current_user
+
+CHAT_PATH = "/api/v1/ai/assistant/chat"
+
+
+class MockCompletions:
+    """Stands in for ``client.chat.completions``: answers after ``delay`` seconds"""
+
+    def __init__(self, delay: float, blocking: bool):
+        self.delay = delay
+        self.blocking = blocking
+
+    async def create(self, **kwargs):
+        if self.blocking:
+            time.sleep(self.delay)
+        else:
+            await asyncio.sleep(self.delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Mock provider answer"))])
+
+
+class MockProvider:
+    def __init__(self, delay: float, blocking: bool):
+        self.chat = SimpleNamespace(completions=MockCompletions(delay, blocking))
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_load(args) -> dict:
+    chats, probes, models = [], [], []
+    done = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def chat():
+            started = time.perf_counter()
+            response = await client.post(CHAT_PATH, json={"message": "How do I reduce vacancy?"})
+            chats.append(time.perf_counter() - started)
+            models.append(response.json()["model"])
+
+        async def probe():
+            # Timed from when the probe was due, so a stalled loop counts
+            while not done.is_set():
+                due = time.perf_counter() + args.probe_interval
+                await asyncio.sleep(args.probe_interval)
+                await client.get("/health")
+                probes.append(time.perf_counter() - due)
+
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(chat() for _ in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    return {
+        "elapsed_s": elapsed,
+        "chat_p50_ms": statistics.median(chats) * 1000,
+        "chat_max_ms": max(chats) * 1000,
+        "health_p50_ms": statistics.median(probes) * 1000,
+        "health_p95_ms": percentile(probes, 0.95) * 1000,
+        "health_max_ms": max(probes) * 1000,
+        "probes": len(probes),
+        "fallbacks": models.count("fallback"),
+    }
+
+
+async def run_mode(mode: str, args) -> dict:
+    gate_timeout = args.delay / 2 if mode == "timeout" else args.delay * args.requests
+    ai_service.gates["openai"] = ProviderGate("openai", args.limit, gate_timeout)
+    ai_service.openai_client = MockProvider(args.delay, blocking=mode == "blocking")
+    return await run_load(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event loop responsiveness during slow AI completions")
+    parser.add_argument("--requests", type=int, default=20, help="Concurrent chat requests")
+    parser.add_argument("--delay", type=float, default=0.5, help="Mock provider latency per completion, seconds")
+    parser.add_argument("--limit", type=int, default=8, help="Gate concurrency limit for the gated runs")
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    app.dependency_overrides[get_current_user] = lambda: None
+    # Slow-request and fallback logs would drown the results
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+
+    print(f"{args.requests} concurrent chats, provider delay {args.delay}s, gate limit {args.limit}")
+    for mode in ("blocking", "gated", "timeout"):
+        result = asyncio.run(run_mode(mode, args))
+        print(f"{mode:9} total {result['elapsed_s']:6.2f}s   "
+              f"chat p50 {result['chat_p50_ms']:7.0f} ms max {result['chat_max_ms']:7.0f} ms   "
+              f"health p50 {result['health_p50_ms']:6.1f} ms p95 {result['health_p95_ms']:7.1f} ms "
+              f"max {result['health_max_ms']:7.1f} ms ({result['probes']} probes)   "
+              f"fallbacks {result['fallbacks']}")
+
+
+if __name__ == "__main__":
+    main()
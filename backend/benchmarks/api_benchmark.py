@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+API latency benchmark suite
+
+Seeds a synthetic portfolio through the ORM models, then drives the
+FastAPI app in-process over httpx's ASGI transport. Each endpoint is hit
+sequentially and reported with p50/p95/p99 latency, SQL statements per
+request and peak Python allocations per request.
+
+Results are written as JSON so runs can be diffed across commits; pass
+``--compare`` with an earlier result file to flag latency or query-count
+regressions (exits 1 when any are found).
+
+Usage:
+    DATABASE_URL=sqlite:///./bench_api.db python benchmarks/api_benchmark.py --output before.json
+    python benchmarks/api_benchmark.py --units 50000 --messages 100000 --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import date, datetime, timedelta
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_api.db")
+
+import httpx
+from sqlalchemy import event, insert
+
+from app.database import Base, SessionLocal, async_engine, engine
+from app.main import app
+from app.models import (
+    Company, User, Property, PropertyType, Unit, UnitStatus, UnitType,
+    Tenant, Lease, LeaseStatus, LeaseType,
+    Conversation, ConversationParticipant, Message, ParticipantType,
+)
+from app.services.auth_service import get_current_user
+from app.services.inbox_service import rebuild_inbox_state
+from app.services.rollup_service import rebuild_rollups
+from app.services.search_service import install_search
+
+BATCH_SIZE = 5_000
+MESSAGES_PER_CONVERSATION = 20
+
+NAMES = ["Oak", "Maple", "Cedar", "Willow", "Pine", "Birch", "Aspen", "Elm", "Harbor", "Summit"]
+WORDS = ["faucet", "leak", "rent", "payment", "lease", "renewal", "parking", "noise", "heater", "repair"]
+STATUSES = [UnitStatus.OCCUPIED] * 7 + [UnitStatus.AVAILABLE] * 2 + [UnitStatus.MAINTENANCE]
+
+# name -> path; {placeholders} are filled from the seeded ids
+ENDPOINTS = {
+    "dashboard_metrics": "/api/v1/dashboard/metrics",
+    "properties_list": "/api/v1/properties/?page_size=20",
+    "properties_search": "/api/v1/properties/?search=maple&page_size=20",
+    "units_page": "/api/v1/units/?limit=50",
+    "units_by_property": "/api/v1/units/?property_id={property_id}",
+    "conversations": "/api/v1/messaging/conversations?limit=50",
+    "conversation_messages": "/api/v1/messaging/conversations/{conversation_id}/messages?limit=50",
+    "message_search": "/api/v1/messaging/search?q=faucet",
+}
+
+
+class QueryCounter:
+    """Counts cursor executions on the sync and async engines"""
+
+    def __init__(self):
+        self.count = 0
+        for target in (engine, async_engine.sync_engine):
+            event.listen(target, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def insert_batches(db, model, rows) -> int:
+    """ORM bulk INSERT of an iterator of row dicts; returns the row count"""
+    total, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            db.execute(insert(model), batch)
+            total, batch = total + len(batch), []
+    if batch:
+        db.execute(insert(model), batch)
+        total += len(batch)
+    return total
+
+
+def seed(n_properties: int, n_units: int, n_leases: int, n_messages: int) -> dict:
+    """Create the schema and load a portfolio; returns the ids endpoints are called with"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    install_search(engine)
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    today = date.today()
+    new_id = lambda: str(uuid.uuid4())
+    company_id = new_id()
+    user_ids = [new_id() for _ in range(10)]
+    property_ids = [new_id() for _ in range(n_properties)]
+    unit_ids = [new_id() for _ in range(n_units)]
+    tenant_ids = [new_id() for _ in range(max(1, n_leases))]
+    n_conversations = max(1, n_messages // MESSAGES_PER_CONVERSATION)
+    conversation_ids = [new_id() for _ in range(n_conversations)]
+    lease_ids = []
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        db.execute(insert(Company), [{"id": company_id, "name": "Benchmark Co", "email": "bench@example.com"}])
+        insert_batches(db, User, (
+            {"id": user_id, "email": f"user{i}@example.com", "hashed_password": "x",
+             "first_name": "Bench", "last_name": str(i), "company_id": company_id}
+            for i, user_id in enumerate(user_ids)
+        ))
+        insert_batches(db, Property, (
+            {"id": property_id, "name": f"{NAMES[i % len(NAMES)]} Residences {i}",
+             "property_type": PropertyType.APARTMENT, "address_line1": f"{100 + i} Main St",
+             "city": "Kansas City", "state": "MO", "postal_code": "64101", "company_id": company_id,
+             "total_units": n_units // n_properties, "monthly_operating_expenses": 5000,
+             "created_at": now - timedelta(seconds=i)}
+            for i, property_id in enumerate(property_ids)
+        ))
+        insert_batches(db, Unit, (
+            {"id": unit_id, "unit_number": str(i), "unit_type": UnitType.ONE_BEDROOM,
+             "status": UnitStatus.OCCUPIED if i < n_leases else STATUSES[i % len(STATUSES)],
+             "market_rent": 1000 + i % 1000, "bedrooms": 1, "bathrooms": 1.0,
+             "property_id": property_ids[i % n_properties], "created_at": now - timedelta(seconds=i)}
+            for i, unit_id in enumerate(unit_ids)
+        ))
+        insert_batches(db, Tenant, (
+            {"id": tenant_id, "first_name": "Tenant", "last_name": str(i), "email": f"tenant{i}@example.com",
+             "phone": "555-0100", "company_id": company_id}
+            for i, tenant_id in enumerate(tenant_ids)
+        ))
+
+        def leases():
+            for i in range(min(n_leases, n_units)):
+                lease_ids.append(new_id())
+                yield {
+                    "id": lease_ids[-1], "lease_type": LeaseType.FIXED_TERM, "status": LeaseStatus.ACTIVE,
+                    "start_date": today - timedelta(days=rng.randint(0, 300)),
+                    "end_date": today + timedelta(days=rng.randint(1, 365)),
+                    "rent_amount": 1000 + i % 1000, "deposit_amount": 1000, "unit_id": unit_ids[i],
+                    "tenant_id": tenant_ids[i], "company_id": company_id,
+                    "created_at": now - timedelta(seconds=i),
+                }
+
+        insert_batches(db, Lease, leases())
+        insert_batches(db, Conversation, (
+            {"id": conversation_id, "created_by_id": user_ids[0], "subject": f"Conversation {i}",
+             "property_id": property_ids[i % n_properties], "last_message_at": now - timedelta(minutes=i)}
+            for i, conversation_id in enumerate(conversation_ids)
+        ))
+        insert_batches(db, ConversationParticipant, (
+            {"id": new_id(), "conversation_id": conversation_id, "user_id": user_id,
+             "participant_type": participant_type, "participant_name": name, "joined_at": now}
+            for i, conversation_id in enumerate(conversation_ids)
+            for user_id, participant_type, name in (
+                (user_ids[0], ParticipantType.MANAGER, "Bench 0"),
+                (None, ParticipantType.TENANT, f"Tenant {i}"),
+            )
+        ))
+        insert_batches(db, Message, (
+            {"id": new_id(), "conversation_id": conversation_ids[i % n_conversations],
+             "sender_id": user_ids[0] if i % 2 else None, "sender_name": "Bench",
+             "sender_type": ParticipantType.MANAGER if i % 2 else ParticipantType.TENANT,
+             "content": f"About the {' '.join(rng.sample(WORDS, 4))} - ref {i}",
+             "is_read": i % 3 == 0, "created_at": now - timedelta(seconds=i)}
+            for i in range(n_messages)
+        ))
+
+        # Production state: inbox denormalization and rollups built
+        rebuild_inbox_state(db)
+        rebuild_rollups(db)
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"Seeded {n_properties:,} properties, {n_units:,} units, {len(lease_ids):,} leases and "
+          f"{n_messages:,} messages in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return {
+        "user_id": user_ids[0],
+        "property_id": property_ids[0],
+        "conversation_id": conversation_ids[0],
+    }
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))]
+
+
+async def measure(client: httpx.AsyncClient, counter: QueryCounter, path: str, args) -> dict:
+    for _ in range(args.warmup):
+        response = await client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}: {response.text[:200]}")
+
+    latencies, queries = [], []
+    for _ in range(args.requests):
+        before = counter.count
+        started = time.perf_counter()
+        response = await client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count - before)
+
+    # Allocation pass runs separately; tracemalloc would skew the latencies
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(args.alloc_requests):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await client.get(path)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "path": path,
+        "requests": args.requests,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "queries": int(statistics.median(queries)),
+        "queries_max": max(queries),
+        "peak_alloc_kb": round(statistics.median(peaks) / 1024, 1),
+        "response_bytes": len(response.content),
+    }
+
+
+async def run(ids: dict, args) -> dict:
+    counter = QueryCounter()
+    user = SessionLocal().get(User, ids["user_id"])
+    app.dependency_overrides[get_current_user] = lambda: user
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, path in ENDPOINTS.items():
+                if args.only and name not in args.only:
+                    continue
+                results[name] = await measure(client, counter, path.format(**ids), args)
+                result = results[name]
+                print(f"{name:24} p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}  "
+                      f"p99 {result['p99_ms']:8.2f} ms  {result['queries']:3} queries  "
+                      f"{result['peak_alloc_kb']:9.1f} KiB", file=sys.stderr)
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        await async_engine.dispose()
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Endpoints whose p95 grew by more than `threshold` or that issue more queries"""
+    regressions = []
+    for name, result in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        if result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+        if result["queries"] > before["queries"]:
+            regressions.append(f"{name}: queries {before['queries']} -> {result['queries']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API endpoint latency")
+    parser.add_argument("--properties", type=int, default=200)
+    parser.add_argument("--units", type=int, default=10_000)
+    parser.add_argument("--leases", type=int, default=7_000)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=50, help="Timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--alloc-requests", type=int, default=3, help="Requests traced for allocations")
+    parser.add_argument("--only", nargs="*", choices=sorted(ENDPOINTS), help="Endpoints to run")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--compare", help="Earlier JSON result to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative p95 growth")
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url}", file=sys.stderr)
+    ids = seed(args.properties, args.units, args.leases, args.messages)
+    endpoints = asyncio.run(run(ids, args))
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "seed": {"properties": args.properties, "units": args.units,
+                 "leases": args.leases, "messages": args.messages},
+        "endpoints": endpoints,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(f"❌ {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
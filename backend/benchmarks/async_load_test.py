@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Async database load test
+
+Seeds a synthetic portfolio, serves the app with uvicorn (one worker) and
+fires concurrent HTTP requests at the dashboard metrics aggregate two ways:
+
+- legacy: an ``async def`` route querying through the sync ``get_db``
+  session, as every router did before the async migration. Each query
+  blocks the event loop, so concurrent requests run one at a time.
+- async: the migrated ``/api/v1/dashboard/metrics`` route on
+  ``get_async_db``, whose queries are awaited.
+
+While each load runs, a probe polls ``/health`` to show how long an
+unrelated cheap request waits behind the database work. Prints throughput
+and latency percentiles for both.
+
+Usage:
+    DATABASE_URL=sqlite:///./bench_async.db python benchmarks/async_load_test.py
+    python benchmarks/async_load_test.py --units 200000 --requests 400 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_async.db")
+
+import httpx
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from app.database import Base, engine, get_db
+from app.main import app
+from app.models import Company, Property, PropertyType, Unit, UnitStatus, UnitType
+from app.services.metrics_service import get_portfolio_metrics
+
+BATCH_SIZE = 10_000
+UNITS_PER_PROPERTY = 100
+STATUSES = [UnitStatus.OCCUPIED] * 7 + [UnitStatus.AVAILABLE] * 2 + [UnitStatus.MAINTENANCE]
+
+LEGACY_PATH = "/bench/legacy/dashboard/metrics"
+ASYNC_PATH = "/api/v1/dashboard/metrics"
+
+
+@app.get(LEGACY_PATH, include_in_schema=False)
+async def legacy_dashboard_metrics(db: Session = Depends(get_db)):
+    """The pre-migration pattern: sync session calls inside an async route"""
+    return get_portfolio_metrics(db)
+
+
+def seed(n_units: int) -> None:
+    """Load a synthetic portfolio; rollups stay unbuilt so metrics aggregate live"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    now = datetime.utcnow()
+    stamp = {"created_at": now, "updated_at": now}
+    company_id = str(uuid.uuid4())
+    property_ids = [str(uuid.uuid4()) for _ in range(max(1, n_units // UNITS_PER_PROPERTY))]
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(Company.__table__.insert(), [{"id": company_id, "name": "Benchmark Co", "email": "bench@example.com", **stamp}])
+        conn.execute(Property.__table__.insert(), [
+            {"id": property_id, "name": f"Property {i}", "property_type": PropertyType.APARTMENT,
+             "address_line1": f"{i} Main St", "city": "Kansas City", "state": "MO", "postal_code": "64101",
+             "company_id": company_id, "total_units": UNITS_PER_PROPERTY, "monthly_operating_expenses": 5000, **stamp}
+            for i, property_id in enumerate(property_ids)
+        ])
+        batch = []
+        for i in range(n_units):
+            batch.append({
+                "id": str(uuid.uuid4()), "unit_number": str(i % UNITS_PER_PROPERTY), "unit_type": UnitType.ONE_BEDROOM,
+                "status": STATUSES[i % len(STATUSES)], "market_rent": 1000 + (i % 1000), "bedrooms": 1, "bathrooms": 1.0,
+                "property_id": property_ids[i // UNITS_PER_PROPERTY % len(property_ids)], **stamp,
+            })
+            if len(batch) >= BATCH_SIZE:
+                conn.execute(Unit.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(Unit.__table__.insert(), batch)
+    print(f"Seeded {len(property_ids):,} properties and {n_units:,} units in {time.perf_counter() - started:.1f}s")
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_load(client: httpx.AsyncClient, path: str, n_requests: int, concurrency: int) -> dict:
+    """Issue n_requests to path with at most `concurrency` in flight, probing /health meanwhile"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, probes = [], []
+    done = asyncio.Event()
+
+    async def request():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            await client.get("/health")
+            probes.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.01)
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(n_requests)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+
+    return {
+        "throughput": n_requests / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 0.95),
+        "health_p50_ms": statistics.median(probes) if probes else 0.0,
+        "health_max_ms": max(probes) if probes else 0.0,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    """Serve this module's app (with the legacy route) on a single uvicorn worker"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "async_load_test:app",
+         "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+         "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health").raise_for_status()
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def main_async(args, base_url: str) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+        # Warm both paths (imports, statement caches, connections)
+        for path in (LEGACY_PATH, ASYNC_PATH):
+            (await client.get(path)).raise_for_status()
+
+        results = {}
+        for name, path in (("legacy sync session", LEGACY_PATH), ("async session", ASYNC_PATH)):
+            results[name] = await run_load(client, path, args.requests, args.concurrency)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test sync vs async database sessions")
+    parser.add_argument("--units", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url}")
+    seed(args.units)
+
+    port = free_port()
+    server = start_server(port)
+    try:
+        results = asyncio.run(main_async(args, f"http://127.0.0.1:{port}"))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\nDashboard metrics, {args.requests} requests, {args.concurrency} concurrent")
+    for name, result in results.items():
+        print(f"{name}")
+        print(f"  {result['throughput']:8.1f} req/s   p50 {result['p50_ms']:8.1f} ms   p95 {result['p95_ms']:8.1f} ms")
+        print(f"  /health under load: p50 {result['health_p50_ms']:7.1f} ms   max {result['health_max_ms']:7.1f} ms")
+
+    legacy, migrated = results["legacy sync session"], results["async session"]
+    print(f"\nthroughput x{migrated['throughput'] / legacy['throughput']:.1f}, "
+          f"/health p50 x{legacy['health_p50_ms'] / max(migrated['health_p50_ms'], 0.001):.1f} faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Index plan benchmark
+
+Seeds a synthetic portfolio (1M units and 100k messages by default), runs
+the hot filter queries used by the API without the hot-path indexes, then
+creates the indexes and runs them again. Prints the query plan and median
+latency for each query before and after.
+
+Usage:
+    DATABASE_URL=sqlite:///./bench_indexes.db python benchmarks/index_benchmark.py
+    python benchmarks/index_benchmark.py --units 100000 --messages 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_indexes.db")
+
+from sqlalchemy import bindparam, column, text
+
+from app.database import Base, engine
+from app.models import (
+    Company, User, Property, PropertyType, Unit, UnitStatus, UnitType,
+    Tenant, Lease, LeaseStatus, LeaseType,
+    Conversation, ConversationParticipant, Message, ParticipantType,
+)
+from app.models.base import GUID
+
+BATCH_SIZE = 10_000
+
+# Named indexes added for the hot filter columns (see the models' __table_args__)
+HOT_INDEXES = [
+    index
+    for table in (Unit.__table__, Lease.__table__, Property.__table__, Conversation.__table__,
+                  ConversationParticipant.__table__, Message.__table__)
+    for index in table.indexes
+]
+
+
+def new_id() -> str:
+    return str(uuid.uuid4())
+
+
+def insert_batches(conn, table, rows):
+    """Insert an iterator of row dicts in executemany batches"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(table.insert(), batch)
+
+
+def seed(n_units: int, n_messages: int) -> dict:
+    """Create tables without hot indexes and bulk-load synthetic data"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for index in HOT_INDEXES:
+            index.drop(conn)
+
+    now = datetime.utcnow()
+    stamp = {"created_at": now, "updated_at": now}
+    company_id = new_id()
+    n_properties = max(1, n_units // 100)
+    n_users = 100
+    n_tenants = 1_000
+    n_conversations = max(1, n_messages // 20)
+
+    property_ids = [new_id() for _ in range(n_properties)]
+    user_ids = [new_id() for _ in range(n_users)]
+    tenant_ids = [new_id() for _ in range(n_tenants)]
+    conversation_ids = [new_id() for _ in range(n_conversations)]
+    statuses = [UnitStatus.OCCUPIED] * 7 + [UnitStatus.AVAILABLE] * 2 + [UnitStatus.MAINTENANCE]
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(Company.__table__.insert(), [{"id": company_id, "name": "Benchmark Co", "email": "bench@example.com", **stamp}])
+        insert_batches(conn, User.__table__, (
+            {"id": user_id, "email": f"user{i}@example.com", "hashed_password": "x",
+             "first_name": "Bench", "last_name": str(i), "company_id": company_id, **stamp}
+            for i, user_id in enumerate(user_ids)
+        ))
+        insert_batches(conn, Property.__table__, (
+            {"id": property_id, "name": f"Property {i}", "property_type": PropertyType.APARTMENT,
+             "address_line1": f"{i} Main St", "city": "Kansas City", "state": "MO", "postal_code": "64101",
+             "company_id": company_id, "total_units": 100, "monthly_operating_expenses": 5000, **stamp}
+            for i, property_id in enumerate(property_ids)
+        ))
+        insert_batches(conn, Tenant.__table__, (
+            {"id": tenant_id, "first_name": "Tenant", "last_name": str(i), "email": f"tenant{i}@example.com",
+             "phone": "555-0100", "company_id": company_id, **stamp}
+            for i, tenant_id in enumerate(tenant_ids)
+        ))
+
+        lease_rows = []
+
+        def units():
+            for i in range(n_units):
+                unit_id = new_id()
+                unit_status = statuses[i % len(statuses)]
+                if unit_status == UnitStatus.OCCUPIED:
+                    lease_rows.append({
+                        "id": new_id(), "lease_type": LeaseType.FIXED_TERM, "status": LeaseStatus.ACTIVE,
+                        "start_date": date.today() - timedelta(days=random.randint(0, 300)),
+                        "end_date": date.today() + timedelta(days=random.randint(1, 365)),
+                        "rent_amount": 1500, "deposit_amount": 1500, "unit_id": unit_id,
+                        "tenant_id": random.choice(tenant_ids), "company_id": company_id, **stamp,
+                    })
+                yield {
+                    "id": unit_id, "unit_number": str(i % 100), "unit_type": UnitType.ONE_BEDROOM,
+                    "status": unit_status, "market_rent": 1000 + (i % 1000), "bedrooms": 1, "bathrooms": 1.0,
+                    "property_id": property_ids[i // 100 % n_properties],
+                    "created_at": now - timedelta(seconds=i), "updated_at": now,
+                }
+
+        insert_batches(conn, Unit.__table__, units())
+        insert_batches(conn, Lease.__table__, iter(lease_rows))
+
+        insert_batches(conn, Conversation.__table__, (
+            {"id": conversation_id, "created_by_id": user_ids[i % n_users], "subject": f"Conversation {i}",
+             "last_message_at": now - timedelta(minutes=i), **stamp}
+            for i, conversation_id in enumerate(conversation_ids)
+        ))
+        insert_batches(conn, ConversationParticipant.__table__, (
+            {"id": new_id(), "conversation_id": conversation_id, "user_id": user_ids[(i + offset) % n_users],
+             "participant_type": ParticipantType.MANAGER, "participant_name": "Bench",
+             "joined_at": now, "is_active": True, **stamp}
+            for i, conversation_id in enumerate(conversation_ids)
+            for offset in (0, 1)
+        ))
+        insert_batches(conn, Message.__table__, (
+            {"id": new_id(), "conversation_id": conversation_ids[i % n_conversations],
+             "sender_id": user_ids[i % n_users], "sender_name": "Bench", "content": f"Message body {i}",
+             "is_read": i % 3 == 0, "is_edited": False, "is_deleted": False,
+             "created_at": now - timedelta(seconds=i), "updated_at": now}
+            for i in range(n_messages)
+        ))
+    print(f"Seeded {n_units:,} units, {len(lease_rows):,} leases and {n_messages:,} messages "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    return {
+        "property_id": property_ids[len(property_ids) // 2],
+        "company_id": company_id,
+        "user_id": user_ids[0],
+        "conversation_id": conversation_ids[len(conversation_ids) // 2],
+        "unit_id": None,
+        "today": date.today(),
+        "horizon": date.today() + timedelta(days=60),
+    }
+
+
+# Each query mirrors a filter issued by an API route
+QUERIES = {
+    "units by property+status (list_units)":
+        "SELECT id FROM units WHERE property_id = :property_id AND status = 'OCCUPIED'",
+    "unit status counts (dashboard metrics)":
+        "SELECT status, count(id) FROM units WHERE property_id = :property_id GROUP BY status",
+    "units by status (list_units filter)":
+        "SELECT count(id) FROM units WHERE status = 'MAINTENANCE'",
+    "active lease for unit (list_units / delete_unit)":
+        "SELECT id FROM leases WHERE unit_id = :unit_id AND status = 'ACTIVE'",
+    "expiring leases (/leases/expiring/soon)":
+        "SELECT count(id) FROM leases WHERE status = 'ACTIVE' AND end_date BETWEEN :today AND :horizon",
+    "properties by company (company filter)":
+        "SELECT id FROM properties WHERE company_id = :company_id ORDER BY created_at LIMIT 20",
+    "conversation page (list_conversations)":
+        "SELECT conversation_id FROM conversation_participants WHERE user_id = :user_id AND is_active = 1",
+    "message history (get_messages)":
+        "SELECT id FROM messages WHERE conversation_id = :conversation_id ORDER BY created_at DESC, id DESC LIMIT 50",
+    "unread count (list_conversations)":
+        "SELECT count(id) FROM messages WHERE conversation_id = :conversation_id AND is_read = 0 AND sender_id != :user_id",
+    "messages by sender":
+        "SELECT count(id) FROM messages WHERE sender_id = :user_id",
+}
+
+
+ID_PARAMS = ("property_id", "company_id", "user_id", "conversation_id", "unit_id")
+
+
+def statement(sql: str):
+    """text() with the id parameters bound as GUIDs (16 bytes on SQLite), as the ORM binds them"""
+    return text(sql).bindparams(*(bindparam(name, type_=GUID()) for name in ID_PARAMS if f":{name}" in sql))
+
+
+def explain(conn, sql: str, params: dict) -> str:
+    if engine.dialect.name == "sqlite":
+        rows = conn.execute(statement(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+        return "; ".join(row[-1] for row in rows)
+    rows = conn.execute(statement(f"EXPLAIN {sql}"), params).fetchall()
+    return " | ".join(row[0].strip() for row in rows)
+
+
+def run_queries(params: dict, repeat: int) -> dict:
+    results = {}
+    with engine.connect() as conn:
+        if params["unit_id"] is None:
+            params["unit_id"] = conn.execute(
+                text("SELECT unit_id FROM leases ORDER BY created_at LIMIT 1").columns(column("unit_id", GUID()))
+            ).scalar()
+        for name, sql in QUERIES.items():
+            sql = sql if engine.dialect.name == "sqlite" else sql.replace("= 1", "= true").replace("= 0", "= false")
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                conn.execute(statement(sql), params).fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = {"plan": explain(conn, sql, params), "median_ms": statistics.median(timings)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot-path indexes")
+    parser.add_argument("--units", type=int, default=1_000_000)
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url}")
+    params = seed(args.units, args.messages)
+
+    before = run_queries(params, args.repeat)
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for index in HOT_INDEXES:
+            index.create(conn)
+        conn.execute(text("ANALYZE"))
+    print(f"Created {len(HOT_INDEXES)} indexes in {time.perf_counter() - started:.1f}s\n")
+
+    after = run_queries(params, args.repeat)
+
+    for name in QUERIES:
+        b, a = before[name], after[name]
+        speedup = b["median_ms"] / a["median_ms"] if a["median_ms"] else float("inf")
+        print(f"{name}")
+        print(f"  before {b['median_ms']:9.2f} ms  {b['plan']}")
+        print(f"  after  {a['median_ms']:9.2f} ms  {a['plan']}")
+        print(f"  speedup x{speedup:.1f}\n")
+
+
+if __name__ == "__main__":
+    main()
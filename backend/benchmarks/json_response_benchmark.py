@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+JSON response encoding benchmark
+
+Seeds the api_benchmark portfolio, calls the largest JSON endpoints once
+in-process and captures what each endpoint returned. Then it times turning
+that content into a response body three ways:
+
+- stock: FastAPI's response pass (``jsonable_encoder``, or the
+  response_model serializer) plus the stdlib-json ``JSONResponse``, the app
+  default before ``FastJSONResponse``.
+- orjson default: the same response pass plus ``FastJSONResponse``, what
+  endpoints returning plain data get now.
+- direct: ``FastJSONResponse`` on the raw content with no
+  ``jsonable_encoder`` pass, what ``json_response`` endpoints do. Only
+  timed for endpoints without a response_model.
+
+Each path's decoded output is checked against the stock one. The
+``path`` column shows which one the endpoint uses today.
+
+Usage:
+    DATABASE_URL=sqlite:///./bench_json.db python benchmarks/json_response_benchmark.py
+    python benchmarks/json_response_benchmark.py --no-seed --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_json.db")
+
+import fastapi.routing
+import httpx
+from fastapi.responses import JSONResponse
+
+from api_benchmark import seed
+from app.database import SessionLocal, async_engine, engine
+from app.main import app
+from app.models import ConversationParticipant, User
+from app.services import cache_service
+from app.services.auth_service import get_current_user
+from app.utils import responses
+from app.utils.responses import FastJSONResponse
+
+# name -> path; {placeholders} are filled from the seeded ids
+ENDPOINTS = {
+    "calendar_events": "/api/v1/calendar/events",
+    "leases_expiring": "/api/v1/leases/expiring/soon?days=400",
+    "leases_list": "/api/v1/leases/?limit=100",
+    "properties_list": "/api/v1/properties/?page_size=100",
+    "conversations": "/api/v1/messaging/conversations?limit=100",
+    "conversation": "/api/v1/messaging/conversations/{conversation_id}",
+    "conversation_messages": "/api/v1/messaging/conversations/{conversation_id}/messages?limit=100",
+    "dashboard_metrics": "/api/v1/dashboard/metrics",
+}
+
+
+class Capture:
+    """Records the content an endpoint handed to FastAPI's response pass or to ``dumps``"""
+
+    def __init__(self):
+        self.serialized = None
+        self.dumped = None
+        self._serialize_response = fastapi.routing.serialize_response
+        self._dumps = responses.dumps
+
+        async def serialize_response(**kwargs):
+            self.serialized = kwargs
+            return await self._serialize_response(**kwargs)
+
+        def dumps(content):
+            if self.dumped is None:
+                self.dumped = content
+            return self._dumps(content)
+
+        fastapi.routing.serialize_response = serialize_response
+        responses.dumps = dumps
+        cache_service.dumps = dumps
+
+    def reset(self):
+        self.serialized = self.dumped = None
+
+    def restore(self):
+        fastapi.routing.serialize_response = self._serialize_response
+        responses.dumps = cache_service.dumps = self._dumps
+
+
+def best_of(repeat: int, func) -> float:
+    """Fastest of ``repeat`` runs in ms (least disturbed by GC and scheduling)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def measure(serialized, dumped, repeat: int, serialize_response) -> dict:
+    if serialized is not None:
+        # The endpoint returned data; FastAPI encoded it (this is also its path today)
+        kwargs, path = serialized, "encoder"
+    else:
+        # The endpoint returned json_response / cached bytes: replay its content
+        kwargs, path = {"field": None, "response_content": dumped}, "direct"
+
+    loop = asyncio.new_event_loop()
+    prepare = lambda: loop.run_until_complete(serialize_response(**kwargs))
+    stock = lambda: JSONResponse(prepare()).body
+    orjson_default = lambda: FastJSONResponse(prepare()).body
+    direct = lambda: FastJSONResponse(kwargs["response_content"]).body
+
+    expected = json.loads(stock())
+    result = {
+        "path": path,
+        "bytes": len(stock()),
+        "stock_ms": best_of(repeat, stock),
+        "orjson_ms": best_of(repeat, orjson_default),
+        "identical": json.loads(orjson_default()) == expected,
+        "direct_ms": None,
+    }
+    if kwargs["field"] is None:
+        try:
+            result["direct_ms"] = best_of(repeat, direct)
+            result["identical"] = result["identical"] and json.loads(direct()) == expected
+        except TypeError as e:
+            result["identical"] = f"direct failed: {e}"
+    loop.close()
+    return result
+
+
+async def collect(ids: dict) -> dict:
+    """Call every endpoint once, keeping what it returned"""
+    capture = Capture()
+    captured = {}
+    user = SessionLocal().get(User, ids["user_id"])
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for name, path in ENDPOINTS.items():
+                capture.reset()
+                response = await client.get(path.format(**ids))
+                if response.status_code != 200:
+                    raise RuntimeError(f"GET {path} returned {response.status_code}: {response.text[:200]}")
+                captured[name] = (capture.serialized, capture.dumped)
+    finally:
+        capture.restore()
+        app.dependency_overrides.pop(get_current_user, None)
+        await async_engine.dispose()
+    return captured
+
+
+def existing_ids() -> dict:
+    """The ids seed() returns, read back from an already seeded database"""
+    db = SessionLocal()
+    try:
+        participant = db.query(ConversationParticipant).filter(
+            ConversationParticipant.user_id.isnot(None)
+        ).first()
+        return {"user_id": participant.user_id, "conversation_id": participant.conversation_id}
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON response encoding on the largest endpoints")
+    parser.add_argument("--properties", type=int, default=200)
+    parser.add_argument("--units", type=int, default=10_000)
+    parser.add_argument("--leases", type=int, default=7_000)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=10, help="Timed encodes per endpoint and path")
+    parser.add_argument("--no-seed", action="store_true", help="Reuse the data already in DATABASE_URL")
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url}", file=sys.stderr)
+    if args.no_seed:
+        ids = existing_ids()
+    else:
+        ids = seed(args.properties, args.units, args.leases, args.messages)
+    captured = asyncio.run(collect(ids))
+
+    print(f"\n{'endpoint':24} {'path':8} {'bytes':>10} {'stock':>9} {'orjson':>9} {'direct':>9}  identical")
+    for name, (serialized, dumped) in captured.items():
+        result = measure(serialized, dumped, args.repeat, fastapi.routing.serialize_response)
+        direct = f"{result['direct_ms']:7.2f}ms" if result["direct_ms"] is not None else f"{'-':>9}"
+        print(f"{name:24} {result['path']:8} {result['bytes']:>10,} {result['stock_ms']:7.2f}ms "
+              f"{result['orjson_ms']:7.2f}ms {direct}  {result['identical']}")
+
+
+if __name__ == "__main__":
+    main()
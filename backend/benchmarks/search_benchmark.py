@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Full-text search benchmark
+
+Seeds a synthetic portfolio (100k properties and 1M messages by default)
+and times the list_properties and /messaging/search paths against the
+legacy ``ILIKE '%term%'`` filters. Prints median latency and match count
+for each search term.
+
+Usage:
+    DATABASE_URL=sqlite:///./bench_search.db python benchmarks/search_benchmark.py
+    python benchmarks/search_benchmark.py --properties 20000 --messages 100000 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_search.db")
+
+from sqlalchemy import Select, desc, func, or_, select
+
+from app.database import Base, SessionLocal, engine
+from app.models import (
+    Company, Property, PropertyType, User,
+    Conversation, ConversationParticipant, Message, ParticipantType,
+)
+from app.services.search_service import apply_property_search, build_message_search, install_search
+
+BATCH_SIZE = 10_000
+PAGE_SIZE = 20
+
+NAMES = ["Oak", "Maple", "Cedar", "Willow", "Pine", "Birch", "Aspen", "Elm", "Harbor", "Summit"]
+SUFFIXES = ["Apartments", "Commons", "Village", "Lofts", "Terrace", "Gardens", "Place", "Residences"]
+STREETS = ["Main", "Broadway", "Market", "Lake", "Hill", "Park", "Washington", "Lincoln", "Jefferson", "Madison"]
+CITIES = ["Kansas City", "Springfield", "Portland", "Austin", "Denver", "Madison", "Columbus", "Raleigh"]
+
+# Typical search-bar input, from a single keystroke prefix to multi-word queries
+TERMS = ["ma", "map", "maple", "maple lofts", "123 main", "denver", "springfield terrace", "zzz"]
+
+WORDS = [
+    "faucet", "leak", "rent", "payment", "lease", "renewal", "parking", "noise", "heater", "repair",
+    "inspection", "keys", "deposit", "plumber", "window", "elevator", "package", "pest", "mold", "thanks",
+]
+MESSAGE_TERMS = ["fa", "faucet", "faucet leak", "plumber window", "invoice 4711", "zzz"]
+USERS = 200
+CONVERSATIONS_PER_USER = 50
+
+
+def seed(n_properties: int, n_messages: int) -> str:
+    """Load synthetic properties and messages; returns the user id searches run as"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    install_search(engine)
+
+    now = datetime.utcnow()
+    company_id = str(uuid.uuid4())
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(Company.__table__.insert(), [{
+            "id": company_id, "name": "Benchmark Co", "email": "bench@example.com",
+            "created_at": now, "updated_at": now,
+        }])
+        batch = []
+        for i in range(n_properties):
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "name": f"{NAMES[i % len(NAMES)]} {SUFFIXES[i // len(NAMES) % len(SUFFIXES)]} {i}",
+                "property_type": PropertyType.APARTMENT,
+                "address_line1": f"{i % 9000 + 100} {STREETS[i % len(STREETS)]} St",
+                "city": CITIES[i % len(CITIES)], "state": "MO", "postal_code": "64101",
+                "company_id": company_id, "total_units": 10, "is_active": True,
+                "created_at": now - timedelta(seconds=i), "updated_at": now,
+            })
+            if len(batch) >= BATCH_SIZE:
+                conn.execute(Property.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(Property.__table__.insert(), batch)
+
+        user_ids = [str(uuid.uuid4()) for _ in range(USERS)]
+        conn.execute(User.__table__.insert(), [
+            {"id": user_id, "email": f"user{i}@example.com", "hashed_password": "x", "first_name": "Bench",
+             "last_name": str(i), "company_id": company_id, "created_at": now, "updated_at": now}
+            for i, user_id in enumerate(user_ids)
+        ])
+        conversation_ids = [str(uuid.uuid4()) for _ in range(USERS * CONVERSATIONS_PER_USER)]
+        conn.execute(Conversation.__table__.insert(), [
+            {"id": conversation_id, "created_by_id": user_ids[i % USERS], "subject": f"Conversation {i}",
+             "last_message_at": now, "created_at": now, "updated_at": now}
+            for i, conversation_id in enumerate(conversation_ids)
+        ])
+        conn.execute(ConversationParticipant.__table__.insert(), [
+            {"id": str(uuid.uuid4()), "conversation_id": conversation_id, "user_id": user_ids[i % USERS],
+             "participant_type": ParticipantType.MANAGER, "participant_name": "Bench", "is_active": True,
+             "joined_at": now, "created_at": now, "updated_at": now}
+            for i, conversation_id in enumerate(conversation_ids)
+        ])
+        batch = []
+        for i in range(n_messages):
+            words = [WORDS[(i * 7 + k * 13) % len(WORDS)] for k in range(6)]
+            batch.append({
+                "id": str(uuid.uuid4()), "conversation_id": conversation_ids[i % len(conversation_ids)],
+                "sender_id": user_ids[i % USERS], "sender_name": "Bench",
+                "content": f"Hi, about the {' '.join(words)} - ref {i}",
+                "is_read": True, "is_edited": False, "is_deleted": False,
+                "created_at": now - timedelta(seconds=i), "updated_at": now,
+            })
+            if len(batch) >= BATCH_SIZE:
+                conn.execute(Message.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(Message.__table__.insert(), batch)
+    print(f"Seeded {n_properties:,} properties and {n_messages:,} messages "
+          f"in {time.perf_counter() - started:.1f}s")
+    return user_ids[0]
+
+
+def legacy_search(db, term: str):
+    pattern = f"%{term}%"
+    return db.query(Property).filter(or_(
+        Property.name.ilike(pattern),
+        Property.address_line1.ilike(pattern),
+        Property.city.ilike(pattern),
+    )).order_by(Property.created_at, Property.id)
+
+
+def indexed_search(db, term: str):
+    query, rank = apply_property_search(db.query(Property), term)
+    if rank is not None:
+        query = query.order_by(rank, Property.created_at, Property.id)
+    return query
+
+
+def user_conversations(user_id: str):
+    return select(ConversationParticipant.conversation_id).where(
+        ConversationParticipant.user_id == user_id,
+        ConversationParticipant.is_active == True,
+    )
+
+
+def legacy_message_search(db, term: str, user_id: str):
+    return db.query(Message).filter(
+        Message.conversation_id.in_(user_conversations(user_id)),
+        Message.content.ilike(f"%{term}%"),
+        Message.is_deleted == False,
+    ).order_by(desc(Message.created_at))
+
+
+def indexed_message_search(db, term: str, user_id: str):
+    statement, sort_column, unique_sort = build_message_search(db, term)
+    order = [sort_column.desc()] if unique_sort else [sort_column.desc(), desc(Message.id)]
+    statement = statement.where(
+        Message.conversation_id.in_(user_conversations(user_id))
+    ).order_by(*order)
+    return statement
+
+
+def count(db, query) -> int:
+    if isinstance(query, Select):
+        return db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+    return query.order_by(None).count()
+
+
+def time_search(build, term: str, repeat: int, *args) -> dict:
+    db = SessionLocal()
+    try:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            query = build(db, term, *args)
+            if isinstance(query, Select):
+                rows = db.execute(query.limit(PAGE_SIZE)).all()
+            else:
+                rows = query.limit(PAGE_SIZE).all()
+            timings.append((time.perf_counter() - started) * 1000)
+            db.expunge_all()
+        return {
+            "median_ms": statistics.median(timings),
+            "matches": count(db, query),
+            "top": rows[0] if rows else None,
+        }
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark property search")
+    parser.add_argument("--properties", type=int, default=100_000)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url}")
+    user_id = seed(args.properties, args.messages)
+
+    print("\nProperty search (list_properties)")
+    for term in TERMS:
+        legacy = time_search(legacy_search, term, args.repeat)
+        indexed = time_search(indexed_search, term, args.repeat)
+        top = indexed["top"].name if indexed["top"] else None
+        print(f"search={term!r}")
+        print(f"  ILIKE   {legacy['median_ms']:8.2f} ms  {legacy['matches']:>7,} matches")
+        print(f"  indexed {indexed['median_ms']:8.2f} ms  {indexed['matches']:>7,} matches  top={top!r}")
+
+    print(f"\nMessage search (/messaging/search, {CONVERSATIONS_PER_USER} conversations visible)")
+    for term in MESSAGE_TERMS:
+        legacy = time_search(legacy_message_search, term, args.repeat, user_id)
+        indexed = time_search(indexed_message_search, term, args.repeat, user_id)
+        snippet = indexed["top"].snippet if indexed["top"] else None
+        print(f"q={term!r}")
+        print(f"  ILIKE   {legacy['median_ms']:8.2f} ms  {legacy['matches']:>7,} matches")
+        print(f"  indexed {indexed['median_ms']:8.2f} ms  {indexed['matches']:>7,} matches  snippet={snippet!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+SQLite write concurrency benchmark
+
+Runs the same load against a fresh SQLite file twice, once per profile:
+
+- defaults: SQLite's own settings (rollback journal, ``synchronous=FULL``,
+  2 MB page cache), what every connection ran with before the pragma profile.
+- profile: the ``SQLITE_*`` settings applied on connect (WAL,
+  ``synchronous=NORMAL``, mmap, 64 MB cache, busy timeout, foreign keys).
+
+Each run seeds the api_benchmark portfolio, then:
+
+- sessions: ``--threads`` threads commit short write transactions through
+  the app's ``SessionLocal`` (a message insert plus the unread counter
+  update ``send_message`` makes), isolating the database's commit rate.
+- http: serves the app with uvicorn (``--workers`` processes sharing the
+  file, like a single-node deployment) and fires concurrent
+  ``POST .../messages`` mixed with ``GET`` conversation reads. Request
+  handling costs CPU too, so on small machines this shows less of the
+  difference.
+
+Prints throughput, latency percentiles and failed operations ("database is
+locked") for both profiles.
+
+Usage:
+    python benchmarks/sqlite_concurrency_benchmark.py
+    python benchmarks/sqlite_concurrency_benchmark.py --requests 2000 --concurrency 64 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+# Add the backend directory to the path
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_sqlite_concurrency.db")
+
+import httpx
+from sqlalchemy import insert, update
+
+from app.database import SessionLocal
+from app.main import app
+from app.models import ConversationParticipant, Message, ParticipantType, User
+from app.services.auth_service import get_current_user
+
+PROFILES = {
+    "defaults": {"SQLITE_PRAGMAS_ENABLED": "false"},
+    "profile": {"SQLITE_PRAGMAS_ENABLED": "true"},
+}
+
+
+def bench_user() -> User:
+    """The seeded manager, standing in for the authenticated user in the uvicorn workers"""
+    db = SessionLocal()
+    try:
+        user = db.get(User, os.environ["BENCH_USER_ID"])
+        db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+
+if "BENCH_USER_ID" in os.environ:
+    app.dependency_overrides[get_current_user] = bench_user
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int, env: dict) -> subprocess.Popen:
+    """Serve this module's app (authenticated as the seeded user) on `workers` uvicorn processes"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "sqlite_concurrency_benchmark:app",
+         "--app-dir", BENCHMARK_DIR, "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health").raise_for_status()
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def run_load(base_url: str, conversation_ids: list, args) -> dict:
+    """`args.requests` requests, `args.write_ratio` of them message posts, `args.concurrency` in flight"""
+    rng = random.Random(42)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = {"write": [], "read": []}
+    failures = {"write": 0, "read": 0}
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        async def request(kind: str, conversation_id: str):
+            path = f"/api/v1/messaging/conversations/{conversation_id}"
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    if kind == "write":
+                        response = await client.post(f"{path}/messages", json={"content": "Benchmark message"})
+                    else:
+                        response = await client.get(path)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    # A locked-database error escaping the app drops the connection
+                    ok = False
+                elapsed = (time.perf_counter() - started) * 1000
+            if ok:
+                latencies[kind].append(elapsed)
+            else:
+                failures[kind] += 1
+
+        plan = [
+            ("write" if rng.random() < args.write_ratio else "read", rng.choice(conversation_ids))
+            for _ in range(args.requests)
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(*(request(kind, conversation_id) for kind, conversation_id in plan))
+        elapsed = time.perf_counter() - started
+
+    result = {"elapsed_s": elapsed}
+    for kind, values in latencies.items():
+        result[kind] = {
+            "ok": len(values),
+            "failed": failures[kind],
+            "per_s": len(values) / elapsed,
+            "p50_ms": statistics.median(values) if values else 0.0,
+            "p95_ms": percentile(values, 0.95) if values else 0.0,
+            "max_ms": max(values) if values else 0.0,
+        }
+    return result
+
+
+def run_session_writes(conversation_ids: list, args) -> dict:
+    """`args.threads` threads, each committing `args.transactions` message inserts with counter updates"""
+    latencies, failures = [], [0]
+    lock = threading.Lock()
+
+    def writer(seed: int):
+        rng = random.Random(seed)
+        db = SessionLocal()
+        try:
+            for _ in range(args.transactions):
+                conversation_id = rng.choice(conversation_ids)
+                started = time.perf_counter()
+                try:
+                    db.execute(insert(Message), [{
+                        "id": str(uuid.uuid4()), "conversation_id": conversation_id, "sender_name": "Bench",
+                        "sender_type": ParticipantType.TENANT, "content": "Benchmark message",
+                        "created_at": datetime.utcnow(),
+                    }])
+                    db.execute(update(ConversationParticipant).where(
+                        ConversationParticipant.conversation_id == conversation_id
+                    ).values(unread_count=ConversationParticipant.unread_count + 1))
+                    db.commit()
+                    ok = True
+                except Exception:
+                    db.rollback()
+                    ok = False
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        failures[0] += 1
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "ok": len(latencies),
+        "failed": failures[0],
+        "per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p95_ms": percentile(latencies, 0.95) if latencies else 0.0,
+        "max_ms": max(latencies) if latencies else 0.0,
+    }
+
+
+def run_profile(args) -> dict:
+    """One profile end to end; runs in its own process so the engines pick up its settings"""
+    from api_benchmark import seed
+    from app.database import engine
+
+    ids = seed(args.properties, args.units, args.units // 2, args.messages)
+    with engine.connect() as conn:
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+    db = SessionLocal()
+    try:
+        conversation_ids = [row[0] for row in db.query(ConversationParticipant.conversation_id).filter(
+            ConversationParticipant.user_id == ids["user_id"]
+        )]
+    finally:
+        db.close()
+    sessions = run_session_writes(conversation_ids, args)
+    engine.dispose()
+
+    port = free_port()
+    server = start_server(port, args.workers, {**os.environ, "BENCH_USER_ID": ids["user_id"]})
+    try:
+        result = asyncio.run(run_load(f"http://127.0.0.1:{port}", conversation_ids, args))
+    finally:
+        server.terminate()
+        server.wait()
+    result["journal_mode"] = journal_mode
+    result["sessions"] = sessions
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite write throughput under parallel requests, defaults vs the pragma profile")
+    parser.add_argument("--threads", type=int, default=8, help="Writer threads in the sessions phase")
+    parser.add_argument("--transactions", type=int, default=250, help="Commits per writer thread")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes sharing the database file")
+    parser.add_argument("--write-ratio", type=float, default=0.5, help="Share of requests that post a message")
+    parser.add_argument("--properties", type=int, default=50)
+    parser.add_argument("--units", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        print(json.dumps(run_profile(args)))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, settings_env in PROFILES.items():
+            env = {**os.environ, **settings_env, "DATABASE_URL": f"sqlite:///{directory}/{name}.db"}
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--profile", name, *sys.argv[1:]],
+                env=env, stdout=subprocess.PIPE, text=True, check=True,
+            ).stdout
+            results[name] = json.loads(output.strip().splitlines()[-1])
+
+    def line(label: str, stats: dict) -> str:
+        return (f"  {label:8} {stats['per_s']:8.1f}/s   p50 {stats['p50_ms']:7.1f} ms   "
+                f"p95 {stats['p95_ms']:7.1f} ms   max {stats['max_ms']:7.1f} ms   failed {stats['failed']}")
+
+    print(f"\nsessions: {args.threads} threads x {args.transactions} commits; "
+          f"http: {args.requests} requests, {args.concurrency} concurrent, {args.workers} uvicorn workers, "
+          f"{args.write_ratio:.0%} writes")
+    for name, result in results.items():
+        print(f"{name} (journal_mode={result['journal_mode']})")
+        print(line("commits", result["sessions"]))
+        print(line("writes", result["write"]))
+        print(line("reads", result["read"]))
+
+    defaults, profile = results["defaults"], results["profile"]
+    ratio = lambda new, old: new["per_s"] / max(old["per_s"], 0.001)
+    failed = lambda result: result["sessions"]["failed"] + result["write"]["failed"] + result["read"]["failed"]
+    print(f"\ncommits x{ratio(profile['sessions'], defaults['sessions']):.1f}, "
+          f"http writes x{ratio(profile['write'], defaults['write']):.1f}, "
+          f"http reads x{ratio(profile['read'], defaults['read']):.1f}, "
+          f"failed {failed(defaults)} -> {failed(profile)}")
+
+if __name__ == "__main__":
+    main()
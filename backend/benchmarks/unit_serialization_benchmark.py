@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Unit serialization microbenchmark
+
+Seeds a synthetic portfolio (50k units by default, 70% with an active
+lease and tenant) and times the unit list response two ways:
+
+- legacy: ORM entities with the property joined and active lease/tenant
+  selectin-loaded, a hand-built dict and ``UnitResponse`` per unit, then
+  FastAPI's response_model pass (validate, ``jsonable_encoder``-style
+  serialize) and ``JSONResponse`` rendering, as ``GET /units`` did before
+  ``unit_response_service``.
+- compiled: ``unit_select`` column rows (no identity map) encoded in one
+  ``TypeAdapter.dump_json`` call.
+
+Loading and serialization are timed separately and reported per row; both
+paths are checked to produce the same JSON.
+
+Usage:
+    DATABASE_URL=sqlite:///./bench_serialization.db python benchmarks/unit_serialization_benchmark.py
+    python benchmarks/unit_serialization_benchmark.py --units 50000 --repeat 5 --no-seed
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_serialization.db")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from sqlalchemy import select
+from sqlalchemy.orm import contains_eager, selectinload
+
+from app.api.units import UnitListResponse, UnitResponse
+from app.database import AsyncSessionLocal, Base, engine
+from app.main import app
+from app.models import (
+    Company, Lease, LeaseStatus, LeaseType, Property, PropertyType, Tenant, Unit, UnitStatus, UnitType,
+)
+from app.services.unit_response_service import dump_unit_list, unit_select
+
+BATCH_SIZE = 10_000
+UNITS_PER_PROPERTY = 100
+STATUSES = [UnitStatus.OCCUPIED] * 7 + [UnitStatus.AVAILABLE] * 2 + [UnitStatus.MAINTENANCE]
+
+
+def new_id() -> str:
+    return str(uuid.uuid4())
+
+
+def insert_batches(conn, table, rows):
+    """Insert an iterator of row dicts in executemany batches"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(table.insert(), batch)
+
+
+def seed(n_units: int) -> None:
+    """Units across 100-unit properties; occupied units get an active lease"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    now = datetime.utcnow()
+    stamp = {"created_at": now, "updated_at": now}
+    company_id = new_id()
+    property_ids = [new_id() for _ in range(max(1, n_units // UNITS_PER_PROPERTY))]
+    tenant_ids = [new_id() for _ in range(1_000)]
+    lease_rows = []
+
+    def units():
+        for i in range(n_units):
+            unit_id = new_id()
+            unit_status = STATUSES[i % len(STATUSES)]
+            if unit_status == UnitStatus.OCCUPIED:
+                lease_rows.append({
+                    "id": new_id(), "lease_type": LeaseType.FIXED_TERM, "status": LeaseStatus.ACTIVE,
+                    "start_date": date.today() - timedelta(days=random.randint(0, 300)),
+                    "end_date": date.today() + timedelta(days=random.randint(1, 365)),
+                    "rent_amount": 1500, "deposit_amount": 1500, "unit_id": unit_id,
+                    "tenant_id": random.choice(tenant_ids), "company_id": company_id, **stamp,
+                })
+            yield {
+                "id": unit_id, "unit_number": str(i % UNITS_PER_PROPERTY), "unit_type": UnitType.ONE_BEDROOM,
+                "status": unit_status, "market_rent": 1000 + (i % 1000), "bedrooms": 1, "bathrooms": 1.0,
+                "square_feet": 650.0, "features": ["dishwasher", "balcony"], "utilities_included": ["water"],
+                "property_id": property_ids[i // UNITS_PER_PROPERTY % len(property_ids)],
+                "created_at": now - timedelta(seconds=i), "updated_at": now - timedelta(days=i % 60),
+            }
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(Company.__table__.insert(), [{"id": company_id, "name": "Benchmark Co", "email": "bench@example.com", **stamp}])
+        insert_batches(conn, Property.__table__, (
+            {"id": property_id, "name": f"Property {i}", "property_type": PropertyType.APARTMENT,
+             "address_line1": f"{i} Main St", "city": "Kansas City", "state": "MO", "postal_code": "64101",
+             "company_id": company_id, "total_units": UNITS_PER_PROPERTY, **stamp}
+            for i, property_id in enumerate(property_ids)
+        ))
+        insert_batches(conn, Tenant.__table__, (
+            {"id": tenant_id, "first_name": "Tenant", "last_name": str(i), "email": f"tenant{i}@example.com",
+             "phone": "555-0100", "company_id": company_id, **stamp}
+            for i, tenant_id in enumerate(tenant_ids)
+        ))
+        insert_batches(conn, Unit.__table__, units())
+        insert_batches(conn, Lease.__table__, iter(lease_rows))
+    print(f"Seeded {n_units:,} units and {len(lease_rows):,} active leases in {time.perf_counter() - started:.1f}s")
+
+
+def legacy_unit_response(unit: Unit) -> UnitResponse:
+    """The hand-built per-unit dict GET /units used before unit_response_service"""
+    unit_dict = {
+        'id': unit.id,
+        'unit_number': unit.unit_number,
+        'unit_type': unit.unit_type,
+        'floor': unit.floor,
+        'status': unit.status,
+        'bedrooms': unit.bedrooms,
+        'bathrooms': unit.bathrooms,
+        'square_feet': unit.square_feet,
+        'market_rent': unit.market_rent,
+        'rent_amount': unit.market_rent,
+        'deposit_amount': unit.deposit_amount,
+        'is_furnished': unit.is_furnished,
+        'features': unit.features or [],
+        'amenities': unit.features or [],
+        'utilities_included': unit.utilities_included or [],
+        'notes': unit.notes,
+        'property_id': unit.property_id,
+        'property_name': unit.property_ref.name if unit.property_ref else None,
+        'tenant_name': None,
+        'lease_end': None,
+        'days_on_market': 0,
+        'last_maintenance': unit.updated_at,
+        'created_at': unit.created_at,
+        'updated_at': unit.updated_at
+    }
+    if unit.status == UnitStatus.OCCUPIED:
+        active_lease = unit.active_lease
+        if active_lease and active_lease.tenant:
+            unit_dict['tenant_name'] = f"{active_lease.tenant.first_name} {active_lease.tenant.last_name}"
+            unit_dict['lease_end'] = active_lease.end_date
+    if unit.status == UnitStatus.AVAILABLE:
+        unit_dict['days_on_market'] = (datetime.utcnow() - unit.updated_at).days
+    return UnitResponse(**unit_dict)
+
+
+def list_units_field():
+    """The response_model field FastAPI validates GET /units responses against"""
+    for route in app.routes:
+        if getattr(route, "path", None) == "/api/v1/units/" and "GET" in route.methods:
+            return route.response_field
+    raise RuntimeError("GET /api/v1/units/ route not found")
+
+
+async def run_legacy(db, field) -> tuple:
+    started = time.perf_counter()
+    units = (await db.scalars(select(Unit).join(
+        Property, Unit.property_id == Property.id
+    ).options(
+        contains_eager(Unit.property_ref),
+        selectinload(Unit.active_lease).joinedload(Lease.tenant),
+    ).order_by(Unit.created_at, Unit.id))).all()
+    loaded = time.perf_counter()
+
+    content = UnitListResponse(
+        total=len(units), next_cursor=None, results=[legacy_unit_response(unit) for unit in units]
+    )
+    body = JSONResponse(await serialize_response(field=field, response_content=content)).body
+    finished = time.perf_counter()
+    db.expunge_all()
+    return loaded - started, finished - loaded, len(units), body
+
+
+async def run_compiled(db) -> tuple:
+    started = time.perf_counter()
+    rows = (await db.execute(unit_select().order_by(Unit.created_at, Unit.id))).all()
+    loaded = time.perf_counter()
+
+    body = dump_unit_list(rows, len(rows))
+    finished = time.perf_counter()
+    return loaded - started, finished - loaded, len(rows), body
+
+
+async def main_async(args) -> None:
+    field = list_units_field()
+    timings = {"legacy ORM + response_model": [], "compiled column select": []}
+    bodies = {}
+
+    async with AsyncSessionLocal() as db:
+        for _ in range(args.repeat):
+            for name, run in (("legacy ORM + response_model", lambda: run_legacy(db, field)),
+                              ("compiled column select", lambda: run_compiled(db))):
+                load, serialize, n_rows, body = await run()
+                timings[name].append((load, serialize))
+                bodies[name] = body
+
+    legacy, compiled = (json.loads(body) for body in bodies.values())
+    print(f"\nGET /units payload for {n_rows:,} units, median of {args.repeat} runs "
+          f"(identical JSON: {legacy == compiled})")
+    medians = {}
+    for name, runs in timings.items():
+        load = statistics.median(run[0] for run in runs)
+        serialize = statistics.median(run[1] for run in runs)
+        medians[name] = (load, serialize)
+        print(f"{name}")
+        print(f"  load      {load * 1000:8.1f} ms  {load / n_rows * 1e6:6.2f} us/row")
+        print(f"  serialize {serialize * 1000:8.1f} ms  {serialize / n_rows * 1e6:6.2f} us/row")
+        print(f"  total     {(load + serialize) * 1000:8.1f} ms  {(load + serialize) / n_rows * 1e6:6.2f} us/row")
+
+    (legacy_load, legacy_serialize), (new_load, new_serialize) = medians.values()
+    print(f"\nserialize x{legacy_serialize / new_serialize:.1f}, "
+          f"load x{legacy_load / new_load:.1f}, "
+          f"total x{(legacy_load + legacy_serialize) / (new_load + new_serialize):.1f} faster")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row cost of the unit list response")
+    parser.add_argument("--units", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-seed", action="store_true", help="Reuse the data already in DATABASE_URL")
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url}")
+    if not args.no_seed:
+        seed(args.units)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Deliver queued notifications from the notification_outbox table
+
+Run one or more alongside the API; workers claim disjoint batches, so they
+can be scaled out (SQLite serializes their claims).
+
+Usage:
+    python notification_worker.py                      # run until stopped (SIGINT/SIGTERM)
+    python notification_worker.py --once               # drain what is due, then exit
+    python notification_worker.py --metrics-port 9105  # Prometheus metrics on :9105/metrics
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import engine, init_db
+from app.services.outbox_service import WorkerStats, run_worker
+
+logger = logging.getLogger("notification_worker")
+
+# Claimed rows are read after the claim commits; keep them loaded
+WorkerSession = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+
+def serve_metrics(port: int, stats: WorkerStats) -> ThreadingHTTPServer:
+    """Serve ``stats`` as Prometheus text on a background thread"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = stats.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def report(stats: WorkerStats, stop: threading.Event, interval: float) -> None:
+    """Log a throughput summary every ``interval`` seconds"""
+    while not stop.wait(interval):
+        logger.info(json.dumps(stats.summary()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver notifications from the outbox")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}:{os.getpid()}")
+    parser.add_argument("--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE)
+    parser.add_argument("--poll-interval", type=float, default=settings.OUTBOX_POLL_INTERVAL,
+                        help="Seconds to wait when nothing is due")
+    parser.add_argument("--once", action="store_true", help="Exit once nothing is due")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port")
+    parser.add_argument("--report-interval", type=float, default=60.0, help="Seconds between throughput log lines")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+
+    stats = WorkerStats()
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        # Finish the batch in hand, then exit
+        signal.signal(signum, lambda *_: stop.set())
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port, stats)
+    threading.Thread(target=report, args=(stats, stop, args.report_interval), daemon=True).start()
+
+    logger.info("Worker %s started (batch %d)", args.worker_id, args.batch_size)
+    run_worker(WorkerSession, args.worker_id, args.batch_size, args.poll_interval, stats, stop, once=args.once)
+    logger.info(json.dumps(stats.summary()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Rebuild or verify the portfolio_rollups table
+
+Usage:
+    python rebuild_rollups.py                 # recompute all rollups
+    python rebuild_rollups.py --company <id>  # recompute one company
+    python rebuild_rollups.py --check         # report drift without writing
+"""
+import argparse
+import os
+import sys
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal, init_db
+from app.services.rollup_service import rebuild_rollups, check_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain portfolio rollups")
+    parser.add_argument("--company", help="Limit to a single company id")
+    parser.add_argument("--check", action="store_true", help="Only report drift, don't rebuild")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.check:
+            drift = check_rollups(db, company_id=args.company)
+            if not drift:
+                print("✅ Portfolio rollups are consistent")
+                return 0
+            for entry in drift:
+                scope = entry["property_id"] or f"company {entry['company_id']}"
+                print(f"❌ {scope}: {entry['field'] or 'row'} expected={entry['expected']} actual={entry['actual']}")
+            return 1
+
+        rows = rebuild_rollups(db, company_id=args.company)
+        db.commit()
+        print(f"✅ Rebuilt {rows} portfolio rollup rows")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error maintaining portfolio rollups: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Shared fixtures
+
+Tests run against a throwaway SQLite database. The environment is set here,
+before anything imports ``app.config``.
+"""
+import os
+import sys
+import tempfile
+import uuid
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEST_DIR = tempfile.mkdtemp(prefix="pm-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.environ["AI_CACHE_PATH"] = ""
+os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+
+import pytest
+
+from app.database import SessionLocal, init_db
+from app.main import app
+from app.models import Company, Lease, Property, Tenant, Unit
+from app.models.lease import LeaseStatus, LeaseType
+from app.models.property import PropertyType
+from app.models.unit import UnitStatus, UnitType
+from app.services.auth_service import get_current_user
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db()
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def anonymous_app():
+    """The app with authentication stubbed out"""
+    app.dependency_overrides[get_current_user] = lambda: None
+    yield app
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+def make_portfolio(db):
+    """
+    ``make_portfolio(units, properties=1)``: a company with ``properties``
+    properties sharing ``units`` units, each occupied under an active lease
+    with its own tenant. Returns the property ids.
+    """
+    def make(units: int, properties: int = 1):
+        tag = uuid.uuid4().hex[:8]
+        company = Company(name=f"Company {tag}", email=f"{tag}@example.com")
+        db.add(company)
+        db.flush()
+        props = [
+            Property(
+                name=f"Property {tag} {index}", property_type=PropertyType.APARTMENT,
+                address_line1=f"{index} Main St", city="Springfield", state="MO", postal_code="65801",
+                company_id=company.id, total_units=units,
+            )
+            for index in range(properties)
+        ]
+        db.add_all(props)
+        db.flush()
+        for index in range(units):
+            prop = props[index % properties]
+            unit = Unit(
+                property_id=prop.id, unit_number=str(100 + index), unit_type=UnitType.ONE_BEDROOM,
+                status=UnitStatus.OCCUPIED, bedrooms=1, bathrooms=1, market_rent=1200,
+            )
+            tenant = Tenant(
+                first_name="Tenant", last_name=f"{tag}-{index}", email=f"{tag}-{index}@example.com",
+                phone="555-0100", company_id=company.id,
+            )
+            db.add_all([unit, tenant])
+            db.flush()
+            db.add(Lease(
+                unit_id=unit.id, tenant_id=tenant.id, company_id=company.id,
+                lease_type=LeaseType.FIXED_TERM, status=LeaseStatus.ACTIVE,
+                start_date=date.today() - timedelta(days=30), end_date=date.today() + timedelta(days=335),
+                rent_amount=1200, deposit_amount=1200,
+            ))
+        db.commit()
+        return [str(prop.id) for prop in props]
+
+    return make
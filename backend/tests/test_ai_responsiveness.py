@@ -0,0 +1,107 @@
+"""
+Slow AI providers must not stall the event loop
+
+A local stub stands in for the OpenAI client; its completions take
+``DELAY`` seconds. While chats wait on it, ``/health`` must keep answering.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.services.ai_service import ProviderGate, ai_service
+
+CHAT_PATH = "/api/v1/ai/assistant/chat"
+DELAY = 0.5
+CHATS = 10
+
+
+class SlowCompletions:
+    """``client.chat.completions`` that answers after ``delay`` seconds without blocking"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Stub answer"))])
+
+
+@pytest.fixture
+def slow_provider(monkeypatch):
+    completions = SlowCompletions(DELAY)
+    monkeypatch.setattr(ai_service, "openai_client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    monkeypatch.setattr(ai_service, "cache", None)
+    return completions
+
+
+def set_gate(monkeypatch, max_concurrency: int, timeout: float) -> None:
+    monkeypatch.setitem(ai_service.gates, "openai", ProviderGate("openai", max_concurrency, timeout))
+
+
+async def chats_with_health_probes(app, chats: int):
+    """Fire ``chats`` concurrent chats; probe /health while they run. Returns (chat responses, probe latencies)"""
+    probes = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        async def probe():
+            await asyncio.sleep(0.05)
+            for _ in range(5):
+                started = time.perf_counter()
+                response = await client.get("/health")
+                probes.append(time.perf_counter() - started)
+                assert response.status_code == 200
+                await asyncio.sleep(0.05)
+
+        results = await asyncio.gather(
+            probe(),
+            *(client.post(CHAT_PATH, json={"message": "How do I reduce vacancy?"}) for _ in range(chats)),
+        )
+    return [response.json() for response in results[1:]], probes
+
+
+def test_health_stays_fast_during_slow_completions(anonymous_app, slow_provider, monkeypatch):
+    set_gate(monkeypatch, max_concurrency=CHATS, timeout=10 * DELAY)
+
+    started = time.perf_counter()
+    chats, probes = asyncio.run(chats_with_health_probes(anonymous_app, CHATS))
+    elapsed = time.perf_counter() - started
+
+    assert [chat["model"] for chat in chats] == ["gpt-3.5-turbo"] * CHATS
+    assert slow_provider.calls == CHATS
+    # Completions overlap instead of running one after another
+    assert elapsed < CHATS * DELAY / 2
+    # The probes were answered while completions were pending
+    assert len(probes) == 5
+    assert max(probes) < DELAY / 5
+
+
+def test_gate_timeout_falls_back(anonymous_app, slow_provider, monkeypatch):
+    set_gate(monkeypatch, max_concurrency=CHATS, timeout=DELAY / 5)
+
+    started = time.perf_counter()
+    chats, probes = asyncio.run(chats_with_health_probes(anonymous_app, CHATS))
+    elapsed = time.perf_counter() - started
+
+    assert [chat["model"] for chat in chats] == ["fallback"] * CHATS
+    assert ai_service.gates["openai"].timeouts == CHATS
+    assert ai_service.gates["openai"].in_flight == 0
+    assert elapsed < DELAY
+    assert max(probes) < DELAY / 5
+
+
+def test_gate_limits_concurrent_completions(anonymous_app, slow_provider, monkeypatch):
+    set_gate(monkeypatch, max_concurrency=2, timeout=10 * DELAY)
+
+    started = time.perf_counter()
+    chats, probes = asyncio.run(chats_with_health_probes(anonymous_app, 4))
+    elapsed = time.perf_counter() - started
+
+    assert [chat["model"] for chat in chats] == ["gpt-3.5-turbo"] * 4
+    # Two waves of two
+    assert elapsed >= 2 * DELAY
+    assert max(probes) < DELAY / 5
@@ -0,0 +1,83 @@
+"""
+Unread counters kept incrementally match a rebuild from the messages table
+"""
+import uuid
+
+from app.models import Conversation, ConversationParticipant, Message, User
+from app.models.messaging import ParticipantType
+from app.services.inbox_service import mark_participant_read, rebuild_inbox_state, record_message
+
+
+def make_user(db) -> User:
+    tag = uuid.uuid4().hex[:8]
+    user = User(email=f"{tag}@example.com", hashed_password="x", first_name="Pat", last_name=tag)
+    db.add(user)
+    db.flush()
+    return user
+
+
+def send(db, conversation: Conversation, sender) -> None:
+    message = Message(
+        conversation_id=conversation.id,
+        sender_id=sender.id if sender else None,
+        sender_name=sender.first_name if sender else "System",
+        content="Hello",
+        attachments=[],
+    )
+    db.add(message)
+    db.flush()
+    record_message(db, conversation, message)
+
+
+def test_rebuild_matches_incremental_unread_counts(db):
+    manager, owner = make_user(db), make_user(db)
+    conversation = Conversation(created_by_id=manager.id, subject="Leak")
+    db.add(conversation)
+    db.flush()
+    participants = {
+        "manager": ConversationParticipant(
+            conversation_id=conversation.id, user_id=manager.id,
+            participant_type=ParticipantType.MANAGER, participant_name="Manager",
+        ),
+        "owner": ConversationParticipant(
+            conversation_id=conversation.id, user_id=owner.id,
+            participant_type=ParticipantType.OWNER, participant_name="Owner",
+        ),
+        # Tenants without a login have no user
+        "tenant": ConversationParticipant(
+            conversation_id=conversation.id, user_id=None,
+            participant_type=ParticipantType.TENANT, participant_name="Tenant",
+        ),
+    }
+    db.add_all(participants.values())
+    db.flush()
+
+    for sender in (manager, manager, owner, None):
+        send(db, conversation, sender)
+    db.commit()
+
+    def unread():
+        for participant in participants.values():
+            db.refresh(participant)
+        return {name: participant.unread_count for name, participant in participants.items()}
+
+    incremental = unread()
+    assert incremental == {"manager": 2, "owner": 3, "tenant": 4}
+
+    rebuild_inbox_state(db, conversation_id=conversation.id)
+    db.commit()
+    assert unread() == incremental
+
+    # After a read, only later messages count for the reader
+    mark_participant_read(db, participants["owner"])
+    db.commit()
+    for sender in (manager, None):
+        send(db, conversation, sender)
+    db.commit()
+
+    incremental = unread()
+    assert incremental == {"manager": 3, "owner": 2, "tenant": 6}
+
+    rebuild_inbox_state(db, conversation_id=conversation.id)
+    db.commit()
+    assert unread() == incremental
@@ -0,0 +1,26 @@
+"""
+Messages pushed over the websocket carry no per-user fields
+"""
+import asyncio
+import uuid
+
+from app.api import messaging_endpoints
+from app.models import Message
+
+
+def test_pushed_message_omits_is_from_me(monkeypatch):
+    published = []
+
+    async def publish(channel, event):
+        published.append(event)
+
+    monkeypatch.setattr(messaging_endpoints.realtime_hub, "publish", publish)
+    message = Message(
+        id=uuid.uuid4(), conversation_id=uuid.uuid4(), sender_id=uuid.uuid4(),
+        sender_name="Pat", content="Hello", attachments=[],
+    )
+    asyncio.run(messaging_endpoints._publish_message(message))
+
+    pushed = published[0]["message"]
+    assert "is_from_me" not in pushed
+    assert pushed["sender_id"] == str(message.sender_id)
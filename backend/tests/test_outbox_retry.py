@@ -0,0 +1,35 @@
+"""
+A failed digest is retried as one digest
+"""
+import uuid
+from datetime import datetime
+
+from app.models import NotificationOutbox, OutboxStatus, User
+from app.services.outbox_service import deliver_batch
+
+
+def test_failed_digest_rows_come_due_together(db):
+    tag = uuid.uuid4().hex[:8]
+    user = User(email=f"{tag}@example.com", hashed_password="x", first_name="Pat", last_name=tag)
+    db.add(user)
+    db.flush()
+    rows = [
+        NotificationOutbox(
+            recipient_id=user.id, payload={"preview": f"Message {index}"},
+            status=OutboxStatus.PROCESSING, attempts=1 + index % 2, available_at=datetime.utcnow(),
+        )
+        for index in range(6)
+    ]
+    db.add_all(rows)
+    db.commit()
+
+    def fail(user, entries):
+        raise RuntimeError("SMTP down")
+
+    deliver_batch(db, rows, send=fail)
+
+    for row in rows:
+        db.refresh(row)
+    assert {row.status for row in rows} == {OutboxStatus.PENDING}
+    assert len({row.available_at for row in rows}) == 1
+    assert rows[0].available_at > datetime.utcnow()
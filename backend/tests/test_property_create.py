@@ -0,0 +1,39 @@
+"""
+Creating a property with SQLite foreign keys enforced
+"""
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.models import Company, Property
+
+PROPERTY = {
+    "name": "Maple Court", "property_type": "apartment", "address_line1": "1 Maple St",
+    "city": "Springfield", "state": "MO", "postal_code": "65801", "total_units": 4,
+}
+
+
+def make_company(db) -> Company:
+    tag = uuid.uuid4().hex[:8]
+    company = Company(name=f"Company {tag}", email=f"{tag}@example.com")
+    db.add(company)
+    db.commit()
+    return company
+
+
+def test_create_property_belongs_to_an_existing_company(db):
+    assert db.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    company, _ = make_company(db), make_company(db)
+    client = TestClient(app)
+
+    response = client.post("/api/v1/properties/", json={**PROPERTY, "company_id": str(company.id)})
+    assert response.status_code == 201, response.text
+    created = db.get(Property, uuid.UUID(response.json()["id"]))
+    assert created.company_id == company.id
+
+    # An unknown company, or several to choose from, is the caller's error rather than an IntegrityError
+    response = client.post("/api/v1/properties/", json={**PROPERTY, "company_id": str(uuid.uuid4())})
+    assert response.status_code == 422
+    assert client.post("/api/v1/properties/", json=PROPERTY).status_code == 422
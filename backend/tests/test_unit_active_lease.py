@@ -0,0 +1,47 @@
+"""
+A unit with more than one active lease is still listed once
+"""
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Lease, Tenant, Unit
+from app.models.lease import LeaseStatus, LeaseType
+
+
+def test_unit_with_two_active_leases_is_one_row(db, make_portfolio):
+    property_id = make_portfolio(3)[0]
+    unit = db.query(Unit).filter(Unit.property_id == property_id).order_by(Unit.unit_number).first()
+    first_lease = db.query(Lease).filter(Lease.unit_id == unit.id).one()
+    tenant = Tenant(first_name="Newer", last_name="Tenant", email="newer@example.com",
+                    phone="555-0101", company_id=first_lease.company_id)
+    db.add(tenant)
+    db.flush()
+    db.add(Lease(
+        unit_id=unit.id, tenant_id=tenant.id, company_id=first_lease.company_id,
+        lease_type=LeaseType.FIXED_TERM, status=LeaseStatus.ACTIVE,
+        start_date=first_lease.start_date + timedelta(days=1), end_date=date.today() + timedelta(days=400),
+        rent_amount=1300, deposit_amount=1300,
+    ))
+    db.commit()
+    client = TestClient(app)
+
+    listed = client.get("/api/v1/units/", params={"property_id": property_id}).json()["results"]
+    assert sorted(row["id"] for row in listed) == sorted({row["id"] for row in listed})
+    assert len(listed) == 3
+
+    page = client.get("/api/v1/units/", params={"property_id": property_id, "limit": 2}).json()
+    rest = client.get("/api/v1/units/", params={"property_id": property_id, "cursor": page["next_cursor"]}).json()
+    assert page["total"] == 3
+    assert len(page["results"]) + len(rest["results"]) == 3
+
+    # The latest active lease wins
+    row = next(row for row in listed if row["id"] == str(unit.id))
+    assert row["tenant_name"] == "Newer Tenant"
+    assert client.get(f"/api/v1/units/{unit.id}").json()["tenant_name"] == "Newer Tenant"
+
+    # The ORM relationship follows the same rule
+    db.expire_all()
+    assert unit.active_lease.rent_amount == 1300
+    assert unit.current_tenant.first_name == "Newer"
@@ -0,0 +1,55 @@
+"""
+Listing units runs a fixed number of statements, however many units there are
+
+Each unit carries its property name and active tenant; loading those per
+row (N+1) would make the statement count grow with the page.
+"""
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database import async_engine
+from app.main import app
+
+UNITS = 5
+
+
+@contextmanager
+def count_statements():
+    """Count statements the async engine (used by the unit endpoints) executes"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def list_units(client: TestClient, params: dict):
+    with count_statements() as statements:
+        response = client.get("/api/v1/units/", params=params)
+    assert response.status_code == 200
+    return response.json(), len(statements)
+
+
+def test_unit_list_statement_count_is_constant(make_portfolio):
+    small = make_portfolio(UNITS, properties=2)
+    large = make_portfolio(10 * UNITS, properties=2)
+    client = TestClient(app)
+
+    for params in ({}, {"limit": 100, "include_total": False}, {"limit": 100}):
+        small_body, small_count = list_units(client, {**params, "property_id": small[0]})
+        large_body, large_count = list_units(client, {**params, "property_id": large[0]})
+
+        assert len(small_body["results"]) == UNITS // 2 + UNITS % 2
+        assert len(large_body["results"]) == 10 * UNITS // 2
+        assert large_count == small_count, params
+        unit = large_body["results"][0]
+        assert unit["property_name"].startswith("Property ")
+        assert unit["tenant_name"].startswith("Tenant ")